@@ -0,0 +1,87 @@
+"""
+AMM Quotes
+
+Local constant-product quotes for subnet TAO/alpha pools:
+- Expected output, effective price and slippage straight from the pool reserves
+- No RPC per quote: works on the SubnetSnapshot already read for the cycle
+- Vectorized with NumPy, so many candidate order sizes are quoted in one call
+- Closed-form largest order that stays within a slippage bound
+"""
+
+import numpy as np
+
+from strategies import BUY
+
+# Pool fee taken from the input amount (0.0 = plain x*y=k swap)
+DEFAULT_SWAP_FEE = 0.0
+
+
+class Quote:
+    """Expected result of swapping `amount` against a pool; fields are floats or arrays."""
+
+    __slots__ = ("side", "amount", "output", "price", "slippage")
+
+    def __init__(self, side, amount, output, price, slippage):
+        self.side = side
+        self.amount = amount
+        self.output = output
+        self.price = price
+        self.slippage = slippage
+
+
+def _has_reserves(snapshot):
+    return snapshot.tao_in > 0 and snapshot.alpha_in > 0
+
+
+def spot_price(snapshot):
+    """Marginal TAO per alpha of the pool (the snapshot price when there are no reserves)."""
+    if _has_reserves(snapshot):
+        return snapshot.tao_in / snapshot.alpha_in
+    return snapshot.price
+
+
+def swap_output(reserve_in, reserve_out, amounts, fee=DEFAULT_SWAP_FEE):
+    """Constant-product output for `amounts` paid into the `reserve_in` side."""
+    paid = np.asarray(amounts, dtype=float) * (1.0 - fee)
+    return reserve_out * paid / (reserve_in + paid)
+
+
+def quote(snapshot, side, amounts, fee=DEFAULT_SWAP_FEE):
+    """Quote buys (`amounts` in TAO) or sells (`amounts` in alpha) against the snapshot's pool.
+
+    Slippage is the shortfall of the output against trading the whole amount at the spot price.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    spot = spot_price(snapshot)
+
+    if not _has_reserves(snapshot):
+        # No pool to move (e.g. the root subnet): everything trades at the quoted price
+        output = amounts / spot if side == BUY else amounts * spot
+        slippage = np.zeros_like(amounts)
+    elif side == BUY:
+        output = swap_output(snapshot.tao_in, snapshot.alpha_in, amounts, fee)
+        slippage = 1.0 - output * spot / np.where(amounts > 0, amounts, 1.0)
+    else:
+        output = swap_output(snapshot.alpha_in, snapshot.tao_in, amounts, fee)
+        slippage = 1.0 - output / (np.where(amounts > 0, amounts, 1.0) * spot)
+    slippage = np.where(amounts > 0, slippage, 0.0)
+
+    # Effective TAO per alpha of the whole order
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = amounts / output if side == BUY else output / amounts
+    price = np.where(amounts > 0, price, spot)
+
+    if amounts.ndim == 0:
+        return Quote(side, float(amounts), float(output), float(price), float(slippage))
+    return Quote(side, amounts, output, price, slippage)
+
+
+def max_order_size(snapshot, side, max_slippage, fee=DEFAULT_SWAP_FEE):
+    """Largest buy (TAO) or sell (alpha) whose slippage stays within `max_slippage` (a fraction)."""
+    if not _has_reserves(snapshot):
+        return float("inf")
+    if max_slippage <= fee:
+        return 0.0
+    reserve_in = snapshot.tao_in if side == BUY else snapshot.alpha_in
+    # Solve (1 - fee) * R / (R + x * (1 - fee)) = 1 - max_slippage for x
+    return reserve_in * ((1.0 - fee) / (1.0 - max_slippage) - 1.0) / (1.0 - fee)
@@ -0,0 +1,267 @@
+"""
+Backtester
+
+Replays the DCA and unstaking threshold logic over historical per-block prices:
+- Works on NumPy arrays instead of a simulated event loop, so a year of blocks runs in seconds
+- Evaluates on the same block schedule as the bots (`interval_blocks` / `interval_seconds`)
+- Prices fills from the pool reserves when the series includes them
+- Sweeps grids of YAML parameters across a process pool
+- Reports the metrics of the bots' session summaries for every parameter set
+
+Usage:
+    python backtester.py dca_config.yaml prices.csv --balance 10
+    python backtester.py unstaking_config.yaml prices.csv --holdings 5 --sweep min_price_threshold=0.06,0.08,0.1
+
+The price file is a CSV with a header row: `block,price` and optionally `tao_in,alpha_in`.
+"""
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import yaml
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+from amm_quotes import swap_output
+from block_scheduler import interval_to_blocks
+from bot_config import DCAConfig, UnstakingConfig
+from strategies import BUY, SELL
+
+console = Console()
+
+# Tolerance when counting how many fixed-size trades fit in a balance or position
+EPSILON = 1e-12
+
+
+class PriceSeries:
+    """Per-block price history, optionally with pool reserves."""
+
+    __slots__ = ("blocks", "prices", "tao_in", "alpha_in")
+
+    def __init__(self, blocks, prices, tao_in=None, alpha_in=None):
+        self.blocks = np.asarray(blocks, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=float)
+        self.tao_in = None if tao_in is None else np.asarray(tao_in, dtype=float)
+        self.alpha_in = None if alpha_in is None else np.asarray(alpha_in, dtype=float)
+
+    @classmethod
+    def from_csv(cls, path):
+        data = np.genfromtxt(path, delimiter=",", names=True)
+        names = data.dtype.names
+        reserves = "tao_in" in names and "alpha_in" in names
+        return cls(
+            data["block"], data["price"],
+            data["tao_in"] if reserves else None,
+            data["alpha_in"] if reserves else None,
+        )
+
+    def evaluation_indices(self, interval_blocks):
+        """Indices of the blocks the bot would evaluate, every `interval_blocks` from the first one."""
+        due = np.arange(self.blocks[0], self.blocks[-1] + 1, interval_blocks)
+        indices = np.searchsorted(self.blocks, due)
+        indices = indices[indices < len(self.blocks)]
+        # Due blocks inside a gap all map to the next block; it is evaluated once (indices are sorted)
+        return indices[np.concatenate(([True], np.diff(indices) > 0))]
+
+
+def _fills(series, indices, side, amounts):
+    """Traded (tao, alpha, price) arrays for `amounts` at the given blocks."""
+    prices = series.prices[indices]
+    if series.tao_in is not None:
+        tao_in, alpha_in = series.tao_in[indices], series.alpha_in[indices]
+        if side == BUY:
+            tao, alpha = amounts, swap_output(tao_in, alpha_in, amounts)
+        else:
+            tao, alpha = swap_output(alpha_in, tao_in, amounts), amounts
+        return tao, alpha, tao / alpha
+    if side == BUY:
+        return amounts, amounts / prices, prices
+    return amounts * prices, amounts, prices
+
+
+def _metrics(evaluations, skipped_for_price, tao, alpha, prices):
+    """The session summary metrics of one replay."""
+    trades = len(prices)
+    total_tao = float(tao.sum())
+    total_alpha = float(alpha.sum())
+    return {
+        'evaluations': int(evaluations),
+        'skipped_for_price': int(skipped_for_price),
+        'trades_count': trades,
+        'total_tao': total_tao,
+        'total_alpha': total_alpha,
+        'average_price': total_tao / total_alpha if total_alpha > 0 else 0.0,
+        'price_change': float((prices[-1] - prices[0]) / prices[0] * 100) if trades else 0.0,
+    }
+
+
+def backtest_dca(series, config, balance):
+    """Replay DCABot.dca_cycle (`config` is a DCAConfig) with a starting wallet `balance` in TAO."""
+    amount = config.purchase_amount
+    min_balance = config.min_balance
+    threshold = config.max_price_threshold
+    indices = series.evaluation_indices(interval_to_blocks(config))
+
+    # Trade k (0-based) happens only while the balance before it covers both the purchase and min_balance
+    floor_balance = max(min_balance, amount)
+    max_trades = int(np.floor((balance - floor_balance) / amount + EPSILON)) + 1 if balance >= floor_balance else 0
+
+    prices = series.prices[indices]
+    eligible = prices <= threshold if threshold > 0 else np.ones(len(indices), dtype=bool)
+    # Every eligible evaluation trades until the balance check stops the bot
+    trades_before = np.cumsum(eligible) - eligible
+    stopped = np.flatnonzero(trades_before >= max_trades)
+    stop = int(stopped[0]) if len(stopped) else len(indices)
+    traded = eligible.copy()
+    traded[stop:] = False
+    evaluations = min(stop + 1, len(indices))
+    skipped = (~eligible[:stop]).sum()
+
+    trade_indices = indices[traded]
+    tao, alpha, fill_prices = _fills(series, trade_indices, BUY, np.full(len(trade_indices), amount))
+    return _metrics(evaluations, skipped, tao, alpha, fill_prices)
+
+
+def backtest_unstake(series, config, holdings):
+    """Replay UnstakingBot.unstaking_cycle (`config` is an UnstakingConfig) with starting `holdings` in alpha."""
+    amount = config.unstake_amount
+    threshold = config.min_price_threshold
+    min_holdings = config.min_holdings_threshold
+    indices = series.evaluation_indices(interval_to_blocks(config))
+
+    # Full-size sales allowed by min_holdings_threshold, then a final sale of any remainder below unstake_amount
+    headroom = holdings - float(min_holdings) if min_holdings is not None else holdings
+    full_sales = max(0, int(np.floor(headroom / amount + EPSILON)))
+    remainder = holdings - full_sales * amount
+    sizes = [amount] * full_sales
+    if EPSILON < remainder < amount:
+        sizes.append(remainder)
+
+    prices = series.prices[indices]
+    eligible = prices >= threshold if threshold > 0 else np.ones(len(indices), dtype=bool)
+    trade_indices = indices[np.flatnonzero(eligible)[:len(sizes)]]
+    sizes = np.asarray(sizes[:len(trade_indices)], dtype=float)
+
+    tao, alpha, fill_prices = _fills(series, trade_indices, SELL, sizes)
+    return _metrics(len(indices), (~eligible).sum(), tao, alpha, fill_prices)
+
+
+def strategy_kind(params):
+    if 'purchase_amount' in params:
+        return 'dca'
+    if 'unstake_amount' in params:
+        return 'unstake'
+    raise ValueError("Config has neither purchase_amount nor unstake_amount")
+
+
+def parse_params(params):
+    """Validate `params` (a bot config dict) as the bot would load it; raises ConfigError."""
+    return (DCAConfig if strategy_kind(params) == 'dca' else UnstakingConfig).from_dict(params)
+
+
+def backtest(series, params, balance=0.0, holdings=0.0):
+    """Replay the strategy described by `params` (a bot config dict)."""
+    config = parse_params(params)
+    if strategy_kind(params) == 'dca':
+        return backtest_dca(series, config, balance)
+    return backtest_unstake(series, config, holdings)
+
+
+# Shared with worker processes once through the pool initializer instead of per task
+_worker_series = None
+
+
+def _init_worker(series):
+    global _worker_series
+    _worker_series = series
+
+
+def _run_one(job):
+    params, balance, holdings = job
+    return params, backtest(_worker_series, params, balance, holdings)
+
+
+def expand_grid(base_params, grid):
+    """Every combination of `grid` ({key: [values]}) applied over `base_params`."""
+    keys = list(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(base_params)
+        params.update(zip(keys, values))
+        yield params
+
+
+def sweep(series, base_params, grid, balance=0.0, holdings=0.0, workers=None):
+    """Backtest every parameter combination of `grid` across a process pool."""
+    jobs = [(params, balance, holdings) for params in expand_grid(base_params, grid)]
+    if len(jobs) == 1 or workers == 1:
+        _init_worker(series)
+        return [_run_one(job) for job in jobs]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+        return list(pool.map(_run_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def parse_grid(specs):
+    """Parse `key=v1,v2,...` sweep specs into {key: [values]}."""
+    grid = {}
+    for spec in specs or []:
+        key, _, values = spec.partition("=")
+        grid[key] = [yaml.safe_load(value) for value in values.split(",")]
+    return grid
+
+
+def print_results(kind, results, grid):
+    """Print the session summary metrics of every parameter set."""
+    spent, bought = ("💰 TAO Invested", "🪙 Alpha Bought") if kind == 'dca' else ("💰 TAO Earned", "🪙 Alpha Sold")
+    table = Table(title="📊 Backtest Results", box=box.ROUNDED, header_style="bold white on blue")
+    for key in grid:
+        table.add_column(key, style="cyan", justify="right")
+    for column in ("🔢 Trades", spent, bought, "📈 Average Price", "📊 Price Change", "⏸️ Skipped"):
+        table.add_column(column, style="white", justify="right")
+
+    for params, metrics in results:
+        table.add_row(
+            *(str(params[key]) for key in grid),
+            str(metrics['trades_count']),
+            f"{metrics['total_tao']:.6f}",
+            f"{metrics['total_alpha']:.6f}",
+            f"{metrics['average_price']:.6f}",
+            f"{metrics['price_change']:+.2f}%",
+            str(metrics['skipped_for_price']),
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the DCA / unstaking bot settings over a price history")
+    parser.add_argument("config", help="dca_config.yaml or unstaking_config.yaml")
+    parser.add_argument("prices", help="CSV with block,price[,tao_in,alpha_in] columns")
+    parser.add_argument("--balance", type=float, default=10.0, help="Starting wallet balance in TAO (DCA)")
+    parser.add_argument("--holdings", type=float, default=10.0, help="Starting alpha holdings (unstaking)")
+    parser.add_argument("--sweep", action="append", metavar="KEY=V1,V2", help="Parameter values to sweep; repeatable")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for sweeps (default: CPU count)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        base_params = yaml.safe_load(f) or {}
+    grid = parse_grid(args.sweep)
+    # Every combination is validated up front, so a bad sweep value is reported before any worker starts
+    try:
+        for params in expand_grid(base_params, grid):
+            parse_params(params)
+    except ValueError as e:
+        console.print(f"❌ Invalid config: {e}")
+        return
+    series = PriceSeries.from_csv(args.prices)
+
+    console.print(f"📈 Replaying {len(series.blocks)} blocks ({series.blocks[0]}–{series.blocks[-1]})")
+    results = sweep(series, base_params, grid, args.balance, args.holdings, args.workers)
+    print_results(strategy_kind(base_params), results, grid)
+
+
+if __name__ == "__main__":
+    main()
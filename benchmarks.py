@@ -0,0 +1,226 @@
+"""
+Benchmarks
+
+Measures what one trading cycle costs by driving the real DCABot and UnstakingBot
+cycles against the in-process chain simulator:
+- Cycles per second and p50 / p99 cycle latency
+- RPC round trips per cycle, in total and per call
+- Memory growth over a run (tracemalloc)
+- Optional JSON baseline to flag regressions
+
+Usage:
+    python benchmarks.py                                # both bots, 500 cycles, 20 ms RPC latency
+    python benchmarks.py --bot dca --cycles 2000 --latency 0
+    python benchmarks.py --save baseline.json           # record a baseline
+    python benchmarks.py --compare baseline.json        # exit 1 if a metric regressed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+import dca_bot
+import unstaking_bot
+from bot_config import DCAConfig, UnstakingConfig
+from chain_simulator import SimulatedChain, SimulatedSubtensor, SimulatedWallet
+
+console = Console()
+
+NETUID = 1
+VALIDATOR = "5SimulatedValidatorHotkey"
+# A metric this much worse than the baseline counts as a regression
+REGRESSION_TOLERANCE = 0.20
+
+BOTS = {
+    'dca': {
+        'module': dca_bot,
+        'bot': dca_bot.DCABot,
+        'config_class': DCAConfig,
+        'cycle': 'dca_cycle',
+        'config': {'purchase_amount': 0.01, 'min_balance': 0.0, 'max_price_threshold': 0.0},
+    },
+    'unstake': {
+        'module': unstaking_bot,
+        'bot': unstaking_bot.UnstakingBot,
+        'config_class': UnstakingConfig,
+        'cycle': 'unstaking_cycle',
+        'config': {'unstake_amount': 0.1, 'min_price_threshold': 0.0, 'min_holdings_threshold': 0.0},
+    },
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def build_bot(kind, chain, sub, journal_dir):
+    """A bot wired to the simulator, as initialize() would leave it."""
+    spec = BOTS[kind]
+    config = dict(
+        spec['config'], wallet="simulated", validator=VALIDATOR, target_netuid=NETUID, interval_blocks=1,
+        journal_file=os.path.join(journal_dir, f"{kind}_journal.jsonl")
+    )
+    bot = spec['bot'](spec['config_class'].from_dict(config))
+    bot.wallet = SimulatedWallet()
+    endpoint = bot.pool.endpoints[0]
+    # Through the bot's RPC gateway, as EndpointPool connects it
+    endpoint.sub = bot.gateway.wrap(sub, endpoint.label)
+    endpoint.record_probe(chain.block, sub.latency)
+    bot.pool.active = endpoint
+    bot.sub = endpoint.sub
+    bot.loop = asyncio.get_running_loop()
+    bot.create_scheduler()
+    return bot
+
+
+async def run_cycles(bot, chain, cycle, count, latencies=None):
+    """Advance one block per cycle and run the bot's cycle on it, prefetching for the next one."""
+    for _ in range(count):
+        bot.scheduler.on_block(chain.advance())
+        started = time.perf_counter()
+        await cycle()
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+        bot.pipeline.prefetch()
+
+
+async def benchmark(kind, cycles, latency, jitter, warmup, memory_cycles):
+    spec = BOTS[kind]
+    spec['module'].log.configure(level="off")
+
+    chain = SimulatedChain()
+    sub = SimulatedSubtensor(chain, latency=latency, jitter=jitter)
+    journal_dir = tempfile.TemporaryDirectory()
+    bot = build_bot(kind, chain, sub, journal_dir.name)
+    total_cycles = warmup + cycles + memory_cycles
+    chain.fund(bot.wallet.coldkey.ss58_address, 1.0 + total_cycles * spec['config'].get('purchase_amount', 0.0) * 2)
+    chain.stake(bot.wallet.coldkey.ss58_address, VALIDATOR, NETUID, 1.0 + total_cycles * spec['config'].get('unstake_amount', 0.0) * 2)
+    cycle = getattr(bot, spec['cycle'])
+    bot.tracker.start()
+    bot.journal.start()
+
+    try:
+        await run_cycles(bot, chain, cycle, warmup)
+
+        latencies = []
+        calls_before = sub.calls.copy()
+        started = time.perf_counter()
+        await run_cycles(bot, chain, cycle, cycles, latencies)
+        elapsed = time.perf_counter() - started
+        calls = sub.calls - calls_before
+
+        memory_growth = 0
+        if memory_cycles:
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            await run_cycles(bot, chain, cycle, memory_cycles)
+            after, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory_growth = after - before
+    finally:
+        await bot.tracker.stop()
+        await bot.journal.close()
+        bot.pipeline.discard()
+        journal_dir.cleanup()
+
+    return {
+        'bot': kind,
+        'cycles': cycles,
+        'cycles_per_second': cycles / elapsed if elapsed > 0 else 0.0,
+        'rpc_per_cycle': sum(calls.values()) / cycles,
+        'rpc_breakdown': {name: count / cycles for name, count in sorted(calls.items())},
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'memory_growth_kb': memory_growth / 1024,
+        'memory_growth_kb_per_1k_cycles': memory_growth / 1024 / memory_cycles * 1000 if memory_cycles else 0.0,
+        'trades': bot.trades_count,
+    }
+
+
+def print_results(results, latency):
+    table = Table(title=f"⏱️ Cycle Benchmarks ({latency * 1000:.0f} ms RPC latency)", box=box.ROUNDED, header_style="bold white on blue")
+    table.add_column("Metric", style="cyan", justify="left")
+    for result in results:
+        table.add_column(result['bot'], style="white", justify="right")
+
+    rows = [
+        ("🔁 Cycles", lambda r: str(r['cycles'])),
+        ("⚡ Cycles/s", lambda r: f"{r['cycles_per_second']:.1f}"),
+        ("📡 RPC calls/cycle", lambda r: f"{r['rpc_per_cycle']:.2f}"),
+        ("⏱️ p50 latency", lambda r: f"{r['p50_ms']:.2f} ms"),
+        ("⏱️ p99 latency", lambda r: f"{r['p99_ms']:.2f} ms"),
+        ("🧠 Memory growth", lambda r: f"{r['memory_growth_kb']:.1f} KB ({r['memory_growth_kb_per_1k_cycles']:.1f} KB/1k cycles)"),
+    ]
+    for label, value in rows:
+        table.add_row(label, *(value(result) for result in results))
+    names = sorted({name for result in results for name in result['rpc_breakdown']})
+    for name in names:
+        table.add_row(f"  📡 {name}", *(f"{result['rpc_breakdown'].get(name, 0.0):.2f}" for result in results))
+    console.print(table)
+
+
+def compare(results, baseline):
+    """Report metrics that got worse than the baseline by more than the tolerance."""
+    lower_is_better = ('rpc_per_cycle', 'p50_ms', 'p99_ms', 'memory_growth_kb_per_1k_cycles')
+    regressions = []
+    for result in results:
+        reference = baseline.get(result['bot'])
+        if not reference:
+            continue
+        if result['cycles_per_second'] < reference['cycles_per_second'] * (1 - REGRESSION_TOLERANCE):
+            regressions.append((result['bot'], 'cycles_per_second', reference['cycles_per_second'], result['cycles_per_second']))
+        for metric in lower_is_better:
+            # Ignore noise around zero (e.g. a memory baseline of a few bytes)
+            limit = max(reference[metric] * (1 + REGRESSION_TOLERANCE), reference[metric] + 0.01)
+            if result[metric] > limit:
+                regressions.append((result['bot'], metric, reference[metric], result[metric]))
+    for bot, metric, before, after in regressions:
+        console.print(f"❌ {bot} {metric} regressed: {before:.2f} → {after:.2f}")
+    if not regressions:
+        console.print("✅ No regressions against the baseline")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark bot cycles against the in-process chain simulator")
+    parser.add_argument("--bot", choices=[*BOTS, 'all'], default='all')
+    parser.add_argument("--cycles", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--memory-cycles", type=int, default=500, help="Extra cycles run under tracemalloc (0 to skip)")
+    parser.add_argument("--latency", type=float, default=20.0, help="Simulated RPC latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mean extra exponential latency in ms")
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Compare against a JSON baseline and exit 1 on regressions")
+    args = parser.parse_args()
+
+    kinds = list(BOTS) if args.bot == 'all' else [args.bot]
+    latency, jitter = args.latency / 1000, args.jitter / 1000
+    results = []
+    for kind in kinds:
+        results.append(await benchmark(kind, args.cycles, latency, jitter, args.warmup, args.memory_cycles))
+    print_results(results, latency)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({result['bot']: result for result in results}, f, indent=2)
+        console.print(f"💾 Baseline saved to {args.save}")
+    if args.compare:
+        with open(args.compare, "r") as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
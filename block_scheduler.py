@@ -0,0 +1,154 @@
+"""
+Block-Aligned Scheduler
+
+Drives the bots' evaluation loop from new block headers instead of wall-clock sleeps:
+- Subscribes to chain heads on the bot's async_subtensor connection
+- Wakes the bot once every N blocks, right after the due block arrives
+- Stops immediately when the stop event is set (no polling)
+- Counts blocks missed by the header stream and evaluations skipped while busy
+"""
+
+import asyncio
+import math
+
+from subnet_snapshot import BLOCK_TIME_SECONDS
+
+
+def interval_to_blocks(config):
+    """Resolve the evaluation interval in blocks from `interval_blocks` or `interval_seconds`."""
+    interval_blocks = getattr(config, 'interval_blocks', None)
+    if interval_blocks:
+        return max(1, int(interval_blocks))
+    return max(1, math.ceil(config.interval_seconds / BLOCK_TIME_SECONDS))
+
+
+class BlockScheduler:
+    def __init__(self, interval_blocks, stop_event):
+        self.interval_blocks = max(1, int(interval_blocks))
+        self.stop_event = stop_event
+        self.head = None
+        self.last_evaluated = None
+        self.block_listeners = []
+        self._new_head = asyncio.Event()
+        self._task = None
+
+        # Scheduling statistics
+        self.blocks_seen = 0
+        self.missed_blocks = 0
+        self.skipped_evaluations = 0
+
+    def add_listener(self, callback):
+        """Call `callback(block_number)` for every new head."""
+        self.block_listeners.append(callback)
+
+    def start(self, get_sub):
+        """Follow new heads in the background; `get_sub` returns the current connection."""
+        self._task = asyncio.create_task(self._follow(get_sub))
+
+    async def stop(self):
+        """Stop following heads."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _follow(self, get_sub):
+        """Keep a head subscription alive, re-subscribing on the current connection if it drops."""
+        while not self.stop_event.is_set():
+            try:
+                await get_sub().substrate.subscribe_block_headers(self._on_header)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Subscription dropped (e.g. during a reconnect); poll the head once and retry
+                try:
+                    self.on_block(await get_sub().get_current_block())
+                except Exception:
+                    pass
+                await self._wait_for_stop(BLOCK_TIME_SECONDS / 4)
+
+    async def _on_header(self, block_data):
+        """Subscription handler; returning a value ends the subscription."""
+        self.on_block(block_data["header"]["number"])
+        return True if self.stop_event.is_set() else None
+
+    def on_block(self, number):
+        """Record a new head and wake any waiter."""
+        if self.head is not None:
+            if number <= self.head:
+                return
+            if number > self.head + 1:
+                self.missed_blocks += number - self.head - 1
+        self.head = number
+        self.blocks_seen += 1
+        for callback in self.block_listeners:
+            callback(number)
+        self._new_head.set()
+
+    async def _wait_for_stop(self, timeout):
+        """Sleep for `timeout` seconds unless the stop event fires first."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _wait_for_head(self):
+        """Wait for the next head or the stop event, whichever comes first."""
+        self._new_head.clear()
+        head_wait = asyncio.ensure_future(self._new_head.wait())
+        stop_wait = asyncio.ensure_future(self.stop_event.wait())
+        try:
+            await asyncio.wait({head_wait, stop_wait}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            head_wait.cancel()
+            stop_wait.cancel()
+
+    async def wait_block(self):
+        """Wait for the block after the current head and return it, or None once stopped."""
+        start = self.head
+        while self.head == start:
+            if self.stop_event.is_set():
+                return None
+            await self._wait_for_head()
+        if self.stop_event.is_set():
+            return None
+        return self.head
+
+    def blocks_until_due(self):
+        """Blocks left before the next evaluation, or None if unknown."""
+        if self.head is None or self.last_evaluated is None:
+            return None
+        return max(0, self.last_evaluated + self.interval_blocks - self.head)
+
+    async def wait_next(self, on_lead=None):
+        """Wait for the next due block and return it, or None once stopped.
+
+        `on_lead` is called once when the block before the due block arrives,
+        so that slow reads can be started ahead of the wake-up.
+        """
+        while self.last_evaluated is None:
+            if self.stop_event.is_set():
+                return None
+            if self.head is not None:
+                self.last_evaluated = self.head
+                break
+            await self._wait_for_head()
+
+        due = self.last_evaluated + self.interval_blocks
+        while self.head < due:
+            if on_lead and self.head >= due - 1:
+                on_lead()
+                on_lead = None
+            if self.stop_event.is_set():
+                return None
+            await self._wait_for_head()
+        if self.stop_event.is_set():
+            return None
+
+        # Whole intervals that elapsed while the previous cycle was still running
+        self.skipped_evaluations += (self.head - due) // self.interval_blocks
+        self.last_evaluated = self.head
+        return self.head
@@ -0,0 +1,305 @@
+"""
+Bot Configuration
+
+Typed, validated configuration for the bots, with hot reload between cycles:
+- One slotted class per bot; every option has a type, a default and a range check
+- The YAML file is validated once at load, so the trading loop reads plain attributes
+- Unknown options (typos) and out-of-range values are rejected with the option's name
+- The file is watched while the bot runs; a valid change is swapped in as a whole, between cycles
+- Options tied to the wallet, the connection or the journal need a restart; a change to one of
+  them, like any invalid change, is rejected and the running config kept
+- The fleet supervisor's file is validated the same way, entry by entry
+"""
+
+import os
+import yaml
+
+from bot_logging import LEVELS, MODES, PRETTY, PRODUCTION
+from chunked_executor import DEFAULT_MAX_CHUNKS
+from profiling import DEFAULT_PROFILE_CYCLES, DEFAULT_PROFILE_DIR
+from rpc_gateway import DEFAULT_BURST
+from stake_extrinsics import BATCH_MODES, FORCE_BATCH
+from price_history import SignalSet
+from strategies import build_strategy
+from trade_journal import FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_OFF
+
+OFF = "off"
+_REQUIRED = object()
+
+
+class ConfigError(ValueError):
+    """A config file that does not describe a valid bot configuration."""
+
+
+def _positive(value):
+    return None if value > 0 else "must be greater than 0"
+
+
+def _non_negative(value):
+    return None if value >= 0 else "must be 0 or more"
+
+
+def _percent(value):
+    return None if 0 <= value < 100 else "must be a percentage from 0 to 100"
+
+
+def _port(value):
+    return None if 0 <= value <= 65535 else "must be a port number (0-65535)"
+
+
+def _one_of(*choices):
+    def check(value):
+        return None if value in choices else f"must be one of {', '.join(str(choice) for choice in choices)}"
+    return check
+
+
+def _non_empty(value):
+    return None if value else "must not be empty"
+
+
+def _signals(value):
+    try:
+        SignalSet(value, below=True)
+    except (TypeError, ValueError) as e:
+        return f"has an invalid entry ({e})"
+    return None
+
+
+class Option:
+    """One config option: its type, default, range check and whether it may change while running."""
+
+    __slots__ = ("type", "default", "check", "reloadable")
+
+    def __init__(self, type, default=_REQUIRED, check=None, reloadable=True):
+        self.type = type
+        self.default = default
+        self.check = check
+        self.reloadable = reloadable
+
+    def parse(self, name, value):
+        if value is None:
+            if self.default is _REQUIRED:
+                raise ConfigError(f"'{name}' is required")
+            return self.default
+        # YAML reads a bare `off` as false; keep it as "off" where that is a valid choice
+        if value is False and self.type is str and self.check and self.check(OFF) is None:
+            value = OFF
+        # YAML reads a whole number as int; bool is never a number here
+        if self.type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, self.type) or (isinstance(value, bool) and self.type is not bool):
+            raise ConfigError(f"'{name}' must be {self.type.__name__}, got {value!r}")
+        problem = self.check(value) if self.check else None
+        if problem:
+            raise ConfigError(f"'{name}' {problem}, got {value!r}")
+        return value
+
+
+# Options every bot takes
+COMMON_OPTIONS = {
+    'wallet': Option(str, reloadable=False),
+    'endpoints': Option(list, None, _non_empty, reloadable=False),
+    'interval_seconds': Option(float, None, _positive),
+    # Older configs give the interval in minutes; read as interval_seconds
+    'interval_minutes': Option(float, None, _positive),
+    'interval_blocks': Option(int, None, _positive),
+    'log_mode': Option(str, PRETTY, _one_of(*MODES), reloadable=False),
+    'log_level': Option(str, "info", _one_of(*LEVELS)),
+    'log_file': Option(str, None, reloadable=False),
+    # Request budget per endpoint, in requests per second (0: unlimited), and the burst above it
+    'rpc_rate_limit': Option(float, 0.0, _non_negative),
+    'rpc_burst': Option(int, DEFAULT_BURST, _positive),
+}
+
+# Options of the single-target DCA and unstaking bots
+TARGET_OPTIONS = {
+    'validator': Option(str, reloadable=False),
+    'target_netuid': Option(int, check=_non_negative, reloadable=False),
+    'max_slippage_percent': Option(float, 0.0, _percent),
+    'max_chunks': Option(int, DEFAULT_MAX_CHUNKS, _positive),
+    'journal_file': Option(str, None, reloadable=False),
+    'journal_fsync': Option(str, FSYNC_BATCH, _one_of(FSYNC_BATCH, FSYNC_ALWAYS, FSYNC_OFF), reloadable=False),
+    'trade_export': Option(str, None),
+    'metrics_port': Option(int, None, _port, reloadable=False),
+    'metrics_host': Option(str, "127.0.0.1", reloadable=False),
+    'profile_dir': Option(str, DEFAULT_PROFILE_DIR),
+    'profile_cycles': Option(int, DEFAULT_PROFILE_CYCLES, _positive),
+    # Conditions on the per-block price history, e.g. [{signal: twap, blocks: 100, margin_percent: 2}]
+    'signals': Option(list, None, _signals),
+}
+
+
+class BotConfig:
+    """Base of the typed configs; subclasses list their OPTIONS and take one slot per option."""
+
+    __slots__ = ()
+    OPTIONS = {}
+
+    @classmethod
+    def from_dict(cls, values):
+        """Build and validate a config from the parsed YAML mapping; raises ConfigError."""
+        if not isinstance(values, dict):
+            raise ConfigError("The config file must be a mapping of option: value")
+        unknown = sorted(set(values) - set(cls.OPTIONS))
+        if unknown:
+            raise ConfigError(f"Unknown option(s): {', '.join(unknown)}")
+        config = cls.__new__(cls)
+        for name, option in cls.OPTIONS.items():
+            setattr(config, name, option.parse(name, values.get(name)))
+        config.validate()
+        return config
+
+    def validate(self):
+        """Checks across options, once every option has been parsed."""
+        if self.interval_seconds is None and self.interval_minutes is not None:
+            self.interval_seconds = self.interval_minutes * 60
+        if self.interval_seconds is None and self.interval_blocks is None:
+            raise ConfigError("Set 'interval_seconds' or 'interval_blocks'")
+
+    def changes(self, other):
+        """Names of the options whose values differ in `other`."""
+        return [name for name in self.OPTIONS if getattr(self, name) != getattr(other, name)]
+
+    def restart_required(self, other):
+        """Changed options that cannot be applied to a running bot."""
+        return [name for name in self.changes(other) if not self.OPTIONS[name].reloadable]
+
+
+class DCAConfig(BotConfig):
+    OPTIONS = {
+        **COMMON_OPTIONS,
+        **TARGET_OPTIONS,
+        'purchase_amount': Option(float, check=_positive),
+        'min_balance': Option(float, 0.0, _non_negative),
+        'max_price_threshold': Option(float, 0.0, _non_negative),
+    }
+    __slots__ = tuple(OPTIONS)
+
+
+class UnstakingConfig(BotConfig):
+    OPTIONS = {
+        **COMMON_OPTIONS,
+        **TARGET_OPTIONS,
+        'unstake_amount': Option(float, check=_positive),
+        'min_price_threshold': Option(float, 0.0, _non_negative),
+        # None: no floor on the holdings left after a sale
+        'min_holdings_threshold': Option(float, None, _non_negative),
+    }
+    __slots__ = tuple(OPTIONS)
+
+
+class PortfolioConfig(BotConfig):
+    OPTIONS = {
+        **COMMON_OPTIONS,
+        'min_balance': Option(float, 0.0, _non_negative),
+        'batch_mode': Option(str, FORCE_BATCH, _one_of(*BATCH_MODES, OFF)),
+        'targets': Option(list, check=_non_empty),
+    }
+    __slots__ = tuple(OPTIONS)
+
+    def validate(self):
+        super().validate()
+        for number, target in enumerate(self.targets, 1):
+            try:
+                if not isinstance(target, dict):
+                    raise TypeError("expected a mapping")
+                build_strategy(target, self.min_balance)
+            except KeyError as e:
+                raise ConfigError(f"Target {number} is missing {e}") from None
+            except (TypeError, ValueError) as e:
+                raise ConfigError(f"Target {number}: {e}") from None
+
+
+# Bot kinds a fleet can run, by the name used in the fleet file
+BOT_CONFIGS = {'dca': DCAConfig, 'unstaking': UnstakingConfig, 'portfolio': PortfolioConfig}
+FLEET_ENTRY_KEYS = ('bot', 'config', 'password_env')
+
+
+class FleetConfig(BotConfig):
+    """The fleet supervisor's file: how to shard wallets over workers, and one entry per wallet's bot."""
+
+    OPTIONS = {
+        'wallets_per_worker': Option(int, 25, _positive),
+        'restart_delay_seconds': Option(float, 5.0, _positive),
+        'max_restart_delay_seconds': Option(float, 300.0, _positive),
+        # A worker that stayed up this long restarts with the initial delay again
+        'stable_seconds': Option(float, 600.0, _positive),
+        'stats_interval_seconds': Option(float, 60.0, _positive),
+        'log_mode': Option(str, PRODUCTION, _one_of(*MODES)),
+        'log_level': Option(str, "info", _one_of(*LEVELS)),
+        'log_dir': Option(str, None),
+        # Budget per endpoint shared by the bots of one worker; replaces the bots' own rpc_* options
+        'rpc_rate_limit': Option(float, 0.0, _non_negative),
+        'rpc_burst': Option(int, DEFAULT_BURST, _positive),
+        'bots': Option(list, check=_non_empty),
+    }
+    __slots__ = tuple(OPTIONS)
+
+    def validate(self):
+        for number, entry in enumerate(self.bots, 1):
+            if not isinstance(entry, dict):
+                raise ConfigError(f"Bot {number}: expected a mapping with bot and config")
+            unknown = sorted(set(entry) - set(FLEET_ENTRY_KEYS))
+            if unknown:
+                raise ConfigError(f"Bot {number}: unknown option(s): {', '.join(unknown)}")
+            if entry.get('bot') not in BOT_CONFIGS:
+                raise ConfigError(f"Bot {number}: 'bot' must be one of {', '.join(BOT_CONFIGS)}")
+            for key in ('config', 'password_env'):
+                if not isinstance(entry.get(key, ""), str) or (key == 'config' and not entry.get(key)):
+                    raise ConfigError(f"Bot {number}: '{key}' must be a string")
+
+
+def read_config(path, config_class):
+    """Load and validate `path` as a `config_class`; raises OSError or ConfigError."""
+    with open(path, "r") as f:
+        try:
+            values = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"Invalid YAML: {e}") from None
+    return config_class.from_dict(values if values is not None else {})
+
+
+class ConfigWatcher:
+    """Re-reads the config file when it changes; the bot polls it between cycles."""
+
+    def __init__(self, path, config_class, config):
+        self.path = path
+        self.config_class = config_class
+        self.config = config
+        self._stamp = self._stat()
+
+        # Reload statistics
+        self.reloads = 0
+        self.rejected = 0
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        """Return (new config, changed option names) if the file changed validly, else None.
+
+        Raises ConfigError for a rejected change; the file is not read again until it changes again.
+        """
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            config = read_config(self.path, self.config_class)
+        except (OSError, ConfigError) as e:
+            self.rejected += 1
+            raise ConfigError(str(e)) from None
+        restart = self.config.restart_required(config)
+        if restart:
+            self.rejected += 1
+            raise ConfigError(f"{', '.join(restart)} cannot change while the bot is running; restart to apply")
+        changed = self.config.changes(config)
+        if not changed:
+            return None
+        self.config = config
+        self.reloads += 1
+        return config, changed
@@ -0,0 +1,241 @@
+"""
+Bot Logging
+
+A non-blocking logging pipeline for the bots:
+- Call sites only put a record on a queue; a background thread formats and writes it
+- Sinks: the pretty rich console output (default) and JSON lines to stdout or a file
+- Log levels, checked before anything is queued
+- Structured events carry their values as fields; their pretty text is rendered lazily,
+  in the writer thread and only when a console sink is attached
+- Production mode writes JSON lines only, so rich rendering stays off the hot path
+- A full queue drops records (and counts them) instead of blocking the trading loop
+"""
+
+import atexit
+import io
+import json
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+PRETTY = "pretty"
+PRODUCTION = "production"
+MODES = (PRETTY, PRODUCTION)
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+DEFAULT_QUEUE_SIZE = 10000
+# Width used when a table or panel is flattened into a JSON log line
+PLAIN_TEXT_WIDTH = 120
+
+_STOP = object()
+
+
+class LogRecord:
+    __slots__ = ("created", "level", "message", "event", "fields")
+
+    def __init__(self, level, message, event=None, fields=None):
+        self.created = time.time()
+        self.level = level
+        self.message = message
+        self.event = event
+        self.fields = fields
+
+    def text(self):
+        """The record's pretty form: the message, or the event's fields rendered by it."""
+        if self.event is not None and callable(self.message):
+            return self.message(self.fields)
+        return self.message
+
+
+class RichSink:
+    """The bots' original pretty console output."""
+
+    def __init__(self, console=None):
+        if console is None:
+            from rich.console import Console
+            console = Console()
+        self.console = console
+
+    def write(self, record):
+        text = record.text()
+        if text is None:
+            self.console.print()
+        else:
+            self.console.print(text)
+
+    def flush(self):
+        self.console.file.flush()
+
+    def close(self):
+        self.flush()
+
+
+class JsonSink:
+    """One JSON object per line: timestamp, level, logger, event fields or message."""
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self.file = open(path, "a") if path else sys.stdout
+
+    def write(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            'level': LEVEL_NAMES[record.level],
+            'logger': self.name,
+        }
+        if record.event is not None:
+            entry['event'] = record.event
+            entry.update(record.fields)
+        else:
+            if record.message is None or record.message == "":
+                return
+            entry['msg'] = record.message if isinstance(record.message, str) else self.plain_text(record.message)
+        self.file.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def plain_text(renderable):
+        """Flatten a rich table or panel into plain text."""
+        from rich.console import Console
+        buffer = io.StringIO()
+        Console(file=buffer, width=PLAIN_TEXT_WIDTH, color_system=None).print(renderable)
+        return buffer.getvalue().rstrip()
+
+    def flush(self):
+        if not self.file.closed:
+            self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.path:
+            self.file.close()
+
+
+class BotLogger:
+    def __init__(self, name, level="info", sinks=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.mode = PRETTY
+        self.level = LEVELS[level]
+        self.sinks = [RichSink()] if sinks is None else list(sinks)
+        self.queue_size = queue_size
+        # SimpleQueue.put is reentrant, so logging from a signal handler cannot deadlock
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Logging statistics
+        self.written = 0
+        self.dropped = 0
+
+    def configure(self, mode=PRETTY, level="info", json_file=None):
+        """Replace the sinks: rich console (pretty) or JSON lines (production), plus an optional JSON file."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown log mode '{mode}' (expected one of {', '.join(MODES)})")
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}' (expected one of {', '.join(LEVELS)})")
+        self.close()
+        sinks = []
+        if mode == PRETTY:
+            sinks.append(RichSink())
+        elif not json_file:
+            sinks.append(JsonSink(self.name))
+        if json_file:
+            sinks.append(JsonSink(self.name, json_file))
+        self.mode = mode
+        self.level = LEVELS[level]
+        self.sinks = sinks
+
+    def set_level(self, level):
+        """Change the level without touching the sinks (e.g. on a config reload)."""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}' (expected one of {', '.join(LEVELS)})")
+        self.level = LEVELS[level]
+
+    def configure_from(self, config):
+        """Configure from the bot config's optional log_mode / log_level / log_file keys."""
+        self.configure(
+            getattr(config, 'log_mode', PRETTY),
+            getattr(config, 'log_level', "info"),
+            getattr(config, 'log_file', None),
+        )
+
+    def _emit(self, level, message, event=None, fields=None):
+        if level < self.level or not self.sinks:
+            return
+        if self._thread is None:
+            self._start()
+        if self._queue.qsize() >= self.queue_size:
+            self.dropped += 1
+            return
+        self._queue.put(LogRecord(level, message, event, fields))
+
+    def debug(self, message=None):
+        self._emit(LEVELS["debug"], message)
+
+    def info(self, message=None):
+        self._emit(LEVELS["info"], message)
+
+    def warning(self, message=None):
+        self._emit(LEVELS["warning"], message)
+
+    def error(self, message=None):
+        self._emit(LEVELS["error"], message)
+
+    def event(self, name, render, level="info", **fields):
+        """Log a structured event; `render(fields)` builds its pretty text only if a console sink needs it."""
+        self._emit(LEVELS[level], render, name, fields)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drain, name=f"{self.name}-log", daemon=True)
+                self._thread.start()
+
+    def _drain(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                return
+            if isinstance(record, threading.Event):
+                record.set()
+                continue
+            for sink in self.sinks:
+                try:
+                    sink.write(record)
+                except Exception as e:
+                    # A broken sink must not take the writer (or the bot) down
+                    sys.stderr.write(f"⚠️ {self.name} log sink {type(sink).__name__} failed: {e}\n")
+            self.written += 1
+            if self._queue.empty():
+                for sink in self.sinks:
+                    try:
+                        sink.flush()
+                    except Exception:
+                        pass
+
+    def flush(self):
+        """Block until every queued record is written (e.g. before prompting on the terminal)."""
+        if self._thread is not None:
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+
+    def close(self):
+        """Write everything still queued, stop the writer thread and close file sinks."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        for sink in self.sinks:
+            sink.close()
+
+
+def get_logger(name):
+    """A logger that is flushed and closed at interpreter exit."""
+    logger = BotLogger(name)
+    atexit.register(logger.close)
+    return logger
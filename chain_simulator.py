@@ -0,0 +1,420 @@
+"""
+Chain Simulator
+
+An in-process stand-in for `bt.async_subtensor`, so the bots can run and be measured without a network:
+- Produces blocks with drifting subnet pools (constant-product TAO/alpha reserves)
+- Keeps balances and stakes per coldkey and executes add_stake / remove_stake at the next block
+- Executes Utility force_batch / batch_all calls of stake calls
+- Holds extrinsics with future nonces until the gap is filled, like a node's transaction pool
+- Emits StakeAdded / StakeRemoved / ItemCompleted / ItemFailed / ExtrinsicFailed events like the chain does
+- Serves every RPC the bots use with configurable latency and counts each call
+"""
+
+import asyncio
+import hashlib
+import random
+from collections import Counter
+
+from lazy_imports import bittensor as bt
+from inclusion_tracker import RAO_PER_TAO
+from subnet_snapshot import BLOCK_TIME_SECONDS
+
+# Blocks between the head and the finalized head
+FINALITY_LAG = 2
+
+
+class SimulatedPool:
+    """One subnet's TAO/alpha reserves."""
+
+    __slots__ = ("netuid", "tao_in", "alpha_in")
+
+    def __init__(self, netuid, tao_in, alpha_in):
+        self.netuid = netuid
+        self.tao_in = tao_in
+        self.alpha_in = alpha_in
+
+    @property
+    def price(self):
+        return self.tao_in / self.alpha_in
+
+    def buy(self, tao):
+        alpha = self.alpha_in * tao / (self.tao_in + tao)
+        self.tao_in += tao
+        self.alpha_in -= alpha
+        return alpha
+
+    def sell(self, alpha):
+        tao = self.tao_in * alpha / (self.alpha_in + alpha)
+        self.alpha_in += alpha
+        self.tao_in -= tao
+        return tao
+
+
+class DynamicInfo:
+    """The fields of bittensor's DynamicInfo the bots read."""
+
+    __slots__ = ("netuid", "price", "tao_in", "alpha_in")
+
+    def __init__(self, pool):
+        self.netuid = pool.netuid
+        self.price = bt.Balance.from_tao(pool.price)
+        self.tao_in = bt.Balance.from_tao(pool.tao_in)
+        self.alpha_in = bt.Balance.from_tao(pool.alpha_in)
+
+
+class StakeInfo:
+    __slots__ = ("netuid", "hotkey_ss58", "coldkey_ss58", "stake")
+
+    def __init__(self, netuid, hotkey_ss58, coldkey_ss58, alpha):
+        self.netuid = netuid
+        self.hotkey_ss58 = hotkey_ss58
+        self.coldkey_ss58 = coldkey_ss58
+        self.stake = bt.Balance.from_tao(alpha)
+
+
+class SimulatedExtrinsic:
+    """A signed stake extrinsic waiting for (or included in) a block."""
+
+    __slots__ = ("extrinsic_hash", "signer", "call", "nonce")
+
+    def __init__(self, signer, call, nonce):
+        self.signer = signer
+        self.call = call
+        self.nonce = nonce
+        digest = hashlib.blake2b(f"{signer}:{nonce}:{call}".encode(), digest_size=32)
+        self.extrinsic_hash = digest.digest()
+
+
+class SimulatedReceipt:
+    __slots__ = ("extrinsic_hash",)
+
+    def __init__(self, extrinsic):
+        self.extrinsic_hash = f"0x{extrinsic.extrinsic_hash.hex()}"
+
+
+class SimulatedKey:
+    __slots__ = ("ss58_address",)
+
+    def __init__(self, ss58_address):
+        self.ss58_address = ss58_address
+
+
+class SimulatedWallet:
+    """Just enough of bt.wallet for the bots: coldkey / coldkeypub addresses."""
+
+    def __init__(self, ss58_address="5SimulatedColdkey"):
+        self.coldkey = SimulatedKey(ss58_address)
+        self.coldkeypub = self.coldkey
+        self.name = "simulated"
+
+
+def block_hash(number):
+    return f"0x{number:064x}"
+
+
+class SimulatedChain:
+    def __init__(self, subnets=None, block=1_000_000, volatility=0.002, seed=0):
+        self.block = block
+        self.volatility = volatility
+        self.random = random.Random(seed)
+        self.pools = {
+            netuid: SimulatedPool(netuid, tao_in, alpha_in)
+            for netuid, (tao_in, alpha_in) in (subnets or {1: (10_000.0, 200_000.0)}).items()
+        }
+        self.balances = {}
+        self.stakes = {}
+        self.nonces = {}
+        self.mempool = []
+        self.future = {}
+        self.blocks = {}
+        self._subscribers = []
+        self._task = None
+
+    # --- State setup ---------------------------------------------------------
+
+    def fund(self, coldkey, tao):
+        self.balances[coldkey] = self.balances.get(coldkey, 0.0) + tao
+
+    def stake(self, coldkey, hotkey, netuid, alpha):
+        key = (coldkey, hotkey, netuid)
+        self.stakes[key] = self.stakes.get(key, 0.0) + alpha
+
+    # --- Block production ----------------------------------------------------
+
+    def advance(self, blocks=1):
+        """Produce `blocks` new blocks and notify head subscribers."""
+        for _ in range(blocks):
+            self.block += 1
+            self._drift()
+            extrinsics, events = self._execute(self.mempool)
+            self.mempool = []
+            self.blocks[self.block] = {"extrinsics": extrinsics, "events": events}
+            self.blocks.pop(self.block - 256, None)
+            for queue in self._subscribers:
+                queue.put_nowait(self.block)
+        return self.block
+
+    def _drift(self):
+        """Move every pool with an outside trade of random size and direction."""
+        for pool in self.pools.values():
+            move = self.random.gauss(0.0, self.volatility)
+            if move > 0:
+                pool.buy(pool.tao_in * move)
+            elif move < 0:
+                pool.sell(pool.alpha_in * -move)
+
+    def _execute(self, mempool):
+        extrinsics, events = [], []
+        for index, extrinsic in enumerate(mempool):
+            extrinsics.append(extrinsic)
+            self.nonces[extrinsic.signer] = self.nonces.get(extrinsic.signer, 0) + 1
+            if extrinsic.call["call_module"] == "Utility":
+                call_events = self._apply_batch(extrinsic.signer, extrinsic.call)
+            else:
+                event = self._apply(extrinsic.signer, extrinsic.call)
+                call_events = None if event is None else [("SubtensorModule", *event)]
+            if call_events is None:
+                events.append(_event(index, "System", "ExtrinsicFailed", {"dispatch_error": "NotEnoughBalance"}))
+            else:
+                events.extend(_event(index, *call_event) for call_event in call_events)
+                events.append(_event(index, "System", "ExtrinsicSuccess", {}))
+        return extrinsics, events
+
+    def _apply_batch(self, signer, batch):
+        """Execute a force_batch / batch_all; returns its events, or None if batch_all reverted."""
+        saved = (
+            dict(self.balances), dict(self.stakes),
+            {netuid: (pool.tao_in, pool.alpha_in) for netuid, pool in self.pools.items()},
+        )
+        events, failures = [], 0
+        for call in batch["call_params"]["calls"]:
+            event = self._apply(signer, call)
+            if event is None:
+                failures += 1
+                events.append(("Utility", "ItemFailed", {"error": "NotEnoughBalance"}))
+            else:
+                events.append(("SubtensorModule", *event))
+                events.append(("Utility", "ItemCompleted", {}))
+        if failures and batch["call_function"] == "batch_all":
+            self.balances, self.stakes, reserves = saved
+            for netuid, (tao_in, alpha_in) in reserves.items():
+                self.pools[netuid].tao_in, self.pools[netuid].alpha_in = tao_in, alpha_in
+            return None
+        events.append(("Utility", "BatchCompletedWithErrors" if failures else "BatchCompleted", {}))
+        return events
+
+    def _apply(self, signer, call):
+        """Execute one stake call; returns (event_id, attributes) or None if it fails."""
+        params = call["call_params"]
+        pool = self.pools.get(params["netuid"])
+        if pool is None:
+            return None
+        key = (signer, params["hotkey"], params["netuid"])
+        if call["call_function"] == "add_stake":
+            tao = params["amount_staked"] / RAO_PER_TAO
+            if self.balances.get(signer, 0.0) < tao:
+                return None
+            self.balances[signer] -= tao
+            alpha = pool.buy(tao)
+            self.stakes[key] = self.stakes.get(key, 0.0) + alpha
+            event_id = "StakeAdded"
+        else:
+            alpha = params["amount_unstaked"] / RAO_PER_TAO
+            if self.stakes.get(key, 0.0) < alpha:
+                return None
+            self.stakes[key] -= alpha
+            tao = pool.sell(alpha)
+            self.balances[signer] = self.balances.get(signer, 0.0) + tao
+            event_id = "StakeRemoved"
+        attributes = [signer, params["hotkey"], int(tao * RAO_PER_TAO), int(alpha * RAO_PER_TAO), params["netuid"], 0]
+        return event_id, attributes
+
+    def start(self, block_time=BLOCK_TIME_SECONDS):
+        """Produce blocks in the background every `block_time` seconds."""
+        self._task = asyncio.create_task(self._produce(block_time))
+
+    async def _produce(self, block_time):
+        while True:
+            await asyncio.sleep(block_time)
+            self.advance()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.remove(queue)
+
+
+def _event(index, module_id, event_id, attributes):
+    return {
+        "phase": {"ApplyExtrinsic": index},
+        "extrinsic_idx": index,
+        "event": {"module_id": module_id, "event_id": event_id, "attributes": attributes},
+    }
+
+
+class SimulatedSubstrate:
+    """The AsyncSubstrateInterface calls used for direct submission, head following and inclusion tracking."""
+
+    def __init__(self, subtensor):
+        self.subtensor = subtensor
+        self.chain = subtensor.chain
+        self._nonces = {}
+
+    async def compose_call(self, call_module, call_function, call_params):
+        await self.subtensor._rpc("compose_call")
+        return {"call_module": call_module, "call_function": call_function, "call_params": dict(call_params)}
+
+    async def get_account_next_index(self, account_address, use_cache=True):
+        # Like the library: the first cached call asks the node, later ones hand out the cached value + 1
+        if use_cache and account_address in self._nonces:
+            self._nonces[account_address] += 1
+            return self._nonces[account_address]
+        await self.subtensor._rpc("get_account_next_index")
+        pending = sum(1 for extrinsic in self.chain.mempool if extrinsic.signer == account_address)
+        nonce = self.chain.nonces.get(account_address, 0) + pending
+        if use_cache:
+            self._nonces[account_address] = nonce
+        return nonce
+
+    async def create_signed_extrinsic(self, call, keypair, era=None, nonce=None):
+        signer = keypair.ss58_address
+        if nonce is None:
+            nonce = await self.get_account_next_index(signer)
+        return SimulatedExtrinsic(signer, call, nonce)
+
+    async def submit_extrinsic(self, extrinsic, wait_for_inclusion=False, wait_for_finalization=False):
+        await self.subtensor._rpc("submit_extrinsic")
+        chain = self.chain
+        if any(pending.extrinsic_hash == extrinsic.extrinsic_hash for pending in chain.mempool) \
+                or chain.future.get((extrinsic.signer, extrinsic.nonce)) is extrinsic:
+            raise ValueError("1013: Transaction Already Imported")
+        expected = chain.nonces.get(extrinsic.signer, 0)
+        expected += sum(1 for pending in chain.mempool if pending.signer == extrinsic.signer)
+        if extrinsic.nonce < expected:
+            raise ValueError("1010: Invalid Transaction: Transaction is outdated")
+        if extrinsic.nonce > expected:
+            # Held until the nonces before it arrive, like the node's future queue
+            chain.future[(extrinsic.signer, extrinsic.nonce)] = extrinsic
+            return SimulatedReceipt(extrinsic)
+        chain.mempool.append(extrinsic)
+        ready = chain.future.pop((extrinsic.signer, extrinsic.nonce + 1), None)
+        while ready is not None:
+            chain.mempool.append(ready)
+            ready = chain.future.pop((ready.signer, ready.nonce + 1), None)
+        return SimulatedReceipt(extrinsic)
+
+    async def subscribe_block_headers(self, subscription_handler):
+        queue = self.chain.subscribe()
+        try:
+            while True:
+                number = await queue.get()
+                result = await subscription_handler({"header": {"number": number}})
+                if result is not None:
+                    return result
+        finally:
+            self.chain.unsubscribe(queue)
+
+    async def get_block_hash(self, block_id):
+        await self.subtensor._rpc("get_block_hash")
+        return block_hash(block_id)
+
+    async def get_block_number(self, block_hash):
+        await self.subtensor._rpc("get_block_number")
+        return int(block_hash, 16)
+
+    async def get_chain_finalised_head(self):
+        await self.subtensor._rpc("get_chain_finalised_head")
+        return block_hash(self.chain.block - FINALITY_LAG)
+
+    async def get_block(self, block_hash=None, ignore_decoding_errors=False):
+        await self.subtensor._rpc("get_block")
+        block = self.chain.blocks.get(int(block_hash, 16))
+        return {"extrinsics": block["extrinsics"] if block else []}
+
+    async def get_events(self, block_hash=None):
+        await self.subtensor._rpc("get_events")
+        block = self.chain.blocks.get(int(block_hash, 16))
+        return block["events"] if block else []
+
+
+class SimulatedSubtensor:
+    def __init__(self, chain, latency=0.0, jitter=0.0, seed=0):
+        self.chain = chain
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.substrate = SimulatedSubstrate(self)
+
+    async def _rpc(self, name):
+        """Count one round trip and wait out its latency."""
+        self.calls[name] += 1
+        delay = self.latency
+        if self.jitter:
+            delay += self.random.expovariate(1.0 / self.jitter)
+        # Even a zero-latency call yields to the loop, like a real socket round trip
+        await asyncio.sleep(delay)
+
+    async def initialize(self):
+        await self._rpc("initialize")
+        return self
+
+    async def close(self):
+        pass
+
+    async def get_current_block(self):
+        await self._rpc("get_current_block")
+        return self.chain.block
+
+    async def subnet(self, netuid, block=None):
+        await self._rpc("subnet")
+        pool = self.chain.pools.get(netuid)
+        return DynamicInfo(pool) if pool else None
+
+    async def all_subnets(self, block_number=None):
+        await self._rpc("all_subnets")
+        return [DynamicInfo(pool) for pool in self.chain.pools.values()]
+
+    async def get_balance(self, address, block=None):
+        await self._rpc("get_balance")
+        return bt.Balance.from_tao(self.chain.balances.get(address, 0.0))
+
+    async def get_stake_for_coldkey(self, coldkey_ss58, block=None):
+        await self._rpc("get_stake_for_coldkey")
+        return [
+            StakeInfo(netuid, hotkey, coldkey, alpha)
+            for (coldkey, hotkey, netuid), alpha in self.chain.stakes.items()
+            if coldkey == coldkey_ss58 and alpha > 0
+        ]
+
+    async def _submit_stake(self, wallet, call_function, amount_param, hotkey_ss58, netuid, amount):
+        call = await self.substrate.compose_call(
+            "SubtensorModule", call_function,
+            {"hotkey": hotkey_ss58, "netuid": netuid, amount_param: amount.rao},
+        )
+        extrinsic = await self.substrate.create_signed_extrinsic(call, wallet.coldkey)
+        await self.substrate.submit_extrinsic(extrinsic)
+        return True
+
+    async def add_stake(self, wallet, hotkey_ss58, netuid, amount, wait_for_inclusion=True, wait_for_finalization=False, **kwargs):
+        return await self._submit_stake(wallet, "add_stake", "amount_staked", hotkey_ss58, netuid, amount)
+
+    async def unstake(self, wallet, hotkey_ss58, netuid, amount, wait_for_inclusion=True, wait_for_finalization=False, **kwargs):
+        return await self._submit_stake(wallet, "remove_stake", "amount_unstaked", hotkey_ss58, netuid, amount)
+
+    def rpc_calls(self):
+        """Total RPC round trips so far."""
+        return sum(self.calls.values())
+
@@ -0,0 +1,86 @@
+"""
+Chunked Executor
+
+Splits one large buy or sell into per-block chunks that each stay within a slippage bound:
+- Sizes every chunk from a fresh pool snapshot with the local AMM quote engine
+- Submits at most one chunk per block, so the pool can recover in between
+- Stops early when the price leaves the allowed range or the bot is stopped
+- Reports the quoted fill of every chunk and whatever was left unfilled
+"""
+
+from amm_quotes import max_order_size, quote
+
+DEFAULT_MAX_CHUNKS = 10
+# Remainders smaller than this are dropped instead of being sent as their own chunk
+DUST_AMOUNT = 1e-9
+
+
+class ChunkFill:
+    """One submitted chunk and its quote."""
+
+    __slots__ = ("block", "amount", "quote", "extrinsic_hash")
+
+    def __init__(self, block, amount, quote, extrinsic_hash):
+        self.block = block
+        self.amount = amount
+        self.quote = quote
+        self.extrinsic_hash = extrinsic_hash
+
+
+class ChunkedExecutor:
+    def __init__(self, max_slippage, max_chunks=DEFAULT_MAX_CHUNKS, min_chunk=0.0):
+        self.max_slippage = max_slippage
+        self.max_chunks = max(1, int(max_chunks))
+        self.min_chunk = min_chunk
+
+        # Execution statistics
+        self.orders = 0
+        self.split_orders = 0
+        self.chunks = 0
+        self.unfilled = 0.0
+        self.worst_slippage = 0.0
+
+    def next_chunk(self, snapshot, side, remaining):
+        """Size of the next chunk for `remaining`, or 0.0 if nothing fits this block."""
+        chunk = min(remaining, max_order_size(snapshot, side, self.max_slippage))
+        if chunk < remaining and chunk < self.min_chunk:
+            return 0.0
+        return chunk
+
+    async def execute(self, side, amount, snapshot, read_snapshot, submit, wait_block, price_ok=None):
+        """Work `amount` off in chunks and return (fills, unfilled amount).
+
+        `submit(chunk, quote, snapshot)` returns an extrinsic hash or None, `read_snapshot()`
+        returns the pool snapshot for the current block and `wait_block()` returns the next
+        block number, or None once the bot is stopping.
+        """
+        self.orders += 1
+        fills = []
+        remaining = amount
+
+        for _ in range(self.max_chunks):
+            if price_ok is not None and not price_ok(snapshot.price):
+                break
+            chunk = self.next_chunk(snapshot, side, remaining)
+            if chunk > 0:
+                chunk_quote = quote(snapshot, side, chunk)
+                extrinsic_hash = await submit(chunk, chunk_quote, snapshot)
+                if not extrinsic_hash:
+                    break
+                fills.append(ChunkFill(snapshot.block, chunk, chunk_quote, extrinsic_hash))
+                self.worst_slippage = max(self.worst_slippage, chunk_quote.slippage)
+                remaining -= chunk
+            if remaining <= DUST_AMOUNT:
+                remaining = 0.0
+                break
+            if await wait_block() is None:
+                break
+            snapshot = await read_snapshot()
+            if not snapshot:
+                break
+
+        self.chunks += len(fills)
+        if len(fills) > 1:
+            self.split_orders += 1
+        self.unfilled += remaining
+        return fills, remaining
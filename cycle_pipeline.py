@@ -0,0 +1,101 @@
+"""
+Cycle Pipeline
+
+Overlaps a bot cycle's network reads with each other and with the interval wait:
+- Independent reads (balance, price, holdings) are awaited concurrently
+- Slow-changing reads are prefetched one block before the cycle is due
+- Price-sensitive reads are re-issued at wake-up, pinned to the new block
+- Every stage is timed so the latency from wake-up to decision can be checked
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+
+
+class StageTimings:
+    """Count, total, last and max duration per named stage."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def record(self, stage, seconds):
+        """Add one measurement for a stage."""
+        entry = self.stages.get(stage)
+        if entry is None:
+            entry = self.stages[stage] = [0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = seconds
+        entry[3] = max(entry[3], seconds)
+
+    @contextmanager
+    def measure(self, stage):
+        """Time the enclosed block as one run of `stage`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    async def timed(self, stage, awaitable):
+        """Await `awaitable` as one run of `stage`."""
+        with self.measure(stage):
+            return await awaitable
+
+    def summary(self):
+        """Return [(stage, count, avg_ms, last_ms, max_ms)] in first-seen order."""
+        return [
+            (stage, count, total / count * 1000, last * 1000, worst * 1000)
+            for stage, (count, total, last, worst) in self.stages.items()
+        ]
+
+
+class CyclePipeline:
+    def __init__(self, prefetch_reads, fresh_reads):
+        """`prefetch_reads` and `fresh_reads` map a read name to a zero-argument coroutine function."""
+        self.prefetch_reads = prefetch_reads
+        self.fresh_reads = fresh_reads
+        self.timings = StageTimings()
+        self._prefetched = None
+
+        # Prefetch statistics
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+
+    async def _timed(self, name, read):
+        """Run one read and record its duration."""
+        with self.timings.measure(name):
+            return await read()
+
+    async def _read_group(self, reads):
+        """Run a group of reads concurrently and return {name: result}."""
+        names = list(reads)
+        results = await asyncio.gather(*(self._timed(name, reads[name]) for name in names))
+        return dict(zip(names, results))
+
+    def prefetch(self):
+        """Start the next cycle's prefetchable reads in the background."""
+        if self._prefetched is None and self.prefetch_reads:
+            self._prefetched = asyncio.ensure_future(self._read_group(self.prefetch_reads))
+
+    def discard(self):
+        """Drop any pending prefetch (e.g. after a reconnect or a trade)."""
+        if self._prefetched is not None:
+            self._prefetched.cancel()
+            self._prefetched = None
+
+    async def read(self):
+        """Return all reads for this cycle, using the prefetch when one is available."""
+        with self.timings.measure("reads"):
+            prefetched, self._prefetched = self._prefetched, None
+            if prefetched is not None:
+                self.prefetch_hits += 1
+                early = prefetched
+            else:
+                self.prefetch_misses += 1
+                early = self._read_group(self.prefetch_reads)
+
+            early_results, fresh_results = await asyncio.gather(early, self._read_group(self.fresh_reads))
+            early_results.update(fresh_results)
+            return early_results
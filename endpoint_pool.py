@@ -0,0 +1,215 @@
+"""
+Endpoint Pool
+
+Keeps warm connections to several Bittensor RPC endpoints and routes the bots to the healthiest one:
+- Connects to every configured endpoint up front so standbys are ready immediately
+- Probes latency and block height of each endpoint in the background
+- Fails over to the best warm standby without sleeping when the active endpoint errors
+- Reconnects dead endpoints in the background with per-endpoint backoff
+- Tracks failover counts and time-to-recover
+- Optionally routes every connection's calls through an RPC gateway (coalescing and a per-endpoint budget)
+"""
+
+import asyncio
+import time
+
+from lazy_imports import bittensor as bt
+
+from subnet_snapshot import BLOCK_TIME_SECONDS
+
+PROBE_TIMEOUT_SECONDS = 5.0
+# An endpoint this many blocks behind the best one is treated as unhealthy
+MAX_BLOCK_LAG = 2
+# Backoff limits for reconnecting dead endpoints in the background
+MIN_RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 60.0
+
+
+class Endpoint:
+    """One RPC endpoint and its latest health readings."""
+
+    def __init__(self, url):
+        self.url = url
+        self.sub = None
+        self.healthy = False
+        self.block = None
+        self.latency = None
+        self.failures = 0
+        self.reconnect_delay = MIN_RECONNECT_DELAY
+        self.next_reconnect_at = 0.0
+
+    @property
+    def label(self):
+        return self.url or "default"
+
+    def record_probe(self, block, latency):
+        """Store a successful probe, smoothing latency."""
+        self.block = block
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        self.healthy = True
+        self.failures = 0
+        self.reconnect_delay = MIN_RECONNECT_DELAY
+
+    def record_failure(self):
+        """Mark the endpoint down and schedule its next reconnect attempt."""
+        self.healthy = False
+        self.failures += 1
+        self.next_reconnect_at = time.monotonic() + self.reconnect_delay
+        self.reconnect_delay = min(self.reconnect_delay * 2, MAX_RECONNECT_DELAY)
+
+
+class EndpointPool:
+    def __init__(self, urls=None, probe_interval=BLOCK_TIME_SECONDS, gateway=None):
+        self.endpoints = [Endpoint(url) for url in (urls or [None])]
+        self.probe_interval = probe_interval
+        self.gateway = gateway
+        self.active = None
+        self.switch_listeners = []
+        self._probe_task = None
+        self._failing_since = None
+
+        # Failover statistics
+        self.failovers = 0
+        self.recover_times = []
+
+    @property
+    def current(self):
+        """The async_subtensor of the active endpoint."""
+        return self.active.sub if self.active else None
+
+    def add_listener(self, callback):
+        """Call `callback(endpoint)` whenever the active endpoint changes."""
+        self.switch_listeners.append(callback)
+
+    async def _connect(self, endpoint):
+        """Open (or reopen) the connection of one endpoint and probe it."""
+        if endpoint.sub is not None:
+            try:
+                await endpoint.sub.close()
+            except Exception:
+                pass
+            endpoint.sub = None
+        sub = bt.async_subtensor(network=endpoint.url) if endpoint.url else bt.async_subtensor()
+        await asyncio.wait_for(sub.initialize(), timeout=PROBE_TIMEOUT_SECONDS * 2)
+        # Probes go through the gateway too: they count against the endpoint's budget
+        endpoint.sub = self.gateway.wrap(sub, endpoint.label) if self.gateway else sub
+        await self._probe(endpoint)
+
+    async def _probe(self, endpoint):
+        """Measure block height and latency of one endpoint."""
+        started = time.perf_counter()
+        try:
+            block = await asyncio.wait_for(endpoint.sub.get_current_block(), timeout=PROBE_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure()
+            return False
+        endpoint.record_probe(block, time.perf_counter() - started)
+        return True
+
+    async def _try_connect(self, endpoint):
+        """Connect one endpoint, marking it down on failure."""
+        try:
+            await self._connect(endpoint)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            endpoint.record_failure()
+
+    def ranked(self):
+        """Healthy endpoints, best first: highest block, then lowest latency."""
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy and endpoint.sub]
+        return sorted(healthy, key=lambda endpoint: (-(endpoint.block or 0), endpoint.latency or 0.0))
+
+    def _switch(self, endpoint):
+        """Make `endpoint` active and notify listeners."""
+        self.active = endpoint
+        for callback in self.switch_listeners:
+            callback(endpoint)
+
+    async def connect(self):
+        """Connect every endpoint concurrently and activate the best one."""
+        await asyncio.gather(*(self._try_connect(endpoint) for endpoint in self.endpoints))
+        ranked = self.ranked()
+        if not ranked:
+            raise ConnectionError(f"Could not connect to any of {len(self.endpoints)} endpoints")
+        self.active = ranked[0]
+        return self.active
+
+    def start(self):
+        """Probe endpoints in the background."""
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        """Probe live endpoints, revive dead ones and move off a lagging active endpoint."""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            now = time.monotonic()
+            checks = []
+            for endpoint in self.endpoints:
+                if endpoint.sub is not None and (endpoint.healthy or endpoint is self.active):
+                    checks.append(self._probe(endpoint))
+                elif now >= endpoint.next_reconnect_at:
+                    checks.append(self._try_connect(endpoint))
+            await asyncio.gather(*checks)
+
+            ranked = self.ranked()
+            if not ranked or self.active is None:
+                continue
+            best = ranked[0]
+            lagging = self.active.block is None or best.block - self.active.block > MAX_BLOCK_LAG
+            if best is not self.active and (not self.active.healthy or lagging):
+                self.failovers += 1
+                self._switch(best)
+
+    async def failover(self):
+        """Switch to the best warm standby right away; reconnect in place if there is none."""
+        started = time.perf_counter()
+        if self._failing_since is None:
+            self._failing_since = started
+        if self.active:
+            self.active.record_failure()
+
+        standbys = [endpoint for endpoint in self.ranked() if endpoint is not self.active]
+        if standbys:
+            target = standbys[0]
+        else:
+            # No warm standby: reconnect all endpoints now and take the best that answers
+            await asyncio.gather(*(self._try_connect(endpoint) for endpoint in self.endpoints))
+            ranked = self.ranked()
+            if not ranked:
+                raise ConnectionError("No healthy endpoint available")
+            target = ranked[0]
+
+        self.failovers += 1
+        self._switch(target)
+        return target
+
+    def mark_recovered(self):
+        """Record time-to-recover once a cycle succeeds after a failover."""
+        if self._failing_since is not None:
+            self.recover_times.append(time.perf_counter() - self._failing_since)
+            self._failing_since = None
+
+    def average_recover_time(self):
+        if self.recover_times:
+            return sum(self.recover_times) / len(self.recover_times)
+        return 0.0
+
+    async def close(self):
+        """Stop probing and close every connection."""
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        for endpoint in self.endpoints:
+            if endpoint.sub is not None:
+                try:
+                    await endpoint.sub.close()
+                except Exception:
+                    pass
+                endpoint.sub = None
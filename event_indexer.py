@@ -0,0 +1,534 @@
+"""
+Event Indexer
+
+Rebuilds what a coldkey actually traded from the chain itself, in bulk instead of one trade at a time:
+- Scans a block range with many block reads in flight at once; a block's body is only fetched
+  when its events include one of ours, to name the extrinsic it came from
+- Keeps the coldkey's StakeAdded / StakeRemoved events in a local SQLite store, indexed by
+  block, by (subnet, validator) and by extrinsic hash; amounts are stored in rao, exactly
+- Commits window by window with a per-coldkey cursor, so an interrupted scan resumes after the
+  last stored block without gaps or duplicates; only finalized blocks are indexed by default
+- Reports the full trade history and the average-cost basis and realized P&L per target
+- Reconciles a bot's trade journal against the chain by extrinsic hash
+
+Usage:
+    python event_indexer.py index --wallet default --start 4500000   # first scan of a wallet
+    python event_indexer.py index --wallet default                   # resume up to the finalized head
+    python event_indexer.py report --wallet default --export trades.csv
+    python event_indexer.py reconcile --wallet default dca_journal_sn1.jsonl
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sqlite3
+import time
+
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+from lazy_imports import bittensor as bt
+from endpoint_pool import EndpointPool
+from inclusion_tracker import DROPPED, FAILED, FILL_EVENTS, RAO_PER_TAO
+from retry_policy import RetryEngine
+from rpc_gateway import DEFAULT_BURST, RpcGateway
+from strategies import BUY, SELL
+
+console = Console()
+
+DEFAULT_DB = "stake_events.db"
+DEFAULT_CONCURRENCY = 16
+# Blocks fetched per committed window; the cursor only moves past a window once all of it is stored
+WINDOW_BLOCKS = 512
+# SS58 prefix of Bittensor addresses
+SS58_FORMAT = 42
+
+SIDES = {"StakeAdded": BUY, "StakeRemoved": SELL}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stake_events (
+    coldkey TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    event_index INTEGER NOT NULL,
+    extrinsic_index INTEGER,
+    extrinsic_hash TEXT,
+    side TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    netuid INTEGER NOT NULL,
+    tao_rao INTEGER NOT NULL,
+    alpha_rao INTEGER NOT NULL,
+    PRIMARY KEY (coldkey, block, event_index)
+);
+CREATE INDEX IF NOT EXISTS stake_events_target ON stake_events (coldkey, netuid, hotkey, block);
+CREATE INDEX IF NOT EXISTS stake_events_extrinsic ON stake_events (extrinsic_hash);
+CREATE TABLE IF NOT EXISTS index_cursor (
+    coldkey TEXT PRIMARY KEY,
+    first_block INTEGER NOT NULL,
+    last_block INTEGER NOT NULL
+);
+"""
+
+EVENT_COLUMNS = "block, event_index, extrinsic_hash, side, hotkey, netuid, tao_rao, alpha_rao"
+
+
+def _account(value):
+    """An account id from a decoded event as an SS58 address, however the node's types decoded it."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)) and len(value) == 1:
+        value = value[0]
+    from scalecodec.utils.ss58 import ss58_encode
+    return ss58_encode(bytes(value), ss58_format=SS58_FORMAT)
+
+
+def parse_stake_event(event):
+    """(side, coldkey, hotkey, netuid, tao_rao, alpha_rao) of a StakeAdded / StakeRemoved event, or None."""
+    body = event["event"]
+    if body["module_id"] != "SubtensorModule" or body["event_id"] not in FILL_EVENTS:
+        return None
+    attributes = body["attributes"]
+    values = list(attributes.values()) if isinstance(attributes, dict) else list(attributes)
+    # (coldkey, hotkey, tao_amount, alpha_amount, netuid, ...)
+    return (
+        SIDES[body["event_id"]], _account(values[0]), _account(values[1]),
+        int(values[4]), int(values[2]), int(values[3])
+    )
+
+
+class StakeEvent:
+    """One indexed fill, with amounts in TAO and alpha."""
+
+    __slots__ = ("block", "event_index", "extrinsic_hash", "side", "hotkey", "netuid", "tao", "alpha")
+
+    def __init__(self, block, event_index, extrinsic_hash, side, hotkey, netuid, tao_rao, alpha_rao):
+        self.block = block
+        self.event_index = event_index
+        self.extrinsic_hash = extrinsic_hash
+        self.side = side
+        self.hotkey = hotkey
+        self.netuid = netuid
+        self.tao = tao_rao / RAO_PER_TAO
+        self.alpha = alpha_rao / RAO_PER_TAO
+
+    @property
+    def price(self):
+        return self.tao / self.alpha if self.alpha else 0.0
+
+
+class EventStore:
+    """SQLite store of stake events per coldkey, with the range of blocks indexed for each."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def cursor(self, coldkey):
+        """(first, last) block indexed for `coldkey`, or None before its first scan."""
+        row = self.db.execute(
+            "SELECT first_block, last_block FROM index_cursor WHERE coldkey = ?", (coldkey,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def add(self, coldkey, start, end, rows):
+        """Store the events of blocks `start`..`end` and move the cursor past them, in one transaction."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO stake_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(coldkey,) + row for row in rows]
+            )
+            self.db.execute(
+                "INSERT INTO index_cursor VALUES (?, ?, ?) ON CONFLICT (coldkey) DO UPDATE SET "
+                "first_block = MIN(first_block, excluded.first_block), last_block = MAX(last_block, excluded.last_block)",
+                (coldkey, start, end)
+            )
+
+    def events(self, coldkey, netuid=None, hotkey=None):
+        """The coldkey's events in chain order, optionally for one subnet and validator."""
+        query = f"SELECT {EVENT_COLUMNS} FROM stake_events WHERE coldkey = ?"
+        params = [coldkey]
+        if netuid is not None:
+            query += " AND netuid = ?"
+            params.append(netuid)
+        if hotkey is not None:
+            query += " AND hotkey = ?"
+            params.append(hotkey)
+        query += " ORDER BY block, event_index"
+        return [StakeEvent(*row) for row in self.db.execute(query, params)]
+
+    def by_extrinsic(self, coldkey):
+        """{extrinsic hash: [events]} of the coldkey."""
+        found = {}
+        for event in self.events(coldkey):
+            found.setdefault(event.extrinsic_hash, []).append(event)
+        return found
+
+    def close(self):
+        self.db.close()
+
+
+class BlockRangeIndexer:
+    """Fetches a block range with bounded concurrency and stores the coldkey's stake events."""
+
+    def __init__(self, get_sub, store, coldkey, retries, concurrency=DEFAULT_CONCURRENCY):
+        self.get_sub = get_sub
+        self.store = store
+        self.coldkey = coldkey
+        self.retries = retries
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+
+        # Scan statistics
+        self.blocks = 0
+        self.events = 0
+        self.bodies = 0
+        self.seconds = 0.0
+
+    async def fetch(self, number):
+        """Rows for the coldkey's stake events in block `number`."""
+        async with self._slots:
+            substrate = self.get_sub().substrate
+            block_hash = await self.retries.call("get_block_hash", lambda: substrate.get_block_hash(number))
+            events = await self.retries.call("get_events", lambda: substrate.get_events(block_hash=block_hash))
+            ours = []
+            for event_index, event in enumerate(events or []):
+                stake = parse_stake_event(event)
+                if stake is not None and stake[1] == self.coldkey:
+                    ours.append((event_index, event.get("extrinsic_idx"), stake))
+            if not ours:
+                return []
+
+            # Name the extrinsics the events came from, so they match the hashes the bots journal
+            block = await self.retries.call(
+                "get_block", lambda: substrate.get_block(block_hash=block_hash, ignore_decoding_errors=True)
+            )
+            self.bodies += 1
+            extrinsics = block["extrinsics"] if block else []
+        rows = []
+        for event_index, extrinsic_index, (side, _, hotkey, netuid, tao_rao, alpha_rao) in ours:
+            extrinsic_hash = None
+            if extrinsic_index is not None and extrinsic_index < len(extrinsics):
+                extrinsic = extrinsics[extrinsic_index]
+                if extrinsic is not None and extrinsic.extrinsic_hash:
+                    extrinsic_hash = f"0x{extrinsic.extrinsic_hash.hex()}"
+            rows.append((number, event_index, extrinsic_index, extrinsic_hash, side, hotkey, netuid, tao_rao, alpha_rao))
+        return rows
+
+    async def index(self, start, end, on_window=None):
+        """Index blocks `start`..`end`, committing window by window; `on_window(end_of_window)` reports progress."""
+        for window_start in range(start, end + 1, WINDOW_BLOCKS):
+            window_end = min(end, window_start + WINDOW_BLOCKS - 1)
+            started = time.perf_counter()
+            reads = [asyncio.ensure_future(self.fetch(number)) for number in range(window_start, window_end + 1)]
+            try:
+                found = await asyncio.gather(*reads)
+            except BaseException:
+                # Nothing of a failed window is stored; stop its other reads before failing over
+                for read in reads:
+                    read.cancel()
+                raise
+            rows = [row for block_rows in found for row in block_rows]
+            self.store.add(self.coldkey, window_start, window_end, rows)
+            self.seconds += time.perf_counter() - started
+            self.blocks += window_end - window_start + 1
+            self.events += len(rows)
+            if on_window:
+                on_window(window_end)
+
+    def blocks_per_second(self):
+        return self.blocks / self.seconds if self.seconds > 0 else 0.0
+
+
+class Position:
+    """Average-cost position of one (subnet, validator) target, rebuilt from its fills in chain order."""
+
+    def __init__(self):
+        self.buys = 0
+        self.sells = 0
+        self.tao_spent = 0.0
+        self.tao_received = 0.0
+        self.alpha_bought = 0.0
+        self.alpha_sold = 0.0
+        self.alpha = 0.0
+        self.cost = 0.0
+        self.realized = 0.0
+        # Alpha sold beyond what the indexed range bought (held from before it)
+        self.unmatched_alpha = 0.0
+
+    def apply(self, event):
+        if event.side == BUY:
+            self.buys += 1
+            self.tao_spent += event.tao
+            self.alpha_bought += event.alpha
+            self.alpha += event.alpha
+            self.cost += event.tao
+            return
+        self.sells += 1
+        self.tao_received += event.tao
+        self.alpha_sold += event.alpha
+        matched = min(event.alpha, self.alpha)
+        self.unmatched_alpha += event.alpha - matched
+        cost = self.average_cost() * matched
+        self.realized += event.tao * (matched / event.alpha if event.alpha else 0.0) - cost
+        self.cost -= cost
+        self.alpha -= matched
+
+    def average_cost(self):
+        """TAO paid per alpha still held."""
+        return self.cost / self.alpha if self.alpha > 0 else 0.0
+
+
+def positions(events):
+    """{(netuid, hotkey): Position} from events in chain order."""
+    held = {}
+    for event in events:
+        position = held.get((event.netuid, event.hotkey))
+        if position is None:
+            position = held[(event.netuid, event.hotkey)] = Position()
+        position.apply(event)
+    return held
+
+
+def export_events(events, path):
+    """Write the trade history to a CSV file; returns the number of rows."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("block", "extrinsic_hash", "side", "netuid", "hotkey", "tao", "alpha", "price"))
+        for event in events:
+            writer.writerow((
+                event.block, event.extrinsic_hash or "", event.side, event.netuid, event.hotkey,
+                f"{event.tao:.9f}", f"{event.alpha:.9f}", f"{event.price:.9f}"
+            ))
+    return len(events)
+
+
+def read_journal(path):
+    """Trades of a bot's trade journal, with the latest status from their corrections.
+
+    Returns ({journal seq: trade}, duplicates): trades are keyed by their journal sequence number,
+    since journals written before trade numbers stopped being reused can hold two trades under one
+    number; `duplicates` lists those numbers. A correction applies to the latest trade of its number.
+    """
+    trades = {}
+    latest = {}
+    duplicates = set()
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line torn by a crash
+                continue
+            number = entry.get('trade_number')
+            if entry.get('type') == 'trade':
+                seq = entry.get('seq', line_number)
+                if number in latest:
+                    duplicates.add(number)
+                latest[number] = seq
+                trades[seq] = {
+                    'trade_number': number,
+                    'extrinsic_hash': entry.get('extrinsic_hash'),
+                    # DCA journals record TAO spent, unstaking journals TAO earned
+                    'tao': entry.get('amount_tao', entry.get('tao_earned', 0.0)),
+                    'alpha': entry.get('alpha_amount', 0.0),
+                    'status': entry.get('status'),
+                }
+            elif entry.get('type') == 'correction' and number in latest:
+                trades[latest[number]]['status'] = entry.get('status')
+    return trades, sorted(duplicates)
+
+
+def reconcile(trades, chain):
+    """Match journal trades to chain events by extrinsic hash.
+
+    Returns (matched, missing, unexpected): matched lists (trade number, trade, events) for trades
+    found on chain; missing lists the trades the journal counts (submitted or included) that are not
+    in the store; unexpected lists the ones the journal marked failed or dropped but that did fill.
+    """
+    matched, missing, unexpected = [], [], []
+    for _, trade in sorted(trades.items()):
+        number = trade['trade_number']
+        events = chain.get(trade['extrinsic_hash']) if trade['extrinsic_hash'] else None
+        if events:
+            matched.append((number, trade, events))
+            if trade['status'] in (FAILED, DROPPED):
+                unexpected.append((number, trade, events))
+        elif trade['status'] not in (FAILED, DROPPED):
+            missing.append((number, trade))
+    return matched, missing, unexpected
+
+
+def resolve_coldkey(args):
+    """The coldkey SS58 address from --coldkey, or the public key file of --wallet (no password needed)."""
+    if args.coldkey:
+        return args.coldkey
+    return bt.wallet(name=args.wallet).coldkeypub.ss58_address
+
+
+async def run_index(args, coldkey):
+    store = EventStore(args.db)
+    pool = EndpointPool(args.endpoint, gateway=RpcGateway(args.rpc_rate_limit, args.rpc_burst))
+    try:
+        await pool.connect()
+        substrate = pool.current.substrate
+        end = args.end
+        if end is None:
+            end = await substrate.get_block_number(await substrate.get_chain_finalised_head())
+
+        indexed = store.cursor(coldkey)
+        if indexed is not None:
+            # Always continue after the last stored block, so the indexed range has no gaps
+            start = indexed[1] + 1
+            console.print(f"📂 Resuming after block {indexed[1]} (indexed {indexed[0]}–{indexed[1]})")
+        elif args.start is not None:
+            start = args.start
+        else:
+            console.print("❌ First scan of this coldkey: pass --start <block>")
+            return
+        if start > end:
+            console.print(f"✅ Already indexed up to block {end}")
+            return
+
+        console.print(f"🔎 Indexing blocks {start}–{end} for {coldkey} ({args.concurrency} concurrent reads)")
+        indexer = BlockRangeIndexer(lambda: pool.current, store, coldkey, RetryEngine(), args.concurrency)
+
+        def on_window(window_end):
+            console.print(
+                f"   {window_end}: {indexer.blocks}/{end - start + 1} blocks, {indexer.events} events, "
+                f"{indexer.blocks_per_second():.0f} blocks/s"
+            )
+
+        for attempt in range(2):
+            try:
+                # A retry carries on after the windows already stored
+                resume = store.cursor(coldkey)
+                await indexer.index(max(start, resume[1] + 1) if resume else start, end, on_window)
+                break
+            except Exception as e:
+                if attempt:
+                    raise
+                console.print(f"⚠️ Scan interrupted ({e}); failing over to another endpoint")
+                await pool.failover()
+        console.print(
+            f"✅ Indexed {indexer.blocks} blocks in {indexer.seconds:.1f}s ({indexer.blocks_per_second():.0f} blocks/s): "
+            f"{indexer.events} stake events in {indexer.bodies} blocks"
+        )
+    finally:
+        await pool.close()
+        store.close()
+
+
+def run_report(args, coldkey):
+    store = EventStore(args.db)
+    try:
+        indexed = store.cursor(coldkey)
+        if indexed is None:
+            console.print(f"❌ Nothing indexed for {coldkey} in {args.db}")
+            return
+        events = store.events(coldkey, args.netuid)
+    finally:
+        store.close()
+
+    table = Table(
+        title=f"📒 Cost Basis, blocks {indexed[0]}–{indexed[1]}", box=box.ROUNDED, header_style="bold white on blue"
+    )
+    for column in ("Subnet", "Validator", "Buys", "Sells", "TAO Spent", "TAO Received", "Alpha Held", "Avg Cost", "Realized P&L"):
+        table.add_column(column, justify="right")
+    held = positions(events)
+    for (netuid, hotkey), position in sorted(held.items()):
+        table.add_row(
+            str(netuid),
+            f"{hotkey[:8]}…",
+            str(position.buys),
+            str(position.sells),
+            f"{position.tao_spent:.6f}",
+            f"{position.tao_received:.6f}",
+            f"{position.alpha:.6f}",
+            f"{position.average_cost():.6f}",
+            f"{position.realized:+.6f}",
+        )
+    console.print(table)
+    unmatched = sum(position.unmatched_alpha for position in held.values())
+    if unmatched:
+        console.print(f"ℹ️ {unmatched:.6f} alpha sold was bought before block {indexed[0]}; its cost is not in the basis")
+    if args.export:
+        console.print(f"💾 Exported {export_events(events, args.export)} trades to {args.export}")
+
+
+def run_reconcile(args, coldkey):
+    store = EventStore(args.db)
+    try:
+        chain = store.by_extrinsic(coldkey)
+    finally:
+        store.close()
+    trades, duplicates = read_journal(args.journal)
+    matched, missing, unexpected = reconcile(trades, chain)
+
+    journal_tao = sum(trade['tao'] for _, trade, _ in matched)
+    journal_alpha = sum(trade['alpha'] for _, trade, _ in matched)
+    chain_tao = sum(event.tao for _, _, events in matched for event in events)
+    chain_alpha = sum(event.alpha for _, _, events in matched for event in events)
+
+    table = Table(title=f"🧮 Reconciliation of {args.journal}", box=box.ROUNDED, header_style="bold white on blue")
+    table.add_column("Metric", style="cyan", justify="left")
+    table.add_column("Value", style="white", justify="right")
+    table.add_row("📋 Journal Trades", str(len(trades)))
+    if duplicates:
+        table.add_row("🔁 Reused Trade Numbers", str(len(duplicates)))
+    table.add_row("✅ Found on Chain", str(len(matched)))
+    table.add_row("❓ Missing on Chain", str(len(missing)))
+    table.add_row("⚠️ Marked Failed but Filled", str(len(unexpected)))
+    table.add_row("💰 TAO (journal / chain)", f"{journal_tao:.6f} / {chain_tao:.6f}")
+    table.add_row("🪙 Alpha (journal / chain)", f"{journal_alpha:.6f} / {chain_alpha:.6f}")
+    console.print(table)
+    if duplicates:
+        shown = ", ".join(f"#{number}" for number in duplicates[:args.limit])
+        console.print(f"   🔁 Numbers held by more than one trade (each is reconciled separately): {shown}")
+    for number, trade in missing[:args.limit]:
+        console.print(f"   ❓ #{number} {trade['extrinsic_hash'] or '(no hash)'} ({trade['status']})")
+    for number, trade, events in unexpected[:args.limit]:
+        console.print(f"   ⚠️ #{number} {trade['extrinsic_hash']} marked {trade['status']}, filled in block {events[0].block}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a coldkey's stake events from the chain and rebuild its trade history")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        account = command.add_mutually_exclusive_group(required=True)
+        account.add_argument("--wallet", help="Wallet name (only its public coldkey file is read)")
+        account.add_argument("--coldkey", help="Coldkey SS58 address")
+        command.add_argument("--db", default=DEFAULT_DB, help=f"SQLite store (default: {DEFAULT_DB})")
+
+    index = commands.add_parser("index", help="Scan blocks and store the coldkey's stake events")
+    add_common(index)
+    index.add_argument("--start", type=int, help="First block of the first scan (later scans resume after the last stored block)")
+    index.add_argument("--end", type=int, help="Last block to index (default: the finalized head)")
+    index.add_argument("--endpoint", action="append", help="RPC endpoint; repeatable for failover (default: the standard network)")
+    index.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Blocks read at once")
+    index.add_argument("--rpc-rate-limit", type=float, default=0.0, help="Requests per second per endpoint (default: unlimited)")
+    index.add_argument("--rpc-burst", type=int, default=DEFAULT_BURST, help="Requests at once above the rate")
+
+    report = commands.add_parser("report", help="Cost basis and realized P&L per target from the store")
+    add_common(report)
+    report.add_argument("--netuid", type=int, help="Only this subnet")
+    report.add_argument("--export", help="Also write the trade history to this CSV file")
+
+    check = commands.add_parser("reconcile", help="Match a bot's trade journal against the stored events")
+    add_common(check)
+    check.add_argument("journal", help="A dca_journal_sn<N>.jsonl or unstaking_journal_sn<N>.jsonl file")
+    check.add_argument("--limit", type=int, default=20, help="Discrepancies listed individually")
+
+    args = parser.parse_args()
+    coldkey = resolve_coldkey(args)
+    if args.command == "index":
+        asyncio.run(run_index(args, coldkey))
+    elif args.command == "report":
+        run_report(args, coldkey)
+    else:
+        run_reconcile(args, coldkey)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Fleet Supervisor
+
+Runs the bots of many wallets from one entry point, sharded across worker processes:
+- A fleet file lists one bot (dca, unstaking or portfolio) and its config file per wallet
+- Wallets are split into shards of at most wallets_per_worker; each worker process runs its
+  shard's bots on one event loop, so memory per worker stays bounded as the fleet grows
+- Passwords are read once at startup, from a per-wallet environment variable or a prompt, and
+  handed to the workers directly (never through argv or the environment)
+- A crashed worker is restarted with exponential backoff, with the wallets of its shard that
+  had not stopped; the other workers keep running
+- Workers report every bot's session totals, and the supervisor logs them for the whole fleet
+
+Usage:
+    python fleet_supervisor.py [fleet_config.yaml]
+"""
+
+import asyncio
+import atexit
+import getpass
+import importlib
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+from lazy_imports import bittensor as bt, preload
+from bot_logging import get_logger
+from bot_config import BOT_CONFIGS, ConfigError, FleetConfig, read_config
+from rpc_gateway import RpcGateway
+from rich.panel import Panel
+from rich.table import Table
+from rich import box
+
+log = get_logger("fleet")
+
+# Bot class of each kind, imported in the workers only
+BOT_CLASSES = {
+    'dca': ("dca_bot", "DCABot"),
+    'unstaking': ("unstaking_bot", "UnstakingBot"),
+    'portfolio': ("portfolio_bot", "PortfolioBot"),
+}
+# Kinds that restore their session totals from a trade journal when restarted
+JOURNALED = ('dca', 'unstaking')
+
+# Worker -> supervisor messages: (kind, worker id, wallet, payload)
+STATS = "stats"
+FINISHED = "finished"
+
+# Wallet states
+STARTING = "starting"
+RUNNING = "running"
+STOPPED = "stopped"
+FAILED = "failed"
+CRASHED = "crashed"
+
+POLL_SECONDS = 1.0
+# Workers still running this long after a stop request are killed
+SHUTDOWN_TIMEOUT = 120.0
+
+STAT_FIELDS = ('trades', 'tao_spent', 'tao_earned', 'alpha_bought', 'alpha_sold', 'skipped_for_price', 'skipped_for_signal', 'failovers')
+
+
+class FleetEntry:
+    """One wallet's bot: its kind, its config file and the wallet named in that file."""
+
+    __slots__ = ("kind", "config_file", "wallet", "password_env", "journal_file")
+
+    def __init__(self, kind, config_file, wallet, password_env, journal_file=None):
+        self.kind = kind
+        self.config_file = config_file
+        self.wallet = wallet
+        self.password_env = password_env
+        self.journal_file = journal_file
+
+
+def journal_file(kind, config):
+    """The trade journal of a fleet entry's bot, or None for kinds without one.
+
+    Without a `journal_file` in its config, a bot's journal is named after its wallet and validator
+    too, since the single-bot default (per subnet only) would be shared by bots on the same subnet.
+    """
+    if kind not in JOURNALED:
+        return None
+    if config.journal_file:
+        return config.journal_file
+    return f"{kind}_journal_{config.wallet}_{config.validator[:8]}_sn{config.target_netuid}.jsonl"
+
+
+def password_variable(wallet):
+    """Default environment variable holding `wallet`'s password, e.g. WALLET_PASSWORD_MY_WALLET."""
+    return "WALLET_PASSWORD_" + "".join(c if c.isalnum() else "_" for c in wallet).upper()
+
+
+def add_stats(total, stats):
+    for field in STAT_FIELDS:
+        total[field] = total.get(field, 0) + stats.get(field, 0)
+    return total
+
+
+def worker_main(worker_id, entries, passwords, messages, settings):
+    """Worker process entry point: run the shard's bots on one event loop.
+
+    Exits with status 1 if a bot crashed, so the supervisor restarts the shard's unfinished wallets.
+    """
+    crashed = asyncio.run(run_shard(worker_id, entries, passwords, messages, settings))
+    listener = getattr(bt.logging, "_listener", None) if bt.loaded else None
+    if listener is not None:
+        # bittensor's log listener reads a multiprocessing queue that a worker tears down before
+        # its atexit handlers run; stop it while the queue is still open
+        listener.stop()
+        atexit.unregister(listener.stop)
+    sys.exit(1 if crashed else 0)
+
+
+async def run_shard(worker_id, entries, passwords, messages, settings):
+    """Run every bot of the shard until all have stopped; returns True if one of them crashed."""
+    preload(bt)
+    bots = {}
+    configured = set()
+    # One gateway for the shard: reads its bots make at the same time are sent once, under one budget per endpoint
+    gateway = RpcGateway(settings['rpc_rate_limit'], settings['rpc_burst'])
+    for entry in entries:
+        try:
+            module_name, class_name = BOT_CLASSES[entry.kind]
+            module = importlib.import_module(module_name)
+            if module_name not in configured:
+                # One JSON file per worker and bot module, so writer threads never share a file
+                json_file = None
+                if settings['log_dir']:
+                    json_file = os.path.join(settings['log_dir'], f"worker{worker_id}_{module.log.name}.jsonl")
+                module.log.configure(settings['log_mode'], settings['log_level'], json_file)
+                configured.add(module_name)
+            config = read_config(entry.config_file, BOT_CONFIGS[entry.kind])
+            bot_class = getattr(module, class_name)
+            options = {'journal_file': entry.journal_file} if entry.journal_file else {}
+            bots[entry.wallet] = bot_class(
+                config, entry.config_file, password=passwords.pop(entry.wallet, None), gateway=gateway, **options
+            )
+        except Exception as e:
+            messages.put((FINISHED, worker_id, entry.wallet, {'status': FAILED, 'error': str(e), 'stats': None}))
+    passwords.clear()
+
+    def stop_all():
+        for bot in bots.values():
+            bot.stop()
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_all)
+
+    async def report_stats():
+        while True:
+            await asyncio.sleep(settings['stats_interval'])
+            for wallet, bot in bots.items():
+                messages.put((STATS, worker_id, wallet, bot.session_stats()))
+
+    async def run_bot(wallet, bot):
+        try:
+            await bot.run()
+        except Exception as e:
+            messages.put((FINISHED, worker_id, wallet, {
+                'status': CRASHED, 'error': f"{type(e).__name__}: {e}", 'stats': bot.session_stats()
+            }))
+            # Take the shard down so the supervisor restarts it; the other bots stop cleanly first
+            stop_all()
+            return True
+        # run() returns before creating the scheduler when the wallet or the connection failed
+        status, error = (STOPPED, None) if bot.scheduler else (FAILED, "wallet or connection failed (see worker log)")
+        messages.put((FINISHED, worker_id, wallet, {'status': status, 'error': error, 'stats': bot.session_stats()}))
+        return False
+
+    reporter = asyncio.create_task(report_stats())
+    try:
+        crashed = await asyncio.gather(*(run_bot(wallet, bot) for wallet, bot in bots.items()))
+    finally:
+        reporter.cancel()
+    return any(crashed)
+
+
+class Worker:
+    """One worker process and its shard, across restarts."""
+
+    def __init__(self, worker_id, shard):
+        self.worker_id = worker_id
+        self.shard = shard
+        # The shard's wallets the current process runs
+        self.entries = []
+        self.process = None
+        self.started_at = None
+        self.restart_at = None
+        self.delay = None
+        self.done = False
+
+        # Worker statistics
+        self.restarts = 0
+        self.crashes = 0
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.exitcode is None
+
+
+class FleetSupervisor:
+    def __init__(self, fleet, entries, passwords):
+        self.fleet = fleet
+        self.passwords = passwords
+        # Spawned, not forked: a worker gets only its own shard's passwords, and no copy of the
+        # supervisor's threads or memory
+        self.context = multiprocessing.get_context("spawn")
+        self.messages = self.context.Queue()
+        size = fleet.wallets_per_worker
+        self.workers = [
+            Worker(number, entries[start:start + size])
+            for number, start in enumerate(range(0, len(entries), size))
+        ]
+        self.kinds = {entry.wallet: entry.kind for entry in entries}
+        self.status = {entry.wallet: STARTING for entry in entries}
+        # Latest session totals per wallet, plus the totals of earlier runs that a restart does not restore
+        self.stats = {}
+        self.carried = {}
+        self.running = True
+        self.stop_requested = False
+        self.stopped_at = None
+        self.start_time = time.time()
+        self.settings = {
+            'log_mode': fleet.log_mode,
+            'log_level': fleet.log_level,
+            'log_dir': fleet.log_dir,
+            'stats_interval': fleet.stats_interval_seconds,
+            'rpc_rate_limit': fleet.rpc_rate_limit,
+            'rpc_burst': fleet.rpc_burst,
+        }
+
+    def start_worker(self, worker):
+        """Start `worker` with the wallets of its shard that have not stopped or failed for good."""
+        worker.entries = [entry for entry in worker.shard if self.status[entry.wallet] not in (STOPPED, FAILED)]
+        if not worker.entries:
+            worker.done = True
+            return
+        passwords = {entry.wallet: self.passwords[entry.wallet] for entry in worker.entries}
+        worker.process = self.context.Process(
+            target=worker_main,
+            args=(worker.worker_id, worker.entries, passwords, self.messages, self.settings),
+            name=f"fleet-worker-{worker.worker_id}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        for entry in worker.entries:
+            self.status[entry.wallet] = RUNNING
+
+    def on_worker_exit(self, worker):
+        """Handle a worker process that has exited: done, or scheduled for a restart with backoff."""
+        process, worker.process = worker.process, None
+        # Everything the worker sent before exiting is read before deciding
+        self.drain()
+        if process.exitcode == 0 or not self.running:
+            worker.done = True
+            return
+
+        worker.crashes += 1
+        uptime = time.monotonic() - worker.started_at
+        if worker.delay is None or uptime >= self.fleet.stable_seconds:
+            worker.delay = self.fleet.restart_delay_seconds
+        else:
+            worker.delay = min(worker.delay * 2, self.fleet.max_restart_delay_seconds)
+        worker.restart_at = time.monotonic() + worker.delay
+
+        unfinished = [entry.wallet for entry in worker.entries if self.status[entry.wallet] not in (STOPPED, FAILED)]
+        for wallet in unfinished:
+            self.status[wallet] = CRASHED
+            # A restarted journaled bot reports its earlier totals again; other bots start from zero
+            if self.kinds[wallet] not in JOURNALED and wallet in self.stats:
+                add_stats(self.carried.setdefault(wallet, {}), self.stats.pop(wallet))
+        log.warning(
+            f"💥 Worker {worker.worker_id} exited with status {process.exitcode}; "
+            f"restarting {len(unfinished)} wallets in {worker.delay:.0f}s"
+        )
+
+    def check_workers(self):
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.done:
+                continue
+            if worker.process is not None:
+                if worker.alive:
+                    if self.stopped_at is not None and now - self.stopped_at > SHUTDOWN_TIMEOUT:
+                        log.warning(f"⚠️ Worker {worker.worker_id} did not stop in {SHUTDOWN_TIMEOUT:.0f}s; killing it")
+                        worker.process.kill()
+                    continue
+                self.on_worker_exit(worker)
+            if not self.running:
+                worker.done = True
+            elif worker.restart_at is not None and now >= worker.restart_at:
+                worker.restarts += 1
+                self.start_worker(worker)
+
+    def handle(self, message):
+        kind, worker_id, wallet, payload = message
+        if kind == STATS:
+            self.stats[wallet] = payload
+            return
+        self.status[wallet] = payload['status']
+        if payload['stats'] is not None:
+            self.stats[wallet] = payload['stats']
+        if payload['status'] == STOPPED:
+            log.info(f"🛑 {wallet} ({self.kinds[wallet]}) stopped")
+        elif payload['status'] == FAILED:
+            log.error(f"❌ {wallet} ({self.kinds[wallet]}) could not start: {payload['error']}")
+        else:
+            log.error(f"💥 {wallet} ({self.kinds[wallet]}) crashed in worker {worker_id}: {payload['error']}")
+
+    def drain(self, timeout=0.0):
+        """Handle every queued worker message, waiting up to `timeout` for the first one."""
+        try:
+            message = self.messages.get(timeout=timeout) if timeout else self.messages.get_nowait()
+            while True:
+                self.handle(message)
+                message = self.messages.get_nowait()
+        except queue.Empty:
+            pass
+
+    def totals(self):
+        """Session totals of the whole fleet."""
+        total = {}
+        for stats in list(self.carried.values()) + list(self.stats.values()):
+            add_stats(total, stats)
+        return total
+
+    def count(self, status):
+        return sum(1 for value in self.status.values() if value == status)
+
+    def log_totals(self):
+        total = self.totals()
+        log.event(
+            'fleet', lambda f: (
+                f"🛰️ Fleet: {f['workers_alive']}/{f['workers']} workers, {f['wallets_running']}/{f['wallets']} wallets running | "
+                f"{f['trades']} trades | spent {f['tao_spent']:.4f} TAO, earned {f['tao_earned']:.4f} TAO | "
+                f"{f['worker_restarts']} worker restarts"
+            ),
+            workers=len(self.workers), workers_alive=sum(1 for worker in self.workers if worker.alive),
+            wallets=len(self.status), wallets_running=self.count(RUNNING),
+            worker_restarts=sum(worker.restarts for worker in self.workers),
+            **{field: total.get(field, 0) for field in STAT_FIELDS}
+        )
+
+    def stop(self):
+        """Stop every worker gracefully; their bots print their own summaries."""
+        self.running = False
+        self.stopped_at = time.monotonic()
+        for worker in self.workers:
+            worker.restart_at = None
+            if worker.alive:
+                worker.process.terminate()
+
+    def run(self):
+        for worker in self.workers:
+            self.start_worker(worker)
+        log.info(Panel(
+            f"👛 Wallets: {len(self.status)}\n"
+            f"⚙️ Workers: {len(self.workers)} (up to {self.fleet.wallets_per_worker} wallets each)",
+            title="Fleet Configuration",
+            style="bold cyan"
+        ))
+        next_report = time.monotonic() + self.fleet.stats_interval_seconds
+        while not all(worker.done for worker in self.workers):
+            if self.stop_requested and self.running:
+                log.info("🛑 Stopping all workers...")
+                self.stop()
+            self.drain(POLL_SECONDS)
+            self.check_workers()
+            if time.monotonic() >= next_report:
+                self.log_totals()
+                next_report += self.fleet.stats_interval_seconds
+        self.drain()
+        self.print_summary()
+
+    def print_summary(self):
+        session_duration = time.time() - self.start_time
+        hours = int(session_duration // 3600)
+        minutes = int((session_duration % 3600) // 60)
+        seconds = int(session_duration % 60)
+        total = self.totals()
+
+        table = Table(title="🛰️ Fleet Session Summary", box=box.ROUNDED, header_style="bold white on blue")
+        table.add_column("Metric", style="cyan", justify="left")
+        table.add_column("Value", style="white", justify="right")
+        table.add_row("⏱️ Session Duration", f"{hours}h {minutes}m {seconds}s")
+        table.add_row("👛 Wallets", str(len(self.status)))
+        table.add_row(
+            "📋 Wallet Outcomes",
+            f"{self.count(STOPPED)} stopped, {self.count(FAILED)} failed, {self.count(CRASHED)} crashed"
+        )
+        table.add_row("⚙️ Workers", str(len(self.workers)))
+        table.add_row("🔁 Worker Restarts", str(sum(worker.restarts for worker in self.workers)))
+        table.add_row("🔢 Total Trades", str(total.get('trades', 0)))
+        table.add_row("💰 TAO Spent / Earned", f"{total.get('tao_spent', 0):.6f} / {total.get('tao_earned', 0):.6f} TAO")
+        table.add_row("🪙 Alpha Bought / Sold", f"{total.get('alpha_bought', 0):.6f} / {total.get('alpha_sold', 0):.6f} alpha")
+        table.add_row("⏸️ Skipped for Price", str(total.get('skipped_for_price', 0)))
+        table.add_row("🚦 Skipped for Signals", str(total.get('skipped_for_signal', 0)))
+        table.add_row("🔀 Failovers", str(total.get('failovers', 0)))
+
+        workers = Table(title="⚙️ Workers", box=box.ROUNDED, header_style="bold white on magenta")
+        for column in ("Worker", "Wallets", "Crashes", "Restarts", "Trades"):
+            workers.add_column(column, justify="right")
+        for worker in self.workers:
+            trades = sum(
+                self.stats.get(entry.wallet, {}).get('trades', 0) + self.carried.get(entry.wallet, {}).get('trades', 0)
+                for entry in worker.shard
+            )
+            workers.add_row(str(worker.worker_id), str(len(worker.shard)), str(worker.crashes), str(worker.restarts), str(trades))
+
+        log.info()
+        log.info(table)
+        log.info()
+        log.info(workers)
+
+
+def load_fleet(path):
+    """Read the fleet file and validate every bot config it lists; returns (fleet, entries) or None."""
+    try:
+        fleet = read_config(path, FleetConfig)
+        # Bot config paths are relative to the fleet file
+        base = os.path.dirname(os.path.abspath(path))
+        entries = []
+        wallets = set()
+        journals = {}
+        for item in fleet.bots:
+            config_file = os.path.join(base, item['config'])
+            try:
+                config = read_config(config_file, BOT_CONFIGS[item['bot']])
+            except ConfigError as e:
+                raise ConfigError(f"{item['config']}: {e}") from None
+            if config.wallet in wallets:
+                # Two bots on one coldkey would race each other's nonces
+                raise ConfigError(
+                    f"Wallet '{config.wallet}' is listed twice; run one bot per wallet "
+                    f"(the portfolio bot runs many targets)"
+                )
+            wallets.add(config.wallet)
+            journal = journal_file(item['bot'], config)
+            if journal:
+                # Two bots appending to one journal would also resume each other's totals
+                other = journals.setdefault(os.path.abspath(journal), config.wallet)
+                if other != config.wallet:
+                    raise ConfigError(f"Wallets '{other}' and '{config.wallet}' both write the journal '{journal}'")
+            entries.append(FleetEntry(
+                item['bot'], config_file, config.wallet, item.get('password_env') or password_variable(config.wallet),
+                journal
+            ))
+        return fleet, entries
+    except FileNotFoundError as e:
+        log.error(Panel(f"❌ Config file '{e.filename}' not found!", title="Error", style="bold red"))
+        return None
+    except Exception as e:
+        log.error(Panel(f"❌ Error loading fleet: {e}", title="Error", style="bold red"))
+        return None
+
+
+def collect_passwords(entries):
+    """Every wallet's password, from its environment variable or else a prompt."""
+    passwords = {}
+    for entry in entries:
+        password = os.environ.get(entry.password_env)
+        if password is None:
+            log.flush()
+            password = getpass.getpass(f"🔐 Enter password for wallet '{entry.wallet}' (or set {entry.password_env}): ")
+        passwords[entry.wallet] = password
+    return passwords
+
+
+def signal_handler(supervisor):
+    """Handle interrupt signals gracefully."""
+    def handler(signum, frame):
+        log.info("\n🛑 Received stop signal...")
+        supervisor.stop_requested = True
+    return handler
+
+
+def main():
+    """Main entry point."""
+    log.info(Panel("🛰️ Subnet Alpha Fleet Supervisor Starting...", title="Welcome", style="bold cyan"))
+
+    loaded = load_fleet(sys.argv[1] if len(sys.argv) > 1 else "fleet_config.yaml")
+    if not loaded:
+        return
+    fleet, entries = loaded
+    json_file = os.path.join(fleet.log_dir, "supervisor.jsonl") if fleet.log_dir else None
+    if fleet.log_dir:
+        os.makedirs(fleet.log_dir, exist_ok=True)
+    log.configure(fleet.log_mode, fleet.log_level, json_file)
+
+    passwords = collect_passwords(entries)
+    supervisor = FleetSupervisor(fleet, entries, passwords)
+    del passwords
+
+    signal.signal(signal.SIGINT, signal_handler(supervisor))
+    signal.signal(signal.SIGTERM, signal_handler(supervisor))
+
+    supervisor.run()
+
+if __name__ == "__main__":
+    main()
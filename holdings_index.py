@@ -0,0 +1,81 @@
+"""
+Holdings Index
+
+An O(1) map of a coldkey's alpha positions shared by the trading bots:
+- Built from a single get_stake_for_coldkey() read, at most once per block
+- Keyed by (netuid, hotkey) so every lookup is a dict access, not a scan
+- Adjusted locally from our own submitted trades between refreshes
+"""
+
+
+class HoldingsIndex:
+    def __init__(self):
+        self.block = None
+        self._positions = {}
+        self._pending = {}
+        self._stale = True
+
+        # Refresh statistics
+        self.refreshes = 0
+        self.lookups = 0
+
+    def set_block(self, block):
+        """Mark the index stale once a new block arrives."""
+        if block != self.block:
+            self.block = block
+            self._stale = True
+
+    def invalidate(self):
+        """Force the next lookup to refresh (e.g. after a reconnect)."""
+        self._stale = True
+
+    @property
+    def loaded(self):
+        """True once the index has been built at least once."""
+        return self.refreshes > 0
+
+    def load(self, stakes):
+        """Rebuild the index from a get_stake_for_coldkey() result read at the current block."""
+        positions = {}
+        for stake in stakes or []:
+            key = (stake.netuid, stake.hotkey_ss58)
+            positions[key] = positions.get(key, 0.0) + float(stake.stake)
+        self._positions = positions
+
+        # Trades submitted before this block are included in the read; keep the rest
+        pending = {}
+        for key, trades in self._pending.items():
+            kept = [
+                (block, delta) for block, delta in trades
+                if block is not None and self.block is not None and block >= self.block
+            ]
+            if kept:
+                pending[key] = kept
+        self._pending = pending
+        self._stale = False
+        self.refreshes += 1
+
+    async def refresh(self, sub, coldkey_ss58):
+        """Reload the index if a new block arrived since the last read."""
+        if self._stale:
+            self.load(await sub.get_stake_for_coldkey(coldkey_ss58=coldkey_ss58))
+
+    def apply_trade(self, netuid, hotkey, alpha_delta):
+        """Adjust a position by our own submitted trade until the next refresh."""
+        self._pending.setdefault((netuid, hotkey), []).append((self.block, alpha_delta))
+
+    def get(self, netuid, hotkey):
+        """Alpha held with `hotkey` on `netuid`, including trades not yet seen on chain."""
+        self.lookups += 1
+        key = (netuid, hotkey)
+        held = self._positions.get(key, 0.0)
+        for block, delta in self._pending.get(key, ()):
+            held += delta
+        return max(0.0, held)
+
+    def positions(self):
+        """Return {(netuid, hotkey): alpha} including pending trades."""
+        merged = dict(self._positions)
+        for key, trades in self._pending.items():
+            merged[key] = max(0.0, merged.get(key, 0.0) + sum(delta for block, delta in trades))
+        return merged
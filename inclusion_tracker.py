@@ -0,0 +1,281 @@
+"""
+Inclusion Tracker
+
+Follows submitted stake extrinsics in the background without blocking the trading loop:
+- Scans each new block for the hashes of our pending extrinsics
+- Reads the StakeAdded / StakeRemoved events of included extrinsics to get the real fill
+- Detects failed extrinsics and ones dropped after their mortal era expires
+- Attributes the fill of every call in a batched extrinsic to its own order
+- Marks fills finalized once the finalized head passes their block
+- Hands every outcome to a callback so the bots can correct their trade records
+"""
+
+import asyncio
+
+from stake_extrinsics import MORTAL_ERA_PERIOD
+
+RAO_PER_TAO = 1e9
+
+PENDING = "pending"
+INCLUDED = "included"
+FAILED = "failed"
+DROPPED = "dropped"
+
+FILL_EVENTS = {"StakeAdded", "StakeRemoved"}
+# Utility events closing one call of a batch; the call's own events come right before them
+ITEM_EVENTS = {"ItemCompleted": INCLUDED, "ItemFailed": FAILED}
+
+
+class TrackedExtrinsic:
+    """One submitted stake extrinsic and what actually happened to it."""
+
+    def __init__(self, extrinsic_hash, side, netuid, hotkey, submitted_block, on_result, batch_index=None):
+        self.extrinsic_hash = extrinsic_hash
+        self.side = side
+        self.netuid = netuid
+        self.hotkey = hotkey
+        # Position of the call within a batched extrinsic; a batch itself has `items` instead
+        self.batch_index = batch_index
+        self.items = None
+        self.submitted_block = submitted_block
+        self.next_block = submitted_block
+        self.on_result = on_result
+        self.status = PENDING
+        self.finalized = False
+        self.block = None
+        self.tao_amount = None
+        self.alpha_amount = None
+        self.error = None
+
+    @property
+    def price(self):
+        """Effective TAO per alpha of the fill."""
+        if self.alpha_amount:
+            return self.tao_amount / self.alpha_amount
+        return None
+
+
+def _dispatch_error(body):
+    attributes = body["attributes"]
+    if isinstance(attributes, dict):
+        return attributes.get("dispatch_error") or attributes.get("error")
+    return attributes
+
+
+def parse_fill(event):
+    """Return (tao, alpha) from a StakeAdded / StakeRemoved event, or None."""
+    body = event["event"]
+    if body["module_id"] != "SubtensorModule" or body["event_id"] not in FILL_EVENTS:
+        return None
+    attributes = body["attributes"]
+    if isinstance(attributes, dict):
+        values = list(attributes.values())
+    else:
+        values = list(attributes)
+    # (coldkey, hotkey, tao_amount, alpha_amount, netuid, ...)
+    return int(values[2]) / RAO_PER_TAO, int(values[3]) / RAO_PER_TAO
+
+
+class InclusionTracker:
+    def __init__(self, get_sub, max_wait_blocks=MORTAL_ERA_PERIOD):
+        self.get_sub = get_sub
+        self.max_wait_blocks = max_wait_blocks
+        self.head = None
+        self.pending = {}
+        self.awaiting_finality = []
+        self.listeners = []
+        self._new_head = asyncio.Event()
+        self._task = None
+
+        # Tracking statistics
+        self.tracked = 0
+        self.included = 0
+        self.failed = 0
+        self.dropped = 0
+        self.finalized = 0
+        self.inclusion_blocks = 0
+
+    def add_listener(self, callback):
+        """Call `callback(tracked)` once for every extrinsic (or batch) that is settled or dropped."""
+        self.listeners.append(callback)
+
+    def on_block(self, number):
+        """Block listener: wake the background scanner."""
+        self.head = number
+        self._new_head.set()
+
+    def track(self, extrinsic_hash, side, netuid, hotkey, on_result, submitted_block=None):
+        """Start following a submitted extrinsic; `on_result(tracked)` is called on every outcome."""
+        if not extrinsic_hash:
+            return None
+        block = submitted_block if submitted_block is not None else (self.head or 0)
+        tracked = TrackedExtrinsic(extrinsic_hash, side, netuid, hotkey, block, on_result)
+        self.pending[extrinsic_hash] = tracked
+        self.tracked += 1
+        self._new_head.set()
+        return tracked
+
+    def track_batch(self, extrinsic_hash, orders, submitted_block=None):
+        """Follow a batched extrinsic; `orders` lists (side, netuid, hotkey, on_result) in call order.
+
+        Every call is reported on its own, with its own fill, through its `on_result`.
+        """
+        if not extrinsic_hash:
+            return None
+        block = submitted_block if submitted_block is not None else (self.head or 0)
+        batch = TrackedExtrinsic(extrinsic_hash, None, None, None, block, None)
+        batch.items = [
+            TrackedExtrinsic(extrinsic_hash, side, netuid, hotkey, block, on_result, batch_index=index)
+            for index, (side, netuid, hotkey, on_result) in enumerate(orders)
+        ]
+        self.pending[extrinsic_hash] = batch
+        self.tracked += len(batch.items)
+        self._new_head.set()
+        return batch
+
+    def start(self):
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _worker(self):
+        """Scan new blocks whenever there is something to follow."""
+        while True:
+            await self._new_head.wait()
+            self._new_head.clear()
+            if self.head is None or not (self.pending or self.awaiting_finality):
+                continue
+            try:
+                await self._scan()
+                await self._check_finality()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Connection trouble; the cursors are unchanged so the next head retries
+                pass
+
+    async def _scan(self):
+        """Look for pending extrinsics in every block they could have landed in."""
+        substrate = self.get_sub().substrate
+        blocks = {}
+        for tracked in list(self.pending.values()):
+            while tracked.next_block <= self.head and tracked.status == PENDING:
+                number = tracked.next_block
+                if number not in blocks:
+                    block_hash = await substrate.get_block_hash(number)
+                    block = await substrate.get_block(block_hash=block_hash, ignore_decoding_errors=True)
+                    hashes = {}
+                    for index, extrinsic in enumerate(block["extrinsics"] if block else []):
+                        if extrinsic is not None and extrinsic.extrinsic_hash:
+                            hashes[f"0x{extrinsic.extrinsic_hash.hex()}"] = index
+                    blocks[number] = (block_hash, hashes, None)
+
+                block_hash, hashes, events = blocks[number]
+                if tracked.extrinsic_hash in hashes:
+                    if events is None:
+                        events = await substrate.get_events(block_hash=block_hash)
+                        blocks[number] = (block_hash, hashes, events)
+                    self._settle(tracked, number, hashes[tracked.extrinsic_hash], events)
+                    break
+                tracked.next_block = number + 1
+
+            if tracked.status == PENDING and self.head - tracked.submitted_block > self.max_wait_blocks:
+                for item in tracked.items or (tracked,):
+                    item.status = DROPPED
+                    self.dropped += 1
+                tracked.status = DROPPED
+                self._finish(tracked)
+
+    def _settle(self, tracked, number, index, events):
+        """Record the outcome of an included extrinsic from its events."""
+        tracked.block = number
+        tracked.status = INCLUDED
+        own_events = [event for event in events if event.get("extrinsic_idx") == index]
+        if tracked.items is not None:
+            self._settle_batch(tracked, number, own_events)
+            self._finish(tracked)
+            return
+        for event in own_events:
+            body = event["event"]
+            if body["module_id"] == "System" and body["event_id"] == "ExtrinsicFailed":
+                tracked.status = FAILED
+                tracked.error = _dispatch_error(body)
+            fill = parse_fill(event)
+            if fill is not None:
+                tracked.tao_amount, tracked.alpha_amount = fill
+        self._count(tracked)
+        self._finish(tracked)
+
+    def _settle_batch(self, batch, number, events):
+        """Give every call of a batch the fill events that precede its ItemCompleted / ItemFailed."""
+        items = iter(batch.items)
+        fill = None
+        for event in events:
+            body = event["event"]
+            if body["module_id"] == "System" and body["event_id"] == "ExtrinsicFailed":
+                # batch_all reverted every call
+                batch.status = FAILED
+                batch.error = _dispatch_error(body)
+            elif body["module_id"] == "Utility" and body["event_id"] in ITEM_EVENTS:
+                item = next(items, None)
+                if item is None:
+                    continue
+                item.status = ITEM_EVENTS[body["event_id"]]
+                if item.status == FAILED:
+                    item.error = _dispatch_error(body)
+                elif fill is not None:
+                    item.tao_amount, item.alpha_amount = fill
+                fill = None
+            else:
+                fill = parse_fill(event) or fill
+        for item in batch.items:
+            item.block = number
+            if item.status == PENDING or batch.status == FAILED:
+                # Never reached (interrupted batch) or reverted with the whole batch
+                item.status = FAILED
+                item.error = item.error or batch.error
+            self._count(item)
+
+    def _count(self, tracked):
+        if tracked.status == INCLUDED:
+            self.included += 1
+            self.inclusion_blocks += tracked.block - tracked.submitted_block
+            self.awaiting_finality.append(tracked)
+        else:
+            self.failed += 1
+
+    def _finish(self, tracked):
+        """Stop following an extrinsic and report its outcome (per call for a batch)."""
+        self.pending.pop(tracked.extrinsic_hash, None)
+        for callback in self.listeners:
+            callback(tracked)
+        for item in tracked.items or (tracked,):
+            if item.on_result:
+                item.on_result(item)
+
+    async def _check_finality(self):
+        """Mark included fills finalized once the finalized head passes them."""
+        if not self.awaiting_finality:
+            return
+        substrate = self.get_sub().substrate
+        finalized_number = await substrate.get_block_number(await substrate.get_chain_finalised_head())
+        still_waiting = []
+        for tracked in self.awaiting_finality:
+            if tracked.block <= finalized_number:
+                tracked.finalized = True
+                self.finalized += 1
+            else:
+                still_waiting.append(tracked)
+        self.awaiting_finality = still_waiting
+
+    def average_inclusion_blocks(self):
+        if self.included:
+            return self.inclusion_blocks / self.included
+        return 0.0
@@ -0,0 +1,56 @@
+"""
+Lazy Imports
+
+Keeps heavy imports off the startup critical path:
+- `bittensor` stands in for the module and imports it on first attribute access
+- `preload()` starts the import in a background thread at launch, so it overlaps with
+  loading the config and prompting for the wallet password
+- `ready()` waits for it without blocking the event loop
+"""
+
+import asyncio
+import importlib
+import threading
+
+
+class LazyModule:
+    """Imports module `name` the first time one of its attributes is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            # The import system's module lock makes a concurrent load wait for the first one
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+bittensor = LazyModule("bittensor")
+
+
+def preload(*modules):
+    """Start importing `modules` in a daemon thread."""
+    def load_all():
+        for module in modules:
+            try:
+                module.load()
+            except Exception:
+                # Left for the first real use to raise in context
+                pass
+    threading.Thread(target=load_all, name="preload", daemon=True).start()
+
+
+async def ready(module):
+    """Wait for `module` to be imported, off the event loop."""
+    if module.loaded:
+        return module.load()
+    return await asyncio.to_thread(module.load)
@@ -0,0 +1,215 @@
+"""
+Metrics
+
+An optional Prometheus endpoint for the trading bots:
+- Counters, gauges and histograms with labels, rendered in the Prometheus text format
+- Histograms are the only thing the trading loop writes to: one bucket increment per observation
+- Everything else (retries, reconnects, price, holdings) is read from the bot when scraped
+- Served from a background thread, so a scrape never runs on the trading loop
+- Event-loop lag measured by a sleeper task that records how late it wakes up
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+RPC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LAG_INTERVAL = 0.5
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=RPC_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts (non-cumulative, +Inf last), sum]
+        self._series = {}
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), list(counts)):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """A counter or gauge whose samples are read from `collect()` at scrape time."""
+
+    def __init__(self, name, kind, help, collect, labelnames=()):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.collect = collect
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        samples = self.collect()
+        if not self.labelnames:
+            samples = [((), samples)]
+        for labels, value in samples:
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.metrics = []
+
+    def histogram(self, name, help, labelnames=(), buckets=RPC_BUCKETS):
+        metric = Histogram(f"{self.namespace}_{name}", help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, collect, labelnames=()):
+        self.metrics.append(CallbackMetric(f"{self.namespace}_{name}", "counter", help, collect, labelnames))
+
+    def gauge(self, name, help, collect, labelnames=()):
+        self.metrics.append(CallbackMetric(f"{self.namespace}_{name}", "gauge", help, collect, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # One unreadable value must not fail the whole scrape
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves `registry` at /metrics from a daemon thread."""
+
+    def __init__(self, registry, host="127.0.0.1", port=9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._server is not None:
+            # shutdown() waits for serve_forever's poll loop; keep that wait off the event loop
+            await asyncio.to_thread(self._server.shutdown)
+            self._server.server_close()
+            self._server = None
+
+
+async def monitor_loop_lag(histogram, interval=LAG_INTERVAL):
+    """Record how much later than requested the event loop wakes a sleeping task."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+class BotMetrics:
+    """The metrics exposed by the DCA and unstaking bots."""
+
+    def __init__(self, bot, namespace, host="127.0.0.1", port=9100):
+        self.bot = bot
+        registry = self.registry = MetricsRegistry(namespace)
+        self.server = MetricsServer(registry, host, port)
+        self._lag_task = None
+
+        self.rpc_seconds = registry.histogram(
+            "rpc_duration_seconds", "Latency of successful requests sent to the endpoint", ("rpc",), RPC_BUCKETS
+        )
+        self.cycle_seconds = registry.histogram(
+            "cycle_duration_seconds", "Duration of one trading cycle", buckets=CYCLE_BUCKETS
+        )
+        self.loop_lag = registry.histogram(
+            "event_loop_lag_seconds", "How late the event loop woke a sleeping task", buckets=LAG_BUCKETS
+        )
+
+        def per_rpc(field):
+            return lambda: [((name,), getattr(stats, field)) for name, stats in list(bot.retries.stats.items())]
+
+        registry.counter("rpc_calls_total", "RPC calls made (one call may take several attempts)", per_rpc("calls"), ("rpc",))
+        registry.counter("rpc_retries_total", "RPC attempts retried after a failure", per_rpc("retries"), ("rpc",))
+        registry.counter("rpc_failures_total", "Failed RPC attempts", per_rpc("failures"), ("rpc",))
+        registry.counter("circuit_breaker_trips_total", "Times the circuit breaker opened", lambda: bot.retries.breaker.trips)
+        registry.counter("rpc_requests_sent_total", "Requests sent to an endpoint by the RPC gateway", lambda: bot.gateway.requests)
+        registry.counter("rpc_coalesced_total", "Reads that joined an identical read already in flight", lambda: bot.gateway.coalesced)
+        registry.counter("rpc_throttled_total", "Requests that waited for the endpoint's request budget", lambda: bot.gateway.throttled)
+        registry.counter("reconnects_total", "Failovers to another endpoint or reconnects in place", lambda: bot.pool.failovers)
+        registry.counter("skipped_for_price_total", "Cycles skipped because the price was outside the threshold", lambda: bot.skipped_for_price)
+        # A gauge: failed or dropped trades are taken back out of the totals
+        registry.gauge("trades", "Trades counted in the session totals", lambda: bot.trades_count)
+        registry.gauge("alpha_price", "Last alpha price read, in TAO", lambda: bot.last_price)
+        registry.gauge("alpha_holdings", "Alpha held with the validator on the target subnet", lambda: bot.last_holdings)
+
+    def observe_rpc(self, name, seconds):
+        self.rpc_seconds.observe(seconds, name)
+
+    def start(self):
+        self.server.start()
+        self._lag_task = asyncio.create_task(monitor_loop_lag(self.loop_lag))
+
+    async def stop(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        await self.server.stop()
@@ -0,0 +1,156 @@
+"""
+Nonce Manager
+
+Local nonce bookkeeping for the bots' coldkey, so several extrinsics can be in flight at once:
+- Nonces are reserved locally; the node is asked for the account's next index only to
+  start and to resynchronize, instead of once per submission
+- Every submission is signed once; a retry resubmits the same signed extrinsic, so a
+  submit that timed out but reached the node cannot turn into a second trade
+- Pending nonces are tracked until their extrinsic is included or fails on chain
+- A submission that never reached a node, or an extrinsic dropped from the pool, forces a
+  resync with the chain before the next reservation; nonces still pending are skipped
+- A nonce taken by another extrinsic (e.g. another process on the same coldkey) is released,
+  resynced and the call signed again under a fresh one, instead of counting as submitted
+"""
+
+import asyncio
+
+from retry_policy import EXTRINSIC
+from stake_extrinsics import OUTDATED, is_nonce_conflict, sign_call, submit_signed
+from inclusion_tracker import DROPPED
+
+
+class NonceManager:
+    def __init__(self):
+        self.next_nonce = None
+        # nonce -> extrinsic hash (None until the submission is accepted)
+        self.pending = {}
+        self._by_hash = {}
+        self._lock = asyncio.Lock()
+
+        # Nonce statistics
+        self.reserved = 0
+        self.syncs = 0
+        self.released = 0
+        self.dropped = 0
+
+    async def sync(self, sub, address):
+        """Take the account's next index from the node, bypassing the substrate interface's nonce cache."""
+        self.next_nonce = await sub.substrate.get_account_next_index(address, use_cache=False)
+        self.syncs += 1
+        # Accepted nonces below it are used; forget them even if their extrinsic was never followed
+        for nonce, extrinsic_hash in list(self.pending.items()):
+            if extrinsic_hash is not None and nonce < self.next_nonce:
+                del self.pending[nonce]
+                self._by_hash.pop(extrinsic_hash, None)
+
+    async def reserve(self, sub, address):
+        """Reserve the next nonce; the node is only asked when there is no local sequence."""
+        async with self._lock:
+            if self.next_nonce is None:
+                await self.sync(sub, address)
+            # After a resync, never hand out a nonce that is still in flight
+            while self.next_nonce in self.pending:
+                self.next_nonce += 1
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            self.pending[nonce] = None
+            self.reserved += 1
+            return nonce
+
+    def submitted(self, nonce, extrinsic_hash):
+        """Record the hash of the extrinsic that was accepted with `nonce`."""
+        self.pending[nonce] = extrinsic_hash
+        self._by_hash[extrinsic_hash] = nonce
+
+    def release(self, nonce):
+        """The submission with `nonce` failed and may not have reached a node: resync before the next reservation."""
+        self.pending.pop(nonce, None)
+        self.released += 1
+        self.next_nonce = None
+
+    def on_finished(self, tracked):
+        """Inclusion tracker listener: the nonce of an included or failed extrinsic is used, a dropped one's is not."""
+        nonce = self._by_hash.pop(tracked.extrinsic_hash, None)
+        if nonce is None:
+            return
+        self.pending.pop(nonce, None)
+        if tracked.status == DROPPED:
+            self.dropped += 1
+            self.next_nonce = None
+
+    def invalidate(self):
+        """Resync on the next reservation (e.g. after switching endpoints)."""
+        self.next_nonce = None
+
+
+class SubmissionError(Exception):
+    """A pipelined submission failed; `reached_node` is False only when no attempt can have reached a node."""
+
+    def __init__(self, message, reached_node):
+        super().__init__(message)
+        self.reached_node = reached_node
+
+
+class PipelinedSubmitter:
+    """Submits stake calls with locally reserved nonces, so callers need not wait for each other."""
+
+    def __init__(self, nonces, retries, get_sub, get_wallet):
+        self.nonces = nonces
+        self.retries = retries
+        self.get_sub = get_sub
+        self.get_wallet = get_wallet
+
+        # Submission statistics
+        self.resubmits = 0
+        self.resigns = 0
+
+    async def submit(self, name, compose):
+        """Reserve a nonce, sign `await compose(sub)` once and submit it under the extrinsic retry policy.
+
+        Returns the extrinsic hash. The nonce is released for resync if the extrinsic never reached a node.
+        If the node reports the nonce as taken, the next attempt signs the call again under a fresh nonce.
+        Failures raise SubmissionError, telling whether the call may still be executed on chain.
+        """
+        wallet = self.get_wallet()
+        address = wallet.coldkeypub.ss58_address
+        nonce = signed = None
+        sent = False
+        # An earlier signed extrinsic may be in a pool or on chain
+        reached_node = False
+
+        async def attempt():
+            nonlocal nonce, signed, sent, reached_node
+            sub = self.get_sub()
+            if nonce is None:
+                nonce = await self.nonces.reserve(sub, address)
+            if signed is None:
+                signed = await sign_call(sub, wallet, await compose(sub), nonce=nonce)
+            resubmit = sent
+            if resubmit:
+                self.resubmits += 1
+            # From here on an attempt may have reached the node, even if it times out
+            sent = True
+            try:
+                return await submit_signed(sub, signed, resubmit=resubmit)
+            except Exception as e:
+                # Once an earlier send may have reached the node, "outdated" can mean our own extrinsic
+                # was included; signing again would trade twice, so only a conflict that is not ours resyncs
+                if is_nonce_conflict(e) and not (resubmit and OUTDATED in str(e)):
+                    self.nonces.release(nonce)
+                    nonce = signed = None
+                    sent = False
+                    reached_node = reached_node or resubmit
+                    self.resigns += 1
+                raise
+
+        try:
+            extrinsic_hash = await self.retries.call(name, attempt, kind=EXTRINSIC)
+        except BaseException as e:
+            if nonce is not None:
+                self.nonces.release(nonce)
+            if isinstance(e, Exception):
+                raise SubmissionError(str(e) or repr(e), reached_node or sent) from e
+            raise
+        self.nonces.submitted(nonce, extrinsic_hash)
+        return extrinsic_hash
@@ -0,0 +1,102 @@
+"""
+Order Netting
+
+Nets opposing orders for the same (subnet, validator) target within one cycle:
+- Buys (TAO) and sells (alpha) on one target cross internally at the pool's spot price,
+  with no fee, slippage or extrinsic for the crossed part
+- Only the residual goes on chain, as a single buy or a single sell, or nothing when
+  the orders cancel out
+- Every order keeps its own share of the crossed and the on-chain fill, so buy-side and
+  sell-side statistics stay separate
+"""
+
+from amm_quotes import spot_price
+from strategies import BUY, SELL
+
+# Residuals smaller than this are treated as fully crossed
+DUST_AMOUNT = 1e-9
+
+
+class Order:
+    """One strategy's order for this cycle; `amount` is TAO for a buy and alpha for a sell."""
+
+    __slots__ = ("strategy", "amount", "crossed", "residual")
+
+    def __init__(self, strategy, amount):
+        self.strategy = strategy
+        self.amount = amount
+        # Parts of `amount` crossed with opposing orders and left for the chain, in the same unit
+        self.crossed = 0.0
+        self.residual = amount
+
+    @property
+    def side(self):
+        return self.strategy.side
+
+
+class TargetOrders:
+    """Every order for one target in one cycle, netted down to at most one extrinsic."""
+
+    def __init__(self, netuid, validator, snapshot):
+        self.netuid = netuid
+        self.validator = validator
+        self.snapshot = snapshot
+        self.orders = []
+        self.price = spot_price(snapshot)
+        # Side and amount of the single extrinsic left after netting (side None: nothing to send)
+        self.side = None
+        self.amount = 0.0
+        self.crossed_alpha = 0.0
+
+    def add(self, strategy, amount):
+        self.orders.append(Order(strategy, amount))
+
+    def residual_orders(self):
+        """The orders that share the on-chain extrinsic."""
+        return [order for order in self.orders if order.residual > 0]
+
+    def net(self):
+        """Cross buys against sells at the spot price, pro rata within each side."""
+        buys = [order for order in self.orders if order.side == BUY]
+        sells = [order for order in self.orders if order.side == SELL]
+        buy_tao = sum(order.amount for order in buys)
+        sell_alpha = sum(order.amount for order in sells)
+        buy_alpha = buy_tao / self.price if self.price > 0 else 0.0
+        crossed = min(buy_alpha, sell_alpha)
+
+        if crossed > DUST_AMOUNT:
+            self.crossed_alpha = crossed
+            for orders, total in ((buys, buy_alpha), (sells, sell_alpha)):
+                share = crossed / total
+                for order in orders:
+                    order.crossed = order.amount * share
+                    order.residual = order.amount - order.crossed
+            # The smaller side is crossed completely; drop its rounding leftovers
+            for order in (buys if buy_alpha <= sell_alpha else sells):
+                order.crossed, order.residual = order.amount, 0.0
+
+        residual = self.residual_orders()
+        if residual:
+            self.side = residual[0].side
+            self.amount = sum(order.residual for order in residual)
+            if self.amount <= DUST_AMOUNT:
+                self.side, self.amount = None, 0.0
+                for order in residual:
+                    order.crossed, order.residual = order.amount, 0.0
+        return self
+
+    @property
+    def extrinsics_saved(self):
+        """Extrinsics the orders would have needed on their own, minus the one (or none) sent."""
+        return len(self.orders) - (1 if self.side else 0)
+
+
+def net_orders(orders):
+    """Group (strategy, amount, snapshot) orders by target and net each group; returns [TargetOrders]."""
+    groups = {}
+    for strategy, amount, snapshot in orders:
+        group = groups.get(strategy.key)
+        if group is None:
+            group = groups[strategy.key] = TargetOrders(strategy.netuid, strategy.validator, snapshot)
+        group.add(strategy, amount)
+    return [group.net() for group in groups.values()]
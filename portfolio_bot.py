@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+"""
+Subnet Alpha Portfolio Bot
+
+Runs many DCA and unstaking targets from one process:
+- One wallet unlock and one shared Bittensor connection for every target
+- Balance, stakes and subnet prices are read once per cycle and fanned out to all strategies
+- Opposing buy and sell orders on the same target net out into one extrinsic (or none)
+- Orders for different targets due in the same cycle go out as one Utility batch extrinsic
+- Each (subnet, validator) target keeps its own session statistics, totalled per side
+- One per-block price history per subnet feeds the targets' optional signal conditions
+- Reports how many targets are evaluated per second
+"""
+
+import asyncio
+import os
+import time
+from lazy_imports import bittensor as bt, preload, ready
+from bot_logging import PRETTY, get_logger
+from bot_config import OFF, ConfigError, ConfigWatcher, PortfolioConfig, read_config
+from subnet_snapshot import BLOCK_TIME_SECONDS, SubnetSnapshotCache
+from block_scheduler import BlockScheduler, interval_to_blocks
+from cycle_pipeline import CyclePipeline, StageTimings
+from holdings_index import HoldingsIndex
+from endpoint_pool import EndpointPool
+from rpc_gateway import RpcGateway
+from retry_policy import RetryEngine
+from strategies import BUY, SELL, SKIP, STOP, build_strategy
+from stake_extrinsics import compose_stake_batch, compose_stake_call
+from nonce_manager import NonceManager, PipelinedSubmitter, SubmissionError
+from inclusion_tracker import INCLUDED, InclusionTracker
+from amm_quotes import max_order_size, quote
+from order_netting import net_orders
+from price_history import history_for
+from datetime import datetime
+from rich.panel import Panel
+from rich.table import Table
+from rich import box
+import signal
+import sys
+
+log = get_logger("portfolio")
+
+def format_trade(f):
+    """Pretty text of a `trade` log event."""
+    icon, verb = ("🟢", "Bought") if f['side'] == BUY else ("🔴", "Sold")
+    return (
+        f"{icon} {f['timestamp']} | SN{f['netuid']} {f['validator'][:8]}… | "
+        f"{verb} {f['alpha_amount']:.6f} alpha for {f['tao_amount']:.6f} TAO @ {f['alpha_price']:.6f} | "
+        f"Slippage: {f['slippage'] * 100:.2f}% | Avg: {f['avg_price']:.6f}"
+        + (f" | ⚖️ Netted: {f['crossed_alpha']:.6f} alpha" if f['crossed_alpha'] else "")
+    )
+
+class PortfolioBot:
+    def __init__(self, config, config_file=None, password=None, gateway=None):
+        self.config = config
+        self.password = password
+        # Changes to the config file are applied between cycles
+        self.config_watcher = ConfigWatcher(config_file, PortfolioConfig, config) if config_file else None
+        self.wallet = None
+        self.sub = None
+        self.running = True
+        self.stop_event = asyncio.Event()
+        self.loop = None
+        self.scheduler = None
+        self.start_time = time.time()
+        self.startup = StageTimings()
+        self.snapshots = SubnetSnapshotCache()
+        self.holdings = HoldingsIndex()
+        self.retries = RetryEngine(on_retry=self.on_retry)
+        self.tracker = InclusionTracker(lambda: self.sub)
+        # Nonces are reserved locally, so several orders can be in flight from the one coldkey
+        self.nonces = NonceManager()
+        self.tracker.add_listener(self.nonces.on_finished)
+        self.submitter = PipelinedSubmitter(self.nonces, self.retries, lambda: self.sub, lambda: self.wallet)
+        # Every RPC goes through the gateway; a fleet worker hands in one shared by its bots
+        self.shared_gateway = gateway is not None
+        self.gateway = gateway or RpcGateway(config.rpc_rate_limit, config.rpc_burst)
+        self.pool = EndpointPool(config.endpoints, gateway=self.gateway)
+        self.pool.add_listener(self.on_endpoint_switch)
+        # Balance and stakes are prefetched during the wait; prices are read fresh at wake-up
+        self.pipeline = CyclePipeline(
+            {'balance': self.read_balance, 'holdings': self.read_holdings},
+            {'snapshots': self.read_snapshots},
+        )
+
+        # Several orders in one cycle go out as one batched extrinsic; "off" sends them one by one
+        self.batch_mode = None if config.batch_mode == OFF else config.batch_mode
+        self.strategies = [build_strategy(target, config.min_balance) for target in config.targets]
+        # netuid -> PriceHistory, filled from the snapshots read every cycle
+        self.histories = self.price_histories(self.strategies)
+
+        # Session tracking
+        self.cycles_count = 0
+        self.targets_evaluated = 0
+        self.cycle_seconds = 0.0
+        self.netted_targets = 0
+        self.extrinsics_saved = 0
+        self.batches = 0
+        self.batched_orders = 0
+        self.batch_fallbacks = 0
+
+    async def initialize(self):
+        """Unlock the wallet and connect to the network concurrently, timing each startup phase."""
+        log.info(Panel("🚀 Initializing Portfolio Bot...", title="Startup", style="bold green"))
+
+        # Ask for the password first; the bittensor import started at launch continues meanwhile
+        with self.startup.measure("password"):
+            # A password handed over by the fleet supervisor is used once and never prompted for
+            password, self.password = self.password, None
+            if password is None:
+                password = os.environ.get("WALLET_PASSWORD")
+                if not password:
+                    # Prompt for password if not in environment (safer)
+                    import getpass
+                    log.info(f"Using Wallet '{self.config.wallet}' ")
+                    log.flush()
+                    password = getpass.getpass("🔐 Enter wallet password: ")
+        with self.startup.measure("import"):
+            await ready(bt)
+        if log.mode == PRETTY:
+            bt.trace()
+
+        # Decrypt the coldkey in a worker thread while every endpoint connects
+        unlocked, connected = await asyncio.gather(
+            self.startup.timed("wallet", asyncio.to_thread(self.unlock_wallet, password)),
+            self.startup.timed("connect", self.pool.connect()),
+            return_exceptions=True
+        )
+        # Clear password from memory
+        del password
+
+        if isinstance(unlocked, Exception):
+            log.error(Panel(f"❌ Error loading wallet: {unlocked}", title="Error", style="bold red"))
+            await self.pool.close()
+            return False
+        log.info(f"✅ Wallet '{self.config.wallet}' loaded successfully")
+
+        # The healthiest endpoint becomes active
+        if isinstance(connected, Exception):
+            log.error(Panel(f"❌ Error connecting to network: {connected}", title="Error", style="bold red"))
+            return False
+        endpoint = connected
+        self.sub = endpoint.sub
+        self.pool.start()
+        log.info(f"✅ Connected to Bittensor network via {endpoint.label} (Block: {endpoint.block})")
+        if len(self.pool.endpoints) > 1:
+            log.info(f"🔀 Warm standby endpoints: {len(self.pool.ranked()) - 1}/{len(self.pool.endpoints) - 1}")
+
+        return True
+
+    def unlock_wallet(self, password):
+        """Load and decrypt the coldkey; blocking, so it runs in a worker thread."""
+        wallet = bt.wallet(name=self.config.wallet)
+        if password:
+            wallet.coldkey_file.save_password_to_env(password)
+        wallet.unlock_coldkey()
+        self.wallet = wallet
+
+    def on_endpoint_switch(self, endpoint):
+        """Move to a newly selected endpoint and drop state read from the old one."""
+        self.sub = endpoint.sub
+        self.snapshots.invalidate()
+        self.holdings.invalidate()
+        self.pipeline.discard()
+        self.nonces.invalidate()
+        self.retries.breaker.reset()
+        log.info(f"🔀 Switched to endpoint {endpoint.label} (Block: {endpoint.block})")
+
+    def log_startup(self):
+        """Report the startup phases (wallet and connect overlap) and the time until the first cycle."""
+        phases = {stage: last_ms / 1000 for stage, count, avg_ms, last_ms, max_ms in self.startup.summary()}
+        phases['ready'] = time.time() - self.start_time
+        log.event('startup', lambda f: "⏱️ Startup: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in f.items()), **phases)
+
+    def on_retry(self, name, attempt, attempts, error):
+        """Report a failed attempt that is about to be retried."""
+        log.warning(f"⚠️ Error in {name} (attempt {attempt}/{attempts}): {error}")
+
+    async def read_balance(self):
+        """Read the shared wallet balance."""
+        return float(await self.retries.call(
+            "get_balance", lambda: self.sub.get_balance(self.wallet.coldkeypub.ss58_address)
+        ))
+
+    async def read_holdings(self):
+        """Refresh the holdings index from one stake read (at most once per block)."""
+        await self.retries.call(
+            "get_stake_for_coldkey", lambda: self.holdings.refresh(self.sub, self.wallet.coldkeypub.ss58_address)
+        )
+        return self.holdings
+
+    async def read_snapshots(self):
+        """Read the pool snapshot of every subnet with an active target."""
+        netuids = sorted({strategy.netuid for strategy in self.strategies if strategy.active})
+        snapshots = await self.retries.call("subnet", lambda: self.snapshots.get_many(self.sub, netuids))
+        for netuid, snapshot in snapshots.items():
+            self.histories[netuid].record(snapshot.block, snapshot.price)
+        return snapshots
+
+    def price_histories(self, strategies, current=None):
+        """One price history per subnet, large enough for the signal conditions of all its targets.
+
+        A history in `current` that is already large enough is kept with the prices it holds.
+        """
+        signal_sets = {}
+        for strategy in strategies:
+            signal_sets.setdefault(strategy.netuid, []).append(strategy.signals)
+        current = current or {}
+        return {netuid: history_for(sets, current.get(netuid)) for netuid, sets in signal_sets.items()}
+
+    async def submit_order(self, side, netuid, validator, amount):
+        """Submit one buy or sell extrinsic for a target without waiting for inclusion; returns its hash or None."""
+        name = "add_stake" if side == BUY else "unstake"
+        try:
+            return await self.submitter.submit(name, lambda sub: compose_stake_call(
+                sub, side, validator, netuid, amount
+            ))
+        except Exception as e:
+            log.error(f"❌ Order failed for subnet {netuid} ({validator[:8]}…): {e}")
+            return None
+
+    async def submit_orders(self, groups):
+        """Submit the netted orders of every target, as one batched extrinsic when several are due.
+
+        Returns the extrinsic hash per group (None where it failed) and whether they went out as a batch.
+        A batch that provably never reached a node falls back to one extrinsic per order; those are
+        pipelined, each with its own locally reserved nonce, instead of waiting for one another.
+        A batch that may have reached one is not sent again, so its orders cannot execute twice.
+        """
+        if self.batch_mode and len(groups) > 1:
+            orders = [(group.side, group.validator, group.netuid, group.amount) for group in groups]
+            try:
+                extrinsic_hash = await self.submitter.submit("batch", lambda sub: compose_stake_batch(
+                    sub, orders, self.batch_mode
+                ))
+                self.batches += 1
+                self.batched_orders += len(groups)
+                self.extrinsics_saved += len(groups) - 1
+                return [extrinsic_hash] * len(groups), True
+            except SubmissionError as e:
+                if e.reached_node:
+                    log.error(f"❌ Batch of {len(groups)} orders failed after reaching a node ({e}); not resubmitting them")
+                    return [None] * len(groups), False
+                self.batch_fallbacks += 1
+                log.warning(f"⚠️ Batch of {len(groups)} orders failed ({e}); submitting them one by one")
+        hashes = await asyncio.gather(*(
+            self.submit_order(group.side, group.netuid, group.validator, group.amount) for group in groups
+        ))
+        return list(hashes), False
+
+    def log_trades(self, group, submitted):
+        """Log every order of a netted target and update its statistics.
+
+        Crossed parts fill at the spot price; the extrinsic (if `submitted`) is quoted from the pool and split
+        between the orders that share it in proportion to their residuals. Returns
+        [(strategy, share, tao, alpha, crossed)] for the orders with a part on chain.
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        chain_tao = chain_alpha = slippage = 0.0
+        if submitted:
+            order_quote = quote(group.snapshot, group.side, group.amount)
+            slippage = order_quote.slippage
+            if group.side == BUY:
+                chain_tao, chain_alpha = group.amount, order_quote.output
+            else:
+                chain_tao, chain_alpha = order_quote.output, group.amount
+            self.holdings.apply_trade(group.netuid, group.validator, chain_alpha if group.side == BUY else -chain_alpha)
+
+        on_chain = []
+        for order in group.orders:
+            share = order.residual / group.amount if submitted and order.residual > 0 else 0.0
+            crossed_alpha = order.crossed / group.price if order.side == BUY else order.crossed
+            if not share and not crossed_alpha:
+                continue
+            tao_amount = chain_tao * share + crossed_alpha * group.price
+            alpha_amount = chain_alpha * share + crossed_alpha
+            alpha_price = tao_amount / alpha_amount
+            order.strategy.stats.record_trade(tao_amount, alpha_amount, alpha_price, crossed_alpha)
+            if share:
+                on_chain.append((order.strategy, share, chain_tao * share, chain_alpha * share, crossed_alpha > 0))
+            log.event(
+                'trade', format_trade,
+                timestamp=timestamp, side=order.side, netuid=group.netuid, validator=group.validator,
+                tao_amount=tao_amount, alpha_amount=alpha_amount, alpha_price=alpha_price,
+                slippage=slippage if share else 0.0, crossed_alpha=crossed_alpha,
+                avg_price=order.strategy.stats.average_price()
+            )
+        return on_chain
+
+    def reconcile_order(self, netuid, validator, on_chain):
+        """Build the tracker callback that corrects each sharing order's stats with its part of the real fill."""
+        def reconcile(tracked):
+            if tracked.status == INCLUDED:
+                if tracked.alpha_amount:
+                    for strategy, share, estimated_tao, estimated_alpha, crossed in on_chain:
+                        strategy.stats.adjust(
+                            tracked.tao_amount * share - estimated_tao, tracked.alpha_amount * share - estimated_alpha
+                        )
+                    log.info(
+                        f"🧾 SN{netuid} {validator[:8]}… included in block {tracked.block}: "
+                        f"{tracked.alpha_amount:.6f} alpha for {tracked.tao_amount:.6f} TAO"
+                    )
+            else:
+                for strategy, share, estimated_tao, estimated_alpha, crossed in on_chain:
+                    # An order that was partly crossed still counts as a trade
+                    strategy.stats.adjust(-estimated_tao, -estimated_alpha, trades=0 if crossed else -1)
+                log.warning(f"⚠️ SN{netuid} {validator[:8]}… order {tracked.status} on chain; removed from stats")
+        return reconcile
+
+    async def portfolio_cycle(self):
+        """Evaluate every active target against one shared set of reads."""
+        started = time.perf_counter()
+        try:
+            reads = await self.pipeline.read()
+            self.pool.mark_recovered()
+            wallet_balance, holdings, snapshots = reads['balance'], reads['holdings'], reads['snapshots']
+        except Exception as e:
+            log.error(f"❌ Error reading chain state: {e}")
+            log.info("🔄 Failing over to the healthiest endpoint...")
+
+            # Switch to a warm standby (or reconnect in place) without waiting
+            try:
+                await self.pool.failover()
+            except Exception as reconnect_error:
+                log.error(f"❌ Failed to reconnect: {reconnect_error}")
+                log.info("⏳ Will retry in next cycle...")
+            return True
+
+        # Decide for every target; buys draw down a shared balance estimate
+        available_balance = wallet_balance
+        orders = []
+        evaluated = 0
+        for strategy in self.strategies:
+            if not strategy.active:
+                continue
+            snapshot = snapshots.get(strategy.netuid)
+            if snapshot is None:
+                log.error(f"❌ Error: Could not find subnet {strategy.netuid}")
+                continue
+            evaluated += 1
+            decision = strategy.decide(
+                snapshot.price, available_balance, holdings.get(strategy.netuid, strategy.validator),
+                self.histories[strategy.netuid]
+            )
+            if decision.action == STOP:
+                strategy.active = False
+                log.info(f"🛑 Stopping {strategy.name} on subnet {strategy.netuid}: {decision.reason}")
+            elif decision.action == SKIP:
+                log.info(f"⏸️  SN{strategy.netuid} {strategy.name}: {decision.reason}")
+            else:
+                amount = decision.amount
+                if strategy.max_slippage > 0:
+                    # One chunk per cycle: cap the order at the size the pool takes within the bound
+                    amount = min(amount, max_order_size(snapshot, strategy.side, strategy.max_slippage))
+                if decision.action == BUY:
+                    available_balance -= amount
+                orders.append((strategy, amount, snapshot))
+
+        # Opposing orders on the same target cross at the spot price; at most one extrinsic per target is left
+        groups = net_orders(orders)
+
+        for group in groups:
+            if group.crossed_alpha:
+                self.netted_targets += 1
+                self.extrinsics_saved += group.extrinsics_saved
+                log.info(
+                    f"⚖️ SN{group.netuid} {group.validator[:8]}…: netted {group.crossed_alpha:.6f} alpha "
+                    f"@ {group.price:.6f}, " + (f"sending one {group.side} of {group.amount:.6f} {'TAO' if group.side == BUY else 'alpha'}" if group.side else "nothing to send")
+                )
+                if not group.side:
+                    self.log_trades(group, False)
+        sending = [group for group in groups if group.side]
+
+        # One batch, or one pipelined extrinsic per target
+        with self.pipeline.timings.measure("submit"):
+            hashes, batched = await self.submit_orders(sending)
+        submissions = len({extrinsic_hash for extrinsic_hash in hashes if extrinsic_hash})
+
+        # Follow every extrinsic; a batch is followed once and reported per call
+        batch_orders = []
+        for group, extrinsic_hash in zip(sending, hashes):
+            on_chain = self.log_trades(group, extrinsic_hash is not None)
+            if not extrinsic_hash:
+                continue
+            reconcile = self.reconcile_order(group.netuid, group.validator, on_chain)
+            if batched:
+                batch_orders.append((group.side, group.netuid, group.validator, reconcile))
+            else:
+                self.tracker.track(extrinsic_hash, group.side, group.netuid, group.validator, reconcile)
+        if batch_orders:
+            self.tracker.track_batch(hashes[0], batch_orders)
+
+        elapsed = time.perf_counter() - started
+        self.cycles_count += 1
+        self.targets_evaluated += evaluated
+        self.cycle_seconds += elapsed
+        log.info(
+            f"✅ Cycle {self.cycles_count}: {evaluated} targets, {len(orders)} orders, {submissions} extrinsics in {elapsed * 1000:.0f} ms "
+            f"| 💳 {wallet_balance:.4f} TAO"
+        )
+
+        return any(strategy.active for strategy in self.strategies)
+
+    def throughput(self):
+        """Targets evaluated per second of cycle time."""
+        if self.cycle_seconds > 0:
+            return self.targets_evaluated / self.cycle_seconds
+        return 0.0
+
+    def session_stats(self):
+        """Session totals in the form the fleet supervisor adds up across wallets."""
+        buys = [strategy.stats for strategy in self.strategies if strategy.side == BUY]
+        sells = [strategy.stats for strategy in self.strategies if strategy.side == SELL]
+        return {
+            'trades': sum(stats.trades_count for stats in buys + sells),
+            'tao_spent': sum(stats.total_tao for stats in buys),
+            'tao_earned': sum(stats.total_tao for stats in sells),
+            'alpha_bought': sum(stats.total_alpha for stats in buys),
+            'alpha_sold': sum(stats.total_alpha for stats in sells),
+            'skipped_for_price': sum(stats.skipped_for_price for stats in buys + sells),
+            'skipped_for_signal': sum(stats.skipped_for_signal for stats in buys + sells),
+            'failovers': self.pool.failovers,
+        }
+
+    def print_session_summary(self):
+        """Print session summary with per-target statistics."""
+        session_duration = time.time() - self.start_time
+        hours = int(session_duration // 3600)
+        minutes = int((session_duration % 3600) // 60)
+        seconds = int(session_duration % 60)
+
+        table = Table(title="📊 Portfolio Session Summary", box=box.ROUNDED, header_style="bold white on magenta")
+        table.add_column("Metric", style="cyan", justify="left")
+        table.add_column("Value", style="white", justify="right")
+
+        table.add_row("🎯 Targets", str(len(self.strategies)))
+        table.add_row("⏱️ Session Duration", f"{hours}h {minutes}m {seconds}s")
+        table.add_row("🔁 Cycles", str(self.cycles_count))
+        table.add_row("🧮 Targets Evaluated", str(self.targets_evaluated))
+        table.add_row("⚡ Throughput", f"{self.throughput():.1f} targets/s")
+        for side, label in ((BUY, "🟢 Buy Side"), (SELL, "🔴 Sell Side")):
+            side_stats = [strategy.stats for strategy in self.strategies if strategy.side == side]
+            if not side_stats:
+                continue
+            total_tao = sum(stats.total_tao for stats in side_stats)
+            total_alpha = sum(stats.total_alpha for stats in side_stats)
+            avg_price = total_tao / total_alpha if total_alpha > 0 else 0.0
+            table.add_row(
+                label,
+                f"{sum(stats.trades_count for stats in side_stats)} trades / {total_tao:.6f} TAO / "
+                f"{total_alpha:.6f} alpha @ {avg_price:.6f}"
+            )
+        table.add_row(
+            "⚖️ Netted",
+            f"{sum(strategy.stats.crossed_alpha for strategy in self.strategies if strategy.side == BUY):.6f} alpha crossed "
+            f"on {self.netted_targets} target cycles, {self.extrinsics_saved} extrinsics saved"
+        )
+        if self.batch_mode:
+            table.add_row(
+                "🧺 Batched Orders",
+                f"{self.batched_orders} orders in {self.batches} {self.batch_mode} extrinsics, {self.batch_fallbacks} fallbacks"
+            )
+        if self.scheduler:
+            table.add_row("🧱 Missed Blocks", str(self.scheduler.missed_blocks))
+            table.add_row("⏭️ Skipped Evaluations", str(self.scheduler.skipped_evaluations))
+        table.add_row(
+            "🧾 Confirmed Fills",
+            f"{self.tracker.included}/{self.tracker.tracked} ({self.tracker.failed} failed, {self.tracker.dropped} dropped)"
+        )
+        table.add_row(
+            "#️⃣ Nonces",
+            f"{self.nonces.reserved} reserved, {self.nonces.syncs} syncs, {self.nonces.released} released, "
+            f"{self.nonces.dropped} dropped, {self.submitter.resubmits} resubmits, "
+            f"{self.submitter.resigns} re-signed"
+        )
+        table.add_row(
+            "🛂 RPC Gateway",
+            f"{self.gateway.requests} sent, {self.gateway.coalesced} coalesced, "
+            f"{self.gateway.throttled} throttled ({self.gateway.throttled_seconds:.1f}s waited)"
+        )
+        table.add_row("🔀 Failovers", str(self.pool.failovers))
+        if self.pool.recover_times:
+            table.add_row("🩹 Avg Time to Recover", f"{self.pool.average_recover_time():.2f}s")
+        table.add_row("⚡ Circuit Breaker Trips", str(self.retries.breaker.trips))
+        for name, stats in self.retries.stats.items():
+            table.add_row(
+                f"📡 {name}",
+                f"{stats.calls} calls / {stats.retries} retries / {stats.average_latency() * 1000:.0f} ms avg"
+            )
+        table.add_row("📦 Prefetched Cycles", f"{self.pipeline.prefetch_hits}/{self.pipeline.prefetch_hits + self.pipeline.prefetch_misses}")
+        for stage, count, avg_ms, last_ms, max_ms in self.pipeline.timings.summary():
+            table.add_row(f"⏱️ {stage}", f"{avg_ms:.0f} ms avg / {max_ms:.0f} ms max")
+
+        targets = Table(title="📋 Targets", box=box.ROUNDED, header_style="bold white on magenta")
+        for column in ("Subnet", "Validator", "Strategy", "Trades", "TAO", "Alpha", "Netted", "Avg Price", "Price Change", "Skipped", "Signal Skips"):
+            targets.add_column(column, justify="right")
+        for strategy in self.strategies:
+            stats = strategy.stats
+            targets.add_row(
+                str(strategy.netuid),
+                f"{strategy.validator[:8]}…",
+                strategy.name,
+                str(stats.trades_count),
+                f"{stats.total_tao:.6f}",
+                f"{stats.total_alpha:.6f}",
+                f"{stats.crossed_alpha:.6f}",
+                f"{stats.average_price():.6f}",
+                f"{stats.price_change():+.2f}%",
+                str(stats.skipped_for_price),
+                str(stats.skipped_for_signal),
+            )
+
+        log.info()
+        log.info(table)
+        log.info()
+        log.info(targets)
+
+    def reload_config(self):
+        """Apply a changed config file between cycles; an invalid change is rejected and the current config kept."""
+        try:
+            reloaded = self.config_watcher.poll()
+        except ConfigError as e:
+            log.error(f"❌ Config change rejected, keeping the current config: {e}")
+            return
+        if reloaded:
+            config, changed = reloaded
+            self.apply_config(config)
+            log.info(f"🔄 Config reloaded ({', '.join(changed)}): {len(self.strategies)} targets")
+
+    def apply_config(self, config):
+        """Switch to a reloaded config; the wallet and connection stay as they are.
+
+        Targets that keep their strategy, subnet and validator keep their session statistics
+        (and stay stopped if they had stopped).
+        """
+        previous = {(strategy.name, strategy.key): strategy for strategy in self.strategies}
+        strategies = [build_strategy(target, config.min_balance) for target in config.targets]
+        for strategy in strategies:
+            kept = previous.pop((strategy.name, strategy.key), None)
+            if kept is not None:
+                strategy.stats = kept.stats
+                strategy.active = kept.active
+        self.config = config
+        self.strategies = strategies
+        self.histories = self.price_histories(strategies, self.histories)
+        self.batch_mode = None if config.batch_mode == OFF else config.batch_mode
+        self.scheduler.interval_blocks = interval_to_blocks(config)
+        if not self.shared_gateway:
+            self.gateway.configure(config.rpc_rate_limit, config.rpc_burst)
+        log.set_level(config.log_level)
+
+    def create_scheduler(self):
+        """Create the block scheduler and register every per-block listener."""
+        self.scheduler = BlockScheduler(interval_to_blocks(self.config), self.stop_event)
+        self.scheduler.add_listener(self.snapshots.set_block)
+        self.scheduler.add_listener(self.holdings.set_block)
+        self.scheduler.add_listener(self.tracker.on_block)
+        return self.scheduler
+
+    async def run(self):
+        """Main bot loop."""
+        if not await self.initialize():
+            return
+
+        # Evaluate on block boundaries instead of sleeping in wall-clock steps
+        self.loop = asyncio.get_running_loop()
+        self.create_scheduler()
+        self.scheduler.start(lambda: self.sub)
+        self.tracker.start()
+
+        log.info(Panel(
+            f"🎯 Targets: {len(self.strategies)} "
+            f"({sum(1 for s in self.strategies if s.side == BUY)} DCA, {sum(1 for s in self.strategies if s.side == SELL)} unstake)\n"
+            f"🧩 Subnets: {', '.join(str(n) for n in sorted({s.netuid for s in self.strategies}))}\n"
+            f"⏰ Interval: {self.scheduler.interval_blocks} blocks (~{self.scheduler.interval_blocks * BLOCK_TIME_SECONDS} seconds)",
+            title="Portfolio Bot Configuration",
+            style="bold magenta"
+        ))
+        self.log_startup()
+
+        try:
+            while self.running:
+                should_continue = await self.portfolio_cycle()
+                if not should_continue:
+                    log.info("🛑 No active targets left")
+                    break
+                if self.config_watcher:
+                    self.reload_config()
+
+                # Wait for the next due block
+                missed_blocks = self.scheduler.missed_blocks
+                skipped_evaluations = self.scheduler.skipped_evaluations
+                block = await self.scheduler.wait_next(on_lead=self.pipeline.prefetch)
+                if block is None:
+                    break
+                if self.scheduler.missed_blocks > missed_blocks or self.scheduler.skipped_evaluations > skipped_evaluations:
+                    log.warning(
+                        f"⚠️ Block {block}: {self.scheduler.missed_blocks - missed_blocks} missed blocks, "
+                        f"{self.scheduler.skipped_evaluations - skipped_evaluations} skipped evaluations"
+                    )
+
+        except KeyboardInterrupt:
+            log.info("\n🛑 Bot stopped by user")
+
+        finally:
+            log.info()
+            log.info(Panel("📊 Generating Session Summary...", style="bold yellow"))
+            self.print_session_summary()
+
+            self.pipeline.discard()
+            await self.tracker.stop()
+            await self.scheduler.stop()
+            await self.pool.close()
+
+    def stop(self):
+        """Stop the bot gracefully."""
+        self.running = False
+        # Wake the scheduler right away, even from a signal handler
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        else:
+            self.stop_event.set()
+
+def load_config(config_file="portfolio_config.yaml"):
+    """Load and validate configuration from YAML file."""
+    try:
+        return read_config(config_file, PortfolioConfig)
+    except FileNotFoundError:
+        log.error(Panel(f"❌ Config file '{config_file}' not found!", title="Error", style="bold red"))
+        return None
+    except Exception as e:
+        log.error(Panel(f"❌ Error loading config: {e}", title="Error", style="bold red"))
+        return None
+
+def signal_handler(bot):
+    """Handle interrupt signals gracefully."""
+    def handler(signum, frame):
+        log.info("\n🛑 Received stop signal...")
+        bot.stop()
+    return handler
+
+async def main():
+    """Main entry point."""
+    # Import bittensor in the background while the config loads and the password is entered
+    preload(bt)
+    log.info(Panel("🤖 Subnet Alpha Portfolio Bot Starting...", title="Welcome", style="bold magenta"))
+
+    # Load configuration
+    config_file = sys.argv[1] if len(sys.argv) > 1 else "portfolio_config.yaml"
+    config = load_config(config_file)
+    if not config:
+        return
+
+    # Pretty output with bittensor tracing by default; log_mode "production" keeps both off the hot path
+    try:
+        log.configure_from(config)
+    except ValueError as e:
+        log.error(Panel(f"❌ Invalid logging config: {e}", title="Error", style="bold red"))
+        return
+
+    # Create and run bot
+    bot = PortfolioBot(config, config_file)
+
+    # Set up signal handlers for graceful shutdown
+    signal.signal(signal.SIGINT, signal_handler(bot))
+    signal.signal(signal.SIGTERM, signal_handler(bot))
+
+    await bot.run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
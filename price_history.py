@@ -0,0 +1,223 @@
+"""
+Price History
+
+Per-block price history of a subnet in fixed-size NumPy ring buffers, with O(1) signals:
+- One slot per block; blocks between two reads carry the last price forward
+- Running sums of price and log return per block, so the TWAP, moving average and volatility
+  over any window up to the buffer size are the difference of two slots
+- EWMAs advance in closed form, however many blocks passed since the last read
+- Filled from the pool snapshots the bots read anyway (no extra RPCs); memory is fixed by the window
+- Signal conditions for strategies, e.g. "buy at least 2% below the 100-block TWAP" or
+  "do not trade while volatility is high"; a condition holds trading until its window is filled
+"""
+
+import math
+
+import numpy as np
+
+TWAP = "twap"
+EWMA = "ewma"
+VOLATILITY = "volatility"
+SIGNALS = (TWAP, EWMA, VOLATILITY)
+
+# Blocks kept when no condition asks for more (~1 hour)
+DEFAULT_WINDOW = 300
+# Longest window a condition may use (~1 week of blocks)
+MAX_WINDOW = 50400
+
+
+class PriceHistory:
+    """Ring buffer of per-block prices; `window` is the longest lookback, in blocks."""
+
+    def __init__(self, window=DEFAULT_WINDOW, ewma_spans=()):
+        self.window = window
+        # One more slot than the window: a window of N blocks is the difference of two slots N apart
+        self.capacity = window + 1
+        self.blocks = np.full(self.capacity, -1, dtype=np.int64)
+        self.prices = np.zeros(self.capacity)
+        self.cum_price = np.zeros(self.capacity)
+        self.cum_return = np.zeros(self.capacity)
+        self.cum_return_sq = np.zeros(self.capacity)
+        self.ewmas = {span: None for span in ewma_spans}
+        self.last_block = None
+        self.last_price = None
+        # Blocks held, up to the capacity
+        self.filled = 0
+
+    def record(self, block, price):
+        """Add the price read at `block`; the first read of a block stands."""
+        if price <= 0:
+            return
+        last = self.last_block
+        if last is None:
+            slot = block % self.capacity
+            self.blocks[slot] = block
+            self.prices[slot] = price
+            self.filled = 1
+            self.ewmas = dict.fromkeys(self.ewmas, price)
+            self.last_block, self.last_price = block, price
+            return
+        if block <= last:
+            return
+
+        gap = block - last
+        previous = self.last_price
+        last_slot = last % self.capacity
+        cum_price = self.cum_price[last_slot]
+        cum_return = self.cum_return[last_slot]
+        cum_return_sq = self.cum_return_sq[last_slot]
+        log_return = math.log(price / previous)
+        if gap == 1:
+            slot = block % self.capacity
+            self.blocks[slot] = block
+            self.prices[slot] = price
+            self.cum_price[slot] = cum_price + price
+            self.cum_return[slot] = cum_return + log_return
+            self.cum_return_sq[slot] = cum_return_sq + log_return * log_return
+        else:
+            # Carry the previous price over the blocks in between (only the newest `capacity` are kept)
+            blocks = np.arange(max(last + 1, block - self.capacity + 1), block + 1)
+            slots = blocks % self.capacity
+            self.blocks[slots] = blocks
+            self.prices[slots] = previous
+            self.cum_price[slots] = cum_price + previous * (blocks - last)
+            self.cum_return[slots] = cum_return
+            self.cum_return_sq[slots] = cum_return_sq
+            slot = slots[-1]
+            self.prices[slot] = price
+            self.cum_price[slot] += price - previous
+            self.cum_return[slot] += log_return
+            self.cum_return_sq[slot] += log_return * log_return
+
+        for span, value in self.ewmas.items():
+            weight = 2 / (span + 1)
+            if gap > 1:
+                value = previous + (value - previous) * (1 - weight) ** (gap - 1)
+            self.ewmas[span] = value + weight * (price - value)
+        self.filled = min(self.capacity, self.filled + gap)
+        self.last_block, self.last_price = block, price
+
+    def covers(self, blocks):
+        """True once the history spans `blocks` blocks."""
+        return self.filled > blocks
+
+    def _difference(self, values, blocks):
+        return float(values[self.last_block % self.capacity] - values[(self.last_block - blocks) % self.capacity])
+
+    def twap(self, blocks):
+        """Time-weighted average price over the last `blocks` blocks, or None until the history covers them."""
+        if not self.covers(blocks):
+            return None
+        return self._difference(self.cum_price, blocks) / blocks
+
+    def volatility(self, blocks):
+        """Standard deviation of the per-block log return over the last `blocks` blocks, or None."""
+        if blocks < 2 or not self.covers(blocks):
+            return None
+        mean = self._difference(self.cum_return, blocks) / blocks
+        variance = self._difference(self.cum_return_sq, blocks) / blocks - mean * mean
+        return math.sqrt(max(variance, 0.0))
+
+    def ewma(self, span):
+        """EWMA of the per-block price with a `span`-block span (registered at creation), or None."""
+        if not self.covers(span):
+            return None
+        return self.ewmas.get(span)
+
+    def ordered(self):
+        """(blocks, prices) held, oldest first."""
+        if self.last_block is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        blocks = np.arange(self.last_block - self.filled + 1, self.last_block + 1)
+        return blocks, self.prices[blocks % self.capacity]
+
+
+class SignalCondition:
+    """One condition on the price history, from a `signals` entry of a bot or target config."""
+
+    __slots__ = ("signal", "blocks", "margin", "max_volatility")
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Signal {spec!r} must be a mapping with signal and blocks")
+        self.signal = spec.get('signal')
+        if self.signal not in SIGNALS:
+            raise ValueError(f"Unknown signal '{self.signal}' (expected one of {', '.join(SIGNALS)})")
+        allowed = {'signal', 'blocks', 'max_percent' if self.signal == VOLATILITY else 'margin_percent'}
+        unknown = sorted(set(spec) - allowed)
+        if unknown:
+            raise ValueError(f"Unknown option(s) for the {self.signal} signal: {', '.join(unknown)}")
+        self.blocks = spec.get('blocks')
+        if not isinstance(self.blocks, int) or isinstance(self.blocks, bool) or not 2 <= self.blocks <= MAX_WINDOW:
+            raise ValueError(f"The {self.signal} signal needs 'blocks' from 2 to {MAX_WINDOW}, got {self.blocks!r}")
+        self.margin = 0.0
+        self.max_volatility = None
+        if self.signal == VOLATILITY:
+            if 'max_percent' not in spec:
+                raise ValueError("The volatility signal needs 'max_percent'")
+            self.max_volatility = float(spec['max_percent']) / 100
+        else:
+            self.margin = float(spec.get('margin_percent', 0.0)) / 100
+
+    def blocked(self, price, history, below):
+        """Why an order at `price` fails this condition, or None if it holds.
+
+        `below` is True for buys, which want the price under the reference, and False for sells.
+        """
+        if not history.covers(self.blocks):
+            return f"warming up the {self.blocks}-block {self.signal} ({max(0, history.filled - 1)} blocks so far)"
+        if self.signal == VOLATILITY:
+            volatility = history.volatility(self.blocks)
+            if volatility > self.max_volatility:
+                return (
+                    f"volatility {volatility * 100:.3f}% per block over {self.blocks} blocks "
+                    f"> {self.max_volatility * 100:.3f}%"
+                )
+            return None
+        reference = history.twap(self.blocks) if self.signal == TWAP else history.ewma(self.blocks)
+        if below:
+            limit = reference * (1 - self.margin)
+            if price > limit:
+                return f"price {price:.6f} > {limit:.6f} ({self.margin * 100:g}% below the {self.blocks}-block {self.signal} {reference:.6f})"
+        else:
+            limit = reference * (1 + self.margin)
+            if price < limit:
+                return f"price {price:.6f} < {limit:.6f} ({self.margin * 100:g}% above the {self.blocks}-block {self.signal} {reference:.6f})"
+        return None
+
+
+class SignalSet:
+    """The signal conditions of one strategy; every one of them must hold for an order."""
+
+    def __init__(self, specs, below):
+        self.below = below
+        self.conditions = [SignalCondition(spec) for spec in specs or ()]
+
+    def __bool__(self):
+        return bool(self.conditions)
+
+    @property
+    def window(self):
+        """Blocks of history the conditions need."""
+        return max((condition.blocks for condition in self.conditions), default=0)
+
+    @property
+    def ewma_spans(self):
+        return {condition.blocks for condition in self.conditions if condition.signal == EWMA}
+
+    def blocked(self, price, history):
+        """The first failed condition's reason, or None when an order at `price` may go out."""
+        for condition in self.conditions:
+            reason = condition.blocked(price, history, self.below)
+            if reason:
+                return reason
+        return None
+
+
+def history_for(signal_sets, current=None):
+    """A price history large enough for every one of `signal_sets`: `current` if it already is."""
+    window = max([DEFAULT_WINDOW] + [signals.window for signals in signal_sets])
+    spans = set().union(*(signals.ewma_spans for signals in signal_sets))
+    if current is not None and current.window >= window and spans <= set(current.ewmas):
+        return current
+    return PriceHistory(window, spans)
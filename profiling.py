@@ -0,0 +1,257 @@
+"""
+Cycle Profiling
+
+On-demand profiling of a running bot, switched on and off at runtime (SIGUSR1):
+- cProfile over the next N trading cycles, dumped as a .prof file for pstats / snakeviz
+- tracemalloc snapshots after every profiled cycle, diffed against the previous one
+- cProfile only runs while the profiled cycle (or a task it started) executes, so other tasks
+  running during its awaits are not charged to it
+- Wall-clock timing per coroutine method (including time spent awaiting) and per RPC
+- A plain-text report next to the .prof file
+- Nothing is wrapped or traced while profiling is off; the trading loop only checks a flag
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+
+DEFAULT_PROFILE_CYCLES = 20
+DEFAULT_PROFILE_DIR = "profiles"
+REPORT_FUNCTIONS = 40
+REPORT_ALLOCATIONS = 10
+# Frames kept per allocation; more frames give better attribution at a higher cost
+TRACEMALLOC_FRAMES = 5
+
+# The profile session of the cycle running in this context; tasks the cycle starts inherit it
+_profiled = contextvars.ContextVar("profiled_session", default=None)
+
+
+class _ProfiledSteps:
+    """Drives a coroutine with the session's profiler enabled only while the coroutine itself runs."""
+
+    __slots__ = ("coro", "session")
+
+    def __init__(self, coro, session):
+        self.coro = coro
+        self.session = session
+
+    def __await__(self):
+        coro, profile = self.coro, self.session.profile
+        value, error = None, None
+        while True:
+            # A task the cycle started may outlive the session; it then runs unprofiled
+            profiling = not self.session.finished
+            if profiling:
+                profile.enable()
+            try:
+                yielded = coro.throw(error) if error is not None else coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if profiling:
+                    profile.disable()
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+async def _profiled_steps(coro, session):
+    return await _ProfiledSteps(coro, session)
+
+
+class CoroutineTimer:
+    """Times every coroutine method of the instrumented objects by wrapping them on the instance."""
+
+    def __init__(self):
+        self.timings = {}
+        self._wrapped = []
+
+    def record(self, name, seconds):
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = [0, 0.0, 0.0]
+        timing[0] += 1
+        timing[1] += seconds
+        timing[2] = max(timing[2], seconds)
+
+    def _wrap(self, label, method, keyed):
+        async def timed(*args, **kwargs):
+            name = f"{label}[{args[0]}]" if keyed and args else label
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return timed
+
+    def instrument(self, obj, prefix, keyed=()):
+        """Wrap `obj`'s coroutine methods; calls to names in `keyed` are timed per first argument."""
+        for name, member in inspect.getmembers(type(obj), inspect.iscoroutinefunction):
+            if name.startswith("__") or name in vars(obj):
+                continue
+            setattr(obj, name, self._wrap(f"{prefix}.{name}", getattr(obj, name), name in keyed))
+            self._wrapped.append((obj, name))
+
+    def restore(self):
+        """Remove the wrappers so the class methods are used again."""
+        for obj, name in self._wrapped:
+            delattr(obj, name)
+        self._wrapped = []
+
+    def summary(self):
+        """(name, calls, total_ms, avg_ms, max_ms), slowest total first."""
+        rows = [
+            (name, calls, total * 1000, total / calls * 1000, longest * 1000)
+            for name, (calls, total, longest) in self.timings.items()
+        ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+class ProfileSession:
+    def __init__(self, cycles):
+        self.cycles = cycles
+        self.completed = 0
+        self.started_at = datetime.now()
+        self.profile = cProfile.Profile()
+        self.timer = CoroutineTimer()
+        self.cycle_times = []
+        self.allocation_diffs = []
+        self.finished = False
+        self.owns_tracemalloc = not tracemalloc.is_tracing()
+        if self.owns_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self.snapshot = tracemalloc.take_snapshot()
+
+
+class CycleProfiler:
+    def __init__(self, bot, name, directory=DEFAULT_PROFILE_DIR, cycles=DEFAULT_PROFILE_CYCLES, on_report=None):
+        self.bot = bot
+        self.name = name
+        self.directory = directory
+        self.default_cycles = cycles
+        self.on_report = on_report
+        self.requested = 0
+        self.stop_requested = False
+        self.session = None
+        self.reports = []
+        self._task_factory = None
+
+    @property
+    def active(self):
+        """True while a profile is requested or running; the trading loop checks only this."""
+        return self.requested > 0 or self.session is not None
+
+    def toggle(self, cycles=None):
+        """Profile the next `cycles` cycles, or stop the running profile early. Safe from a signal handler."""
+        if self.active:
+            self.stop_requested = True
+            self.requested = 0
+            return False
+        self.stop_requested = False
+        self.requested = cycles or self.default_cycles
+        return True
+
+    def _begin(self):
+        session = self.session = ProfileSession(self.requested)
+        self.requested = 0
+        session.timer.instrument(self.bot, type(self.bot).__name__)
+        session.timer.instrument(self.bot.retries, "rpc", keyed=("call",))
+        # Tasks started from a profiled cycle (e.g. reads run with gather) are profiled as part of it
+        loop = asyncio.get_running_loop()
+        self._task_factory = loop.get_task_factory()
+        loop.set_task_factory(self._create_task)
+
+    def _create_task(self, loop, coro, **kwargs):
+        session = _profiled.get()
+        if session is not None and session is self.session:
+            coro = _profiled_steps(coro, session)
+        if self._task_factory is not None:
+            return self._task_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    async def run_cycle(self, cycle):
+        """Run `cycle()` under the profiler; writes the report once the requested cycles are done.
+
+        `cycle` is looked up when called, so the first profiled cycle already sees the timing wrappers.
+        """
+        if self.session is None:
+            if self.stop_requested:
+                self.stop_requested = False
+                return await cycle()
+            self._begin()
+        session = self.session
+        started = time.perf_counter()
+        token = _profiled.set(session)
+        try:
+            return await _ProfiledSteps(cycle(), session)
+        finally:
+            _profiled.reset(token)
+            session.cycle_times.append(time.perf_counter() - started)
+            snapshot = tracemalloc.take_snapshot()
+            session.allocation_diffs.append(snapshot.compare_to(session.snapshot, "lineno")[:REPORT_ALLOCATIONS])
+            session.snapshot = snapshot
+            session.completed += 1
+            if session.completed >= session.cycles or self.stop_requested:
+                await self.finish()
+
+    async def finish(self):
+        """Stop the running profile (if any) and write its files; returns the report path."""
+        session = self.session
+        if session is None:
+            return None
+        self.session = None
+        self.stop_requested = False
+        session.finished = True
+        asyncio.get_running_loop().set_task_factory(self._task_factory)
+        self._task_factory = None
+        session.timer.restore()
+        session.snapshot = None
+        if session.owns_tracemalloc:
+            tracemalloc.stop()
+        report = await asyncio.to_thread(self._write, session)
+        self.reports.append(report)
+        if self.on_report:
+            self.on_report(report)
+        return report
+
+    def _write(self, session):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.name}_{session.started_at.strftime('%Y%m%d_%H%M%S')}")
+        session.profile.dump_stats(f"{base}.prof")
+
+        out = io.StringIO()
+        times = [seconds * 1000 for seconds in session.cycle_times]
+        out.write(f"{self.name} profile: {session.completed} cycles from {session.started_at:%Y-%m-%d %H:%M:%S}\n")
+        if times:
+            out.write(f"cycle ms: avg {sum(times) / len(times):.2f} / max {max(times):.2f} / "
+                      + " ".join(f"{ms:.1f}" for ms in times) + "\n")
+
+        out.write("\n== Coroutines (wall clock, including awaits) ==\n")
+        out.write(f"{'name':<48} {'calls':>6} {'total ms':>10} {'avg ms':>9} {'max ms':>9}\n")
+        for name, calls, total_ms, avg_ms, max_ms in session.timer.summary():
+            out.write(f"{name:<48} {calls:>6} {total_ms:>10.2f} {avg_ms:>9.2f} {max_ms:>9.2f}\n")
+
+        out.write(f"\n== cProfile, top {REPORT_FUNCTIONS} by cumulative time ==\n")
+        stats = pstats.Stats(session.profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(REPORT_FUNCTIONS)
+
+        out.write(f"\n== Allocation growth per cycle, top {REPORT_ALLOCATIONS} lines ==\n")
+        for number, diff in enumerate(session.allocation_diffs, 1):
+            out.write(f"-- cycle {number}: {sum(stat.size_diff for stat in diff) / 1024:+.1f} KB in top lines\n")
+            for stat in diff:
+                out.write(f"   {stat}\n")
+
+        with open(f"{base}.txt", "w") as f:
+            f.write(out.getvalue())
+        return f"{base}.txt"
@@ -0,0 +1,175 @@
+"""
+Retry Policies
+
+One retry engine shared by every RPC wrapper in the bots:
+- Separate policies for chain reads and extrinsic submissions
+- Per-call deadlines and per-attempt timeouts, so one flaky call cannot stall a cycle
+- Exponential backoff with full jitter between attempts
+- A circuit breaker that fails fast while the active endpoint keeps failing, then lets a single
+  trial call through before closing again
+- Call, retry and latency statistics per call type, with an optional per-attempt latency hook
+"""
+
+import asyncio
+import random
+import time
+
+from subnet_snapshot import BLOCK_TIME_SECONDS
+
+READ = "read"
+EXTRINSIC = "extrinsic"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling out while the circuit breaker is open."""
+
+
+class RetryPolicy:
+    def __init__(self, attempts=3, deadline=6.0, attempt_timeout=3.0, base_delay=0.2, max_delay=1.5):
+        self.attempts = attempts
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+DEFAULT_POLICIES = {
+    READ: RetryPolicy(attempts=3, deadline=6.0, attempt_timeout=3.0, base_delay=0.2, max_delay=1.5),
+    # Submissions get more time per attempt but fewer retries, since a timed-out submit may still land
+    EXTRINSIC: RetryPolicy(attempts=2, deadline=BLOCK_TIME_SECONDS * 2, attempt_timeout=BLOCK_TIME_SECONDS, base_delay=0.5, max_delay=2.0),
+}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=BLOCK_TIME_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        # When the half-open trial call was let through; None while none is out
+        self.probe_started = None
+        self.trips = 0
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        """False while open. After the reset timeout the breaker is half-open: one trial call is let
+        through and the rest refused until it succeeds (closing the breaker) or fails (reopening it).
+
+        A trial that never reports back (e.g. cancelled) is replaced by another after one more reset timeout.
+        """
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            if not self.is_open:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+            self.probe_started = None
+
+    def reset(self):
+        """Close the breaker (e.g. after switching to another endpoint)."""
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+
+class CallStats:
+    """Counters and latency for one call type."""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_error = None
+
+    def average_latency(self):
+        """Mean latency of successful attempts in seconds."""
+        succeeded = self.attempts - self.failures
+        if succeeded > 0:
+            return self.total_latency / succeeded
+        return 0.0
+
+
+class RetryEngine:
+    def __init__(self, policies=None, breaker=None, on_retry=None, on_latency=None):
+        self.policies = dict(DEFAULT_POLICIES)
+        self.policies.update(policies or {})
+        self.breaker = breaker or CircuitBreaker()
+        self.on_retry = on_retry
+        self.on_latency = on_latency
+        self.stats = {}
+
+    def call_stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = CallStats()
+        return stats
+
+    async def call(self, name, make_call, kind=READ):
+        """Run `make_call()` (a zero-argument coroutine function) under the `kind` policy."""
+        policy = self.policies[kind]
+        stats = self.call_stats(name)
+        stats.calls += 1
+        deadline = time.monotonic() + policy.deadline
+
+        for attempt in range(policy.attempts):
+            if not self.breaker.allow():
+                stats.rejected += 1
+                raise CircuitOpenError(f"{name}: circuit open after {self.breaker.consecutive_failures} consecutive failures")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"{name}: deadline of {policy.deadline:.1f}s exceeded")
+
+            stats.attempts += 1
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(make_call(), timeout=min(policy.attempt_timeout, remaining))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = e
+                self.breaker.record_failure()
+                if attempt == policy.attempts - 1:
+                    raise
+                delay = policy.backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                stats.retries += 1
+                if self.on_retry:
+                    self.on_retry(name, attempt + 1, policy.attempts, e)
+                await asyncio.sleep(delay)
+                continue
+
+            latency = time.perf_counter() - started
+            stats.total_latency += latency
+            stats.max_latency = max(stats.max_latency, latency)
+            if self.on_latency:
+                self.on_latency(name, latency)
+            self.breaker.record_success()
+            return result
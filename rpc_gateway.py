@@ -0,0 +1,257 @@
+"""
+RPC Gateway
+
+One gateway between the bots and their `async_subtensor` connections:
+- Identical reads in flight at the same time (same endpoint, call and arguments) are sent once
+  and every caller gets the one result
+- A token bucket per endpoint enforces a request budget (requests per second, with a burst)
+- Extrinsic submissions wait ahead of reads, and reads always leave one token for them, so a
+  tight budget delays reads instead of orders
+- Local calls (composing and signing) and the block subscription pass straight through
+- Each subtensor call counts as one request; the bots of a fleet worker share one gateway
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+
+from retry_policy import EXTRINSIC, READ
+
+DEFAULT_BURST = 10
+# Tokens reads leave in the bucket for extrinsic submissions
+EXTRINSIC_RESERVE = 1
+
+# Reads whose result depends only on the call and its arguments
+COALESCED_METHODS = frozenset({
+    'get_balance', 'get_stake_for_coldkey', 'subnet', 'all_subnets', 'get_current_block',
+    'get_block_hash', 'get_block', 'get_events', 'get_block_number', 'get_chain_finalised_head',
+})
+# Calls on the submission path, served before reads
+EXTRINSIC_METHODS = frozenset({'submit_extrinsic', 'get_account_next_index'})
+# Calls that do not count against the budget
+LOCAL_METHODS = frozenset({
+    'compose_call', 'create_signed_extrinsic', 'subscribe_block_headers', 'initialize', 'close',
+})
+# Attributes holding another client whose calls go through the gateway too
+NESTED_CLIENTS = frozenset({'substrate'})
+
+PRIORITIES = {EXTRINSIC: 0, READ: 1}
+
+
+class InFlight:
+    """A request being sent; the future for the callers that join it is only made once one does."""
+
+    __slots__ = ("joined",)
+
+    def __init__(self):
+        self.joined = None
+
+    def join(self):
+        if self.joined is None:
+            self.joined = asyncio.get_running_loop().create_future()
+        # Shielded: a joiner that times out must not cancel the result the others wait for
+        return asyncio.shield(self.joined)
+
+    def succeed(self, result):
+        if self.joined is not None:
+            self.joined.set_result(result)
+
+    def fail(self, error):
+        if self.joined is not None:
+            self.joined.set_exception(error)
+            # Retrieved here, since every joiner may have stopped waiting
+            self.joined.exception()
+
+
+class TokenBucket:
+    """The request budget of one endpoint: `rate` requests per second, up to `burst` at once."""
+
+    def __init__(self, rate, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # (priority, arrival, future) of the callers waiting for a token
+        self.waiters = []
+        self._arrivals = itertools.count()
+        self._timer = None
+
+    def configure(self, rate, burst):
+        """Change the budget; waiters are served at the new rate (all at once if it is unlimited)."""
+        self._refill()
+        self.rate = rate
+        self.burst = burst
+        self.tokens = min(self.tokens, float(burst))
+        self._release()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _needed(self, priority):
+        """Tokens that must be in the bucket before a caller of `priority` may take one."""
+        if priority == PRIORITIES[READ] and self.burst > EXTRINSIC_RESERVE:
+            return 1 + EXTRINSIC_RESERVE
+        return 1
+
+    async def acquire(self, kind=READ):
+        """Take a token, waiting behind callers of higher priority; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        priority = PRIORITIES[kind]
+        self._refill()
+        if not self.waiters and self.tokens >= self._needed(priority):
+            self.tokens -= 1
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._arrivals), future))
+        self._release()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was granted just before the caller gave up; hand it to the next one
+                self.tokens += 1
+                self._release()
+            raise
+        return time.monotonic() - started
+
+    def _release(self):
+        """Grant tokens to waiters in priority order, then wake up again when the next one can be served."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        while self.waiters:
+            priority, _, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            if self.rate > 0 and self.tokens < self._needed(priority):
+                break
+            heapq.heappop(self.waiters)
+            if self.rate > 0:
+                self.tokens -= 1
+            future.set_result(None)
+        if self.waiters:
+            delay = (self._needed(self.waiters[0][0]) - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(max(0.0, delay), self._release)
+
+
+class RpcGateway:
+    """Coalesces identical in-flight reads and meters requests per endpoint."""
+
+    def __init__(self, rate=0.0, burst=DEFAULT_BURST):
+        # Requests per second per endpoint; 0 leaves the budget unlimited
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.in_flight = {}
+        self.listeners = []
+
+        # Gateway statistics
+        self.requests = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def add_listener(self, callback):
+        """Call `callback(method, seconds)` with the latency of every request sent and answered.
+
+        Reads served by joining one in flight are not requests; a fleet worker's listeners see the
+        requests of all the bots sharing its gateway.
+        """
+        self.listeners.append(callback)
+
+    def configure(self, rate, burst):
+        """Change the budget of every endpoint (e.g. after a config reload)."""
+        self.rate = rate
+        self.burst = burst
+        for bucket in self.buckets.values():
+            bucket.configure(rate, burst)
+
+    def bucket(self, endpoint):
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            bucket = self.buckets[endpoint] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def wrap(self, client, endpoint):
+        """`client` (an async_subtensor) with its calls routed through the gateway under `endpoint`'s budget."""
+        return GatewayClient(self, client, endpoint)
+
+    async def request(self, endpoint, method, call, args, kwargs):
+        """Send `call(*args, **kwargs)` to `endpoint`, or join an identical read already in flight."""
+        if method not in COALESCED_METHODS:
+            return await self._send(endpoint, method, call, args, kwargs)
+        key = (endpoint, method, args, tuple(sorted(kwargs.items())) if kwargs else ())
+        try:
+            shared = self.in_flight.get(key)
+        except TypeError:
+            # Unhashable arguments: nothing to match against
+            return await self._send(endpoint, method, call, args, kwargs)
+        if shared is not None:
+            self.coalesced += 1
+            return await shared.join()
+
+        # The first caller sends the request itself and hands its outcome to whoever joined meanwhile
+        shared = self.in_flight[key] = InFlight()
+        try:
+            result = await self._send(endpoint, method, call, args, kwargs)
+        except asyncio.CancelledError:
+            # The joiners were not cancelled: give them an error their retry policy retries
+            shared.fail(ConnectionAbortedError(f"{method}: the shared request was cancelled"))
+            raise
+        except Exception as e:
+            shared.fail(e)
+            raise
+        finally:
+            del self.in_flight[key]
+        shared.succeed(result)
+        return result
+
+    async def _send(self, endpoint, method, call, args, kwargs):
+        if self.rate > 0:
+            waited = await self.bucket(endpoint).acquire(EXTRINSIC if method in EXTRINSIC_METHODS else READ)
+            if waited:
+                self.throttled += 1
+                self.throttled_seconds += waited
+        self.requests += 1
+        if not self.listeners:
+            return await call(*args, **kwargs)
+        started = time.perf_counter()
+        result = await call(*args, **kwargs)
+        seconds = time.perf_counter() - started
+        for callback in self.listeners:
+            callback(method, seconds)
+        return result
+
+
+class GatewayClient:
+    """Stands in for an async_subtensor (or its substrate interface), sending its RPCs through the gateway."""
+
+    def __init__(self, gateway, client, endpoint):
+        self._gateway = gateway
+        self._client = client
+        self._endpoint = endpoint
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name in NESTED_CLIENTS:
+            wrapped = GatewayClient(self._gateway, attribute, self._endpoint)
+        elif name in LOCAL_METHODS or not inspect.iscoroutinefunction(attribute):
+            return attribute
+        else:
+            gateway, endpoint = self._gateway, self._endpoint
+
+            async def wrapped(*args, **kwargs):
+                return await gateway.request(endpoint, name, attribute, args, kwargs)
+        # Cached on the instance, so later lookups skip __getattr__
+        setattr(self, name, wrapped)
+        return wrapped
@@ -0,0 +1,121 @@
+"""
+Stake Extrinsics
+
+Builds and submits the bots' add_stake / remove_stake extrinsics directly, so that
+the extrinsic hash of every submission is known and can be followed on chain.
+Several orders due in the same block can be wrapped in one Utility batch call: one
+signature, one fee envelope and one round trip for all of them.
+"""
+
+import asyncio
+
+from lazy_imports import bittensor as bt
+
+from strategies import BUY, SELL
+
+# Mortal era length for submitted extrinsics; they are dropped if not included within it
+MORTAL_ERA_PERIOD = 32
+
+# Utility batch calls: force_batch runs every call and reports each outcome, batch_all reverts all on any failure
+FORCE_BATCH = "force_batch"
+BATCH_ALL = "batch_all"
+BATCH_MODES = (FORCE_BATCH, BATCH_ALL)
+
+# Node error meaning a resubmitted extrinsic is already in the pool
+ALREADY_IMPORTED = "Already Imported"
+
+# Node errors meaning the extrinsic's nonce is taken: used on chain, or held by another extrinsic in the pool
+OUTDATED = "outdated"
+NONCE_CONFLICTS = (OUTDATED, "Priority is too low")
+
+STAKE_CALLS = {
+    BUY: ("add_stake", "amount_staked"),
+    SELL: ("remove_stake", "amount_unstaked"),
+}
+
+
+async def compose_stake_call(sub, side, hotkey_ss58, netuid, amount):
+    """Compose an add_stake (buy, `amount` in TAO) or remove_stake (sell, `amount` in alpha) call."""
+    call_function, amount_param = STAKE_CALLS[side]
+    return await sub.substrate.compose_call(
+        call_module="SubtensorModule",
+        call_function=call_function,
+        call_params={
+            "hotkey": hotkey_ss58,
+            "netuid": netuid,
+            amount_param: bt.Balance.from_tao(amount).rao,
+        },
+    )
+
+
+async def sign_call(sub, wallet, call, nonce=None, period=MORTAL_ERA_PERIOD):
+    """Sign `call` with the coldkey; without a `nonce` the node is asked for the next one."""
+    extrinsic_data = {"call": call, "keypair": wallet.coldkey, "era": {"period": period}}
+    if nonce is not None:
+        extrinsic_data["nonce"] = nonce
+    return await sub.substrate.create_signed_extrinsic(**extrinsic_data)
+
+
+def signed_hash(extrinsic):
+    """Hash of a signed extrinsic, known before it is submitted."""
+    return f"0x{extrinsic.extrinsic_hash.hex()}"
+
+
+async def submit_signed(sub, extrinsic, resubmit=False):
+    """Submit a signed extrinsic without waiting; returns its hash.
+
+    With `resubmit`, a node that already has this very extrinsic in its pool counts as success:
+    the earlier attempt got through, and the inclusion tracker confirms or drops it.
+    """
+    try:
+        receipt = await sub.substrate.submit_extrinsic(
+            extrinsic, wait_for_inclusion=False, wait_for_finalization=False
+        )
+    except Exception as e:
+        if resubmit and ALREADY_IMPORTED in str(e):
+            return signed_hash(extrinsic)
+        raise
+    return receipt.extrinsic_hash
+
+
+def is_nonce_conflict(error):
+    """Whether a submission failed because its nonce is already used or held by another extrinsic."""
+    return any(marker in str(error) for marker in NONCE_CONFLICTS)
+
+
+async def submit_call(sub, wallet, call, nonce=None, period=MORTAL_ERA_PERIOD):
+    """Sign `call` with the coldkey and submit it without waiting; returns the extrinsic hash."""
+    return await submit_signed(sub, await sign_call(sub, wallet, call, nonce=nonce, period=period))
+
+
+async def submit_stake(sub, wallet, side, hotkey_ss58, netuid, amount, nonce=None):
+    """Submit one buy or sell without waiting for inclusion; returns the extrinsic hash."""
+    call = await compose_stake_call(sub, side, hotkey_ss58, netuid, amount)
+    return await submit_call(sub, wallet, call, nonce=nonce)
+
+
+async def compose_batch_call(sub, calls, mode=FORCE_BATCH):
+    """Wrap `calls` in one Utility.force_batch or Utility.batch_all call."""
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unknown batch mode '{mode}' (expected one of {', '.join(BATCH_MODES)})")
+    return await sub.substrate.compose_call(
+        call_module="Utility",
+        call_function=mode,
+        call_params={"calls": calls},
+    )
+
+
+async def compose_stake_batch(sub, orders, mode=FORCE_BATCH):
+    """Compose (side, hotkey_ss58, netuid, amount) orders into one batch call.
+
+    The calls run in the order given, so the inclusion tracker can attribute each call's fill.
+    """
+    calls = await asyncio.gather(*(
+        compose_stake_call(sub, side, hotkey_ss58, netuid, amount) for side, hotkey_ss58, netuid, amount in orders
+    ))
+    return await compose_batch_call(sub, list(calls), mode)
+
+
+async def submit_stake_batch(sub, wallet, orders, mode=FORCE_BATCH, nonce=None):
+    """Submit (side, hotkey_ss58, netuid, amount) orders as one batched extrinsic; returns its hash."""
+    return await submit_call(sub, wallet, await compose_stake_batch(sub, orders, mode), nonce=nonce)
@@ -0,0 +1,159 @@
+"""
+Trading Strategies
+
+The buy/sell threshold rules of the DCA and unstaking bots as plain objects, so that
+one engine can evaluate many (subnet, validator) targets against shared reads:
+- DCAStrategy: buys a fixed TAO amount while the price is at or below a threshold
+- UnstakeStrategy: sells a fixed alpha amount while the price is at or above a threshold
+- Each strategy keeps its own per-target session statistics
+- Optional price signal conditions (TWAP, EWMA, volatility) checked against the subnet's price history
+"""
+
+from price_history import SignalSet
+
+BUY = "buy"
+SELL = "sell"
+SKIP = "skip"
+STOP = "stop"
+
+
+class Decision:
+    """Outcome of evaluating one strategy against the current price, balance and holdings."""
+
+    __slots__ = ("action", "amount", "reason")
+
+    def __init__(self, action, amount=0.0, reason=""):
+        self.action = action
+        self.amount = amount
+        self.reason = reason
+
+
+class TargetStats:
+    """Session statistics for one target."""
+
+    def __init__(self):
+        self.evaluations = 0
+        self.skipped_for_price = 0
+        self.skipped_for_signal = 0
+        self.trades_count = 0
+        self.total_tao = 0.0
+        self.total_alpha = 0.0
+        self.first_price = None
+        self.last_price = None
+        # Alpha filled by crossing with an opposing order on the same target instead of on chain
+        self.crossed_alpha = 0.0
+
+    def record_trade(self, tao_amount, alpha_amount, alpha_price, crossed_alpha=0.0):
+        """Add a completed trade to the running totals."""
+        self.trades_count += 1
+        self.total_tao += tao_amount
+        self.total_alpha += alpha_amount
+        self.crossed_alpha += crossed_alpha
+        if self.first_price is None:
+            self.first_price = alpha_price
+        self.last_price = alpha_price
+
+    def adjust(self, tao_delta, alpha_delta, trades=0):
+        """Correct the running totals once a trade's real fill is known."""
+        self.trades_count += trades
+        self.total_tao += tao_delta
+        self.total_alpha += alpha_delta
+
+    def average_price(self):
+        """Average TAO per alpha over this session's trades."""
+        if self.total_alpha > 0:
+            return self.total_tao / self.total_alpha
+        return 0.0
+
+    def price_change(self):
+        """Percent change between the first and last traded price."""
+        if self.first_price:
+            return ((self.last_price - self.first_price) / self.first_price) * 100
+        return 0.0
+
+
+class DCAStrategy:
+    side = BUY
+    name = "dca"
+
+    def __init__(self, target, min_balance=0.0):
+        self.netuid = target['target_netuid']
+        self.validator = target['validator']
+        self.purchase_amount = float(target['purchase_amount'])
+        self.max_price_threshold = float(target.get('max_price_threshold', 0.0))
+        self.min_balance = float(target.get('min_balance', min_balance))
+        self.max_slippage = float(target.get('max_slippage_percent', 0.0)) / 100
+        self.signals = SignalSet(target.get('signals'), below=True)
+        self.active = True
+        self.stats = TargetStats()
+
+    @property
+    def key(self):
+        return (self.netuid, self.validator)
+
+    def decide(self, alpha_price, wallet_balance, holdings, history=None):
+        """Decide whether to buy, mirroring DCABot.dca_cycle; `history` is the subnet's PriceHistory."""
+        self.stats.evaluations += 1
+        if wallet_balance < self.min_balance:
+            return Decision(STOP, reason=f"balance {wallet_balance:.4f} below minimum {self.min_balance:.4f} TAO")
+        if wallet_balance < self.purchase_amount:
+            return Decision(STOP, reason=f"insufficient balance {wallet_balance:.4f} < {self.purchase_amount:.4f} TAO")
+        if self.max_price_threshold > 0 and alpha_price > self.max_price_threshold:
+            self.stats.skipped_for_price += 1
+            return Decision(SKIP, reason=f"price {alpha_price:.6f} > {self.max_price_threshold:.6f} TAO")
+        reason = self.signals.blocked(alpha_price, history) if self.signals and history is not None else None
+        if reason:
+            self.stats.skipped_for_signal += 1
+            return Decision(SKIP, reason=reason)
+        return Decision(BUY, self.purchase_amount)
+
+
+class UnstakeStrategy:
+    side = SELL
+    name = "unstake"
+
+    def __init__(self, target):
+        self.netuid = target['target_netuid']
+        self.validator = target['validator']
+        self.unstake_amount = float(target['unstake_amount'])
+        self.min_price_threshold = float(target.get('min_price_threshold', 0.0))
+        self.min_holdings_threshold = target.get('min_holdings_threshold')
+        self.max_slippage = float(target.get('max_slippage_percent', 0.0)) / 100
+        self.signals = SignalSet(target.get('signals'), below=False)
+        self.active = True
+        self.stats = TargetStats()
+
+    @property
+    def key(self):
+        return (self.netuid, self.validator)
+
+    def decide(self, alpha_price, wallet_balance, holdings, history=None):
+        """Decide whether to sell, mirroring UnstakingBot.unstaking_cycle; `history` is the subnet's PriceHistory."""
+        self.stats.evaluations += 1
+        if self.min_price_threshold > 0 and alpha_price < self.min_price_threshold:
+            self.stats.skipped_for_price += 1
+            return Decision(SKIP, reason=f"price {alpha_price:.6f} < {self.min_price_threshold:.6f} TAO")
+        reason = self.signals.blocked(alpha_price, history) if self.signals and history is not None else None
+        if reason:
+            self.stats.skipped_for_signal += 1
+            return Decision(SKIP, reason=reason)
+        if holdings < self.unstake_amount:
+            if holdings > 0:
+                # Sell whatever is left below the fixed amount
+                return Decision(SELL, holdings, reason="selling remaining holdings")
+            return Decision(SKIP, reason="no holdings")
+        if self.min_holdings_threshold is not None:
+            remaining_after_sale = holdings - self.unstake_amount
+            if remaining_after_sale < self.min_holdings_threshold:
+                return Decision(SKIP, reason=f"would leave {remaining_after_sale:.6f} < {self.min_holdings_threshold:.6f} alpha")
+        return Decision(SELL, self.unstake_amount)
+
+
+def build_strategy(target, min_balance=0.0):
+    """Create the strategy described by one `targets` entry of the portfolio config."""
+    strategy = target.get('strategy', 'dca')
+    if strategy == 'dca':
+        return DCAStrategy(target, min_balance)
+    if strategy == 'unstake':
+        return UnstakeStrategy(target)
+    raise ValueError(f"Unknown strategy '{strategy}' for subnet {target.get('target_netuid')}")
@@ -0,0 +1,107 @@
+"""
+Subnet Price Snapshots
+
+A small per-block cache for subnet pool state shared by the trading bots:
+- Fetches only the target netuid's pool (price, TAO/alpha reserves) instead of all subnets
+- Pins every read to a block number so prices within a cycle are consistent
+- Falls back to a single all_subnets() read when many subnets are needed at once
+- Serves repeat reads in the same block from memory with no RPC
+- Drops all snapshots as soon as a new block is observed, and never caches a read that was
+  still in flight when it was
+"""
+
+import asyncio
+import time
+
+BLOCK_TIME_SECONDS = 12
+
+# Above this many uncached subnets one all_subnets() call beats per-subnet reads
+ALL_SUBNETS_CUTOFF = 8
+
+
+class SubnetSnapshot:
+    """Pool state of one subnet at a given block."""
+
+    __slots__ = ("netuid", "block", "price", "tao_in", "alpha_in", "info")
+
+    def __init__(self, netuid, block, info):
+        self.netuid = netuid
+        self.block = block
+        self.price = float(info.price)
+        self.tao_in = float(info.tao_in)
+        self.alpha_in = float(info.alpha_in)
+        self.info = info
+
+
+class SubnetSnapshotCache:
+    def __init__(self, block_time=BLOCK_TIME_SECONDS):
+        self.block = None
+        self.block_seen_at = 0.0
+        self.block_time = block_time
+        self._snapshots = {}
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+
+    def set_block(self, block):
+        """Record the current chain head, dropping snapshots from older blocks."""
+        if block != self.block:
+            self._snapshots.clear()
+            self.block = block
+        self.block_seen_at = time.monotonic()
+
+    def invalidate(self):
+        """Forget the current block and every cached snapshot (e.g. after a reconnect)."""
+        self.block = None
+        self._snapshots.clear()
+
+    async def current_block(self, sub):
+        """Return the current block, only asking the chain once per block time."""
+        if self.block is None or time.monotonic() - self.block_seen_at >= self.block_time:
+            self.set_block(await sub.get_current_block())
+        return self.block
+
+    def _store(self, block, snapshot):
+        """Cache a snapshot read at `block`, unless a newer head was seen while it was being read."""
+        if block == self.block:
+            self._snapshots[snapshot.netuid] = snapshot
+
+    async def get(self, sub, netuid):
+        """Get the snapshot for a subnet, fetching its pool state at most once per block."""
+        block = await self.current_block(sub)
+        snapshot = self._snapshots.get(netuid)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        info = await sub.subnet(netuid, block=block)
+        if info is None:
+            return None
+
+        self.misses += 1
+        snapshot = SubnetSnapshot(netuid, block, info)
+        self._store(block, snapshot)
+        return snapshot
+
+    async def get_many(self, sub, netuids):
+        """Get snapshots for several subnets with one round of reads; returns {netuid: snapshot}."""
+        block = await self.current_block(sub)
+        found = {netuid: self._snapshots[netuid] for netuid in netuids if netuid in self._snapshots}
+        missing = [netuid for netuid in netuids if netuid not in found]
+        self.hits += len(netuids) - len(missing)
+
+        if len(missing) > ALL_SUBNETS_CUTOFF:
+            wanted = set(missing)
+            for info in await sub.all_subnets(block_number=block) or []:
+                if info.netuid in wanted:
+                    found[info.netuid] = snapshot = SubnetSnapshot(info.netuid, block, info)
+                    self._store(block, snapshot)
+            self.misses += len(missing)
+        elif missing:
+            # Taken from the reads themselves: the cache may have moved to a newer block meanwhile
+            for netuid, snapshot in zip(missing, await asyncio.gather(*(self.get(sub, netuid) for netuid in missing))):
+                if snapshot is not None:
+                    found[netuid] = snapshot
+
+        return {netuid: found[netuid] for netuid in netuids if netuid in found}
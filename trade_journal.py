@@ -0,0 +1,172 @@
+"""
+Trade Journal
+
+A durable, append-only record of the bots' trades that survives crashes and restarts:
+- Every trade and fill correction is appended as one JSON line
+- Writes are batched and flushed by a background task, off the trading loop
+- fsync policy is configurable: every batch (default), every entry, or never
+- A compact checkpoint of the running totals is written atomically every N entries
+- Startup restores the checkpoint and replays only the journal tail after it, so resuming
+  costs the same no matter how long the history is
+- A torn last line from a crash is detected and cut off
+"""
+
+import asyncio
+import json
+import os
+
+FSYNC_BATCH = "batch"
+FSYNC_ALWAYS = "always"
+FSYNC_OFF = "off"
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_CHECKPOINT_EVERY = 100
+
+
+class TradeJournal:
+    def __init__(self, path, snapshot, fsync=FSYNC_BATCH, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
+        if fsync not in (FSYNC_BATCH, FSYNC_ALWAYS, FSYNC_OFF):
+            raise ValueError(f"Unknown journal fsync mode '{fsync}'")
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint"
+        self.snapshot = snapshot
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.seq = 0
+        self.offset = 0
+        self._buffer = []
+        self._pending_checkpoint = None
+        self._since_checkpoint = 0
+        self._file = None
+        self._wake = asyncio.Event()
+        self._task = None
+        self._closing = False
+
+        # Journal statistics
+        self.replayed = 0
+        self.restored = False
+        self.flushes = 0
+        self.written = 0
+
+    def load(self, restore, apply):
+        """Restore the checkpoint with `restore(state)` and replay the tail with `apply(entry)`."""
+        checkpoint = None
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r") as f:
+                checkpoint = json.load(f)
+            restore(checkpoint['state'])
+            self.restored = True
+            self.seq = checkpoint['seq']
+            self.offset = checkpoint['offset']
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self.offset > size:
+            # The journal was truncated or replaced; keep the checkpointed totals and append from its end
+            self.offset = size
+
+        if size > self.offset:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                tail = f.read()
+            good = 0
+            for line in tail.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                good += len(line)
+                if entry.get('seq', 0) <= self.seq:
+                    continue
+                apply(entry)
+                self.seq = entry['seq']
+                self.replayed += 1
+            self.offset += good
+            if self.offset < size:
+                # Cut off a line torn by a crash so new entries start on a clean line
+                with open(self.path, "r+b") as f:
+                    f.truncate(self.offset)
+
+        self._since_checkpoint = self.replayed
+        return self.restored or self.replayed > 0
+
+    def append(self, entry):
+        """Queue one entry for the background writer; call after the totals include it."""
+        self.seq += 1
+        entry['seq'] = self.seq
+        self._buffer.append((self.seq, json.dumps(entry, separators=(",", ":")) + "\n"))
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self._pending_checkpoint = (self.seq, self.snapshot())
+            self._since_checkpoint = 0
+        if self.fsync == FSYNC_ALWAYS or self._pending_checkpoint is not None:
+            self._wake.set()
+
+    def start(self):
+        self._file = open(self.path, "ab")
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Take the batch on the loop thread; only the disk I/O runs in a worker thread
+            batch = self._take()
+            if batch[0] or batch[1]:
+                await asyncio.to_thread(self._write, *batch)
+
+    def _take(self):
+        entries, self._buffer = self._buffer, []
+        checkpoint, self._pending_checkpoint = self._pending_checkpoint, None
+        return entries, checkpoint
+
+    def _write(self, entries, checkpoint):
+        """Append `entries` to the journal, then write `checkpoint` if one is due."""
+        checkpoint_offset = None
+        if entries:
+            data = bytearray()
+            for seq, line in entries:
+                data += line.encode()
+                if checkpoint is not None and seq == checkpoint[0]:
+                    checkpoint_offset = self.offset + len(data)
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync != FSYNC_OFF:
+                os.fsync(self._file.fileno())
+            self.offset += len(data)
+            self.written += len(entries)
+            self.flushes += 1
+        if checkpoint is not None:
+            seq, state = checkpoint
+            self._write_checkpoint(seq, state, checkpoint_offset if checkpoint_offset is not None else self.offset)
+
+    def _write_checkpoint(self, seq, state, offset):
+        """Atomically replace the checkpoint file."""
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({'seq': seq, 'offset': offset, 'state': state}, f)
+            f.flush()
+            if self.fsync != FSYNC_OFF:
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+
+    async def close(self):
+        """Stop the writer, flush everything and checkpoint the final totals."""
+        if self._file is None:
+            return
+        if self._task:
+            self._closing = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        entries, _ = self._take()
+        self._write(entries, None)
+        self._write_checkpoint(self.seq, self.snapshot(), self.offset)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,330 @@
+"""
+Trade Store
+
+A compact, array-backed store of the bots' trades:
+- One NumPy column per field instead of one dict per trade
+- Running aggregates updated in O(1) per trade: totals, VWAP, first/last/min/max price
+- Price percentiles from a mergeable log-bucket sketch (about 1% relative error)
+- Aggregates (not rows) are checkpointed, so they resume with the trade journal
+- The full history streams to CSV or Parquet in fixed-size chunks
+"""
+
+import csv
+import math
+from datetime import datetime
+
+import numpy as np
+
+SUBMITTED = "submitted"
+STATUSES = (SUBMITTED, "included", "failed", "dropped")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+INITIAL_CAPACITY = 1024
+EXPORT_CHUNK_ROWS = 65536
+
+COLUMNS = (
+    ("trade_number", np.int64),
+    ("timestamp", np.float64),
+    ("tao", np.float64),
+    ("alpha", np.float64),
+    ("price", np.float64),
+    ("wallet_balance", np.float64),
+    ("status", np.int8),
+    ("extrinsic_hash", "S66"),
+)
+
+
+class QuantileSketch:
+    """Log-bucket histogram of positive values with bounded relative error; supports removal."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = {}
+        self.count = 0
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value, count=1):
+        if value is None or value <= 0:
+            return
+        key = self._key(value)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.count += count
+
+    def remove(self, value):
+        if value is None or value <= 0:
+            return
+        key = self._key(value)
+        remaining = self.counts.get(key, 0) - 1
+        if remaining < 0:
+            return
+        if remaining:
+            self.counts[key] = remaining
+        else:
+            del self.counts[key]
+        self.count -= 1
+
+    def quantile(self, q):
+        """Approximate `q`-quantile (0..1) of the values added, or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.counts) / (self.gamma + 1)
+
+    def state(self):
+        return {'relative_accuracy': self.relative_accuracy, 'counts': {str(key): n for key, n in self.counts.items()}}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state['relative_accuracy'])
+        for key, n in state['counts'].items():
+            sketch.counts[int(key)] = n
+            sketch.count += n
+        return sketch
+
+
+class TradeStore:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.size = 0
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS}
+
+        # Running aggregates over every counted trade (including ones restored from a checkpoint)
+        self.count = 0
+        # Highest trade number issued; unlike `count`, failed and dropped trades never lower it
+        self.last_number = 0
+        self.total_tao = 0.0
+        self.total_alpha = 0.0
+        self.first_price = None
+        self.last_price = None
+        self.min_price = None
+        self.max_price = None
+        self.sketch = QuantileSketch()
+
+    def __len__(self):
+        return self.size
+
+    # --- Aggregates ----------------------------------------------------------
+
+    def record(self, tao, alpha, price, trade_number=None):
+        """Count one trade in the aggregates."""
+        self.count += 1
+        if trade_number is not None:
+            self.last_number = max(self.last_number, trade_number)
+        self.total_tao += tao
+        self.total_alpha += alpha
+        self._add_price(price)
+        if self.first_price is None:
+            self.first_price = price
+        self.last_price = price
+
+    def adjust(self, tao_delta, alpha_delta, trades_delta=0, old_price=None, new_price=None):
+        """Apply a fill correction to the aggregates."""
+        self.count += trades_delta
+        self.total_tao += tao_delta
+        self.total_alpha += alpha_delta
+        if old_price is not None:
+            self.sketch.remove(old_price)
+            if old_price in (self.min_price, self.max_price):
+                # The extreme may be gone; fall back to the sketch's outermost buckets
+                self.min_price = self.sketch.quantile(0.0)
+                self.max_price = self.sketch.quantile(1.0)
+        if new_price is not None:
+            self._add_price(new_price)
+
+    def _add_price(self, price):
+        self.sketch.add(price)
+        if self.min_price is None or price < self.min_price:
+            self.min_price = price
+        if self.max_price is None or price > self.max_price:
+            self.max_price = price
+
+    def next_number(self):
+        """Number for a new trade: one above every number issued so far."""
+        return self.last_number + 1
+
+    def vwap(self):
+        """Volume-weighted average price: total TAO over total alpha."""
+        if self.total_alpha > 0:
+            return self.total_tao / self.total_alpha
+        return 0.0
+
+    def percentile(self, percent):
+        """Approximate price percentile (0-100)."""
+        return self.sketch.quantile(percent / 100)
+
+    def price_change(self):
+        """Percent change between the first and last traded price."""
+        if self.first_price:
+            return ((self.last_price - self.first_price) / self.first_price) * 100
+        return 0.0
+
+    def state(self):
+        """Aggregates for a checkpoint; rows are not included."""
+        return {
+            'count': self.count,
+            'last_number': self.last_number,
+            'total_tao': self.total_tao,
+            'total_alpha': self.total_alpha,
+            'first_price': self.first_price,
+            'last_price': self.last_price,
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'sketch': self.sketch.state(),
+        }
+
+    def restore(self, state):
+        """Restore aggregates from a checkpoint."""
+        self.count = state['count']
+        # Checkpoints from before numbers were tracked separately
+        self.last_number = state.get('last_number', state['count'])
+        self.total_tao = state['total_tao']
+        self.total_alpha = state['total_alpha']
+        self.first_price = state['first_price']
+        self.last_price = state['last_price']
+        self.min_price = state['min_price']
+        self.max_price = state['max_price']
+        self.sketch = QuantileSketch.from_state(state['sketch'])
+
+    # --- Rows ----------------------------------------------------------------
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def append(self, trade_number, timestamp, tao, alpha, price, wallet_balance, extrinsic_hash=None):
+        """Store one trade, count it in the aggregates and return its row."""
+        if self.size == len(self._columns['tao']):
+            self._grow()
+        row = self.size
+        columns = self._columns
+        columns['trade_number'][row] = trade_number
+        columns['timestamp'][row] = timestamp
+        columns['tao'][row] = tao
+        columns['alpha'][row] = alpha
+        columns['price'][row] = price
+        columns['wallet_balance'][row] = wallet_balance
+        columns['status'][row] = STATUS_CODES[SUBMITTED]
+        columns['extrinsic_hash'][row] = (extrinsic_hash or "").encode()
+        self.size += 1
+        self.record(tao, alpha, price, trade_number)
+        return row
+
+    def get(self, row):
+        """One row as a dict."""
+        columns = self._columns
+        return {
+            'trade_number': int(columns['trade_number'][row]),
+            'timestamp': float(columns['timestamp'][row]),
+            'tao': float(columns['tao'][row]),
+            'alpha': float(columns['alpha'][row]),
+            'price': float(columns['price'][row]),
+            'wallet_balance': float(columns['wallet_balance'][row]),
+            'status': STATUSES[columns['status'][row]],
+            'extrinsic_hash': columns['extrinsic_hash'][row].decode() or None,
+        }
+
+    def set_status(self, row, status):
+        self._columns['status'][row] = STATUS_CODES[status]
+
+    def correct(self, row, tao, alpha, price, status):
+        """Replace a row's estimated fill with the real one; returns the correction applied."""
+        columns = self._columns
+        correction = {
+            'tao_delta': tao - float(columns['tao'][row]),
+            'alpha_delta': alpha - float(columns['alpha'][row]),
+            'trades_delta': 0,
+            'old_price': float(columns['price'][row]),
+            'new_price': price,
+        }
+        columns['tao'][row] = tao
+        columns['alpha'][row] = alpha
+        columns['price'][row] = price
+        columns['status'][row] = STATUS_CODES[status]
+        self.adjust(**correction)
+        return correction
+
+    def discard(self, row, status):
+        """Take a failed or dropped trade out of the aggregates; returns the correction applied."""
+        columns = self._columns
+        correction = {
+            'tao_delta': -float(columns['tao'][row]),
+            'alpha_delta': -float(columns['alpha'][row]),
+            'trades_delta': -1,
+            'old_price': float(columns['price'][row]),
+            'new_price': None,
+        }
+        columns['status'][row] = STATUS_CODES[status]
+        self.adjust(**correction)
+        return correction
+
+    def tail(self, limit):
+        """The last `limit` rows as dicts, oldest first."""
+        return [self.get(row) for row in range(max(0, self.size - limit), self.size)]
+
+    # --- Export --------------------------------------------------------------
+
+    def _chunks(self, chunk_rows):
+        for start in range(0, self.size, chunk_rows):
+            stop = min(start + chunk_rows, self.size)
+            yield {name: column[start:stop] for name, column in self._columns.items()}
+
+    def export(self, path, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Stream every row to `path` (.csv, or .parquet with pyarrow installed)."""
+        if path.endswith(".parquet"):
+            self._export_parquet(path, chunk_rows)
+        else:
+            self._export_csv(path, chunk_rows)
+        return self.size
+
+    def _export_csv(self, path, chunk_rows):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([name for name, _ in COLUMNS])
+            for chunk in self._chunks(chunk_rows):
+                timestamps = [datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") for t in chunk['timestamp']]
+                statuses = [STATUSES[code] for code in chunk['status']]
+                hashes = [h.decode() for h in chunk['extrinsic_hash']]
+                writer.writerows(zip(
+                    chunk['trade_number'].tolist(), timestamps, chunk['tao'].tolist(), chunk['alpha'].tolist(),
+                    chunk['price'].tolist(), chunk['wallet_balance'].tolist(), statuses, hashes,
+                ))
+
+    def _export_parquet(self, path, chunk_rows):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use a .csv path instead")
+
+        schema = pa.schema([
+            ("trade_number", pa.int64()),
+            ("timestamp", pa.timestamp("s")),
+            ("tao", pa.float64()),
+            ("alpha", pa.float64()),
+            ("price", pa.float64()),
+            ("wallet_balance", pa.float64()),
+            ("status", pa.string()),
+            ("extrinsic_hash", pa.string()),
+        ])
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in self._chunks(chunk_rows):
+                writer.write_table(pa.table({
+                    "trade_number": chunk['trade_number'],
+                    "timestamp": chunk['timestamp'].astype("datetime64[s]"),
+                    "tao": chunk['tao'],
+                    "alpha": chunk['alpha'],
+                    "price": chunk['price'],
+                    "wallet_balance": chunk['wallet_balance'],
+                    "status": [STATUSES[code] for code in chunk['status']],
+                    "extrinsic_hash": [h.decode() for h in chunk['extrinsic_hash']],
+                }, schema=schema))
@@ -11,182 +11,360 @@ Features:
 - Network resilience with auto-reconnection
 - Real-time profit calculations and statistics
 - Detailed session summaries when stopped
+- Optionally waits for price signals (TWAP, EWMA, volatility) from its per-block price history
 """
 
 import asyncio
 import os
 import time
-import yaml
-import bittensor as bt
+from lazy_imports import bittensor as bt, preload, ready
+from bot_logging import PRETTY, get_logger
+from bot_config import ConfigError, ConfigWatcher, UnstakingConfig, read_config
+from subnet_snapshot import BLOCK_TIME_SECONDS, SubnetSnapshotCache
+from block_scheduler import BlockScheduler, interval_to_blocks
+from cycle_pipeline import CyclePipeline, StageTimings
+from holdings_index import HoldingsIndex
+from endpoint_pool import EndpointPool
+from rpc_gateway import RpcGateway
+from retry_policy import RetryEngine
+from stake_extrinsics import compose_stake_call
+from nonce_manager import NonceManager, PipelinedSubmitter
+from inclusion_tracker import INCLUDED, InclusionTracker
+from strategies import SELL
+from price_history import SignalSet, history_for
+from amm_quotes import quote
+from chunked_executor import ChunkedExecutor
+from trade_journal import TradeJournal
+from trade_store import TradeStore
+from metrics import BotMetrics
+from profiling import CycleProfiler
 from datetime import datetime
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich import box
 import signal
 import sys
 
-console = Console()
-bt.trace()
+log = get_logger("unstaking")
+
+# Sales listed individually in the session summary; the rest are in the aggregates and export
+SUMMARY_TAIL_TRADES = 20
+
+def format_trade(f):
+    """Pretty text of a `trade` log event."""
+    return (
+        f"🔴 SALE #{f['trade_number']} | {f['timestamp']}\n"
+        f"   💰 Sold: {f['alpha_amount']:.6f} alpha for {f['tao_earned']:.6f} TAO\n"
+        f"   📊 Price: {f['alpha_price']:.6f} TAO per alpha\n"
+        f"   📈 Avg Price: {f['avg_price']:.6f} TAO per alpha\n"
+        f"   💎 Total Earned: {f['total_tao_earned']:.6f} TAO\n"
+        f"   🪙 Remaining Holdings: {f['remaining_holdings']:.6f} alpha\n"
+        f"   💳 Wallet Balance: {f['wallet_balance']:.4f} TAO\n"
+        + "─" * 60
+    )
+
+def format_order(f):
+    """Pretty text of an `order` log event."""
+    return (
+        f"🔄 Attempting sale: {f['alpha_amount']:.6f} alpha → {f['tao_amount']:.6f} TAO @ {f['price']:.6f} TAO/alpha "
+        f"(spot {f['spot_price']:.6f}, slippage {f['slippage'] * 100:.2f}%)"
+    )
+
+def format_price_skip(f):
+    """Pretty text of a `price_skip` log event."""
+    return (
+        f"Bot is running for subnet {f['netuid']}\n"
+        f"⏸️  Price too low: {f['alpha_price']:.6f} TAO < {f['threshold']:.6f} TAO threshold\n"
+        f"   💡 Waiting for higher price. Current: {f['alpha_price']:.6f} TAO, Target: ≥{f['threshold']:.6f} TAO"
+    )
+
+def format_signal_skip(f):
+    """Pretty text of a `signal_skip` log event."""
+    return f"⏸️  Signal not met on subnet {f['netuid']}: {f['reason']}"
 
 class UnstakingBot:
-    def __init__(self, config):
+    def __init__(self, config, config_file=None, password=None, gateway=None, journal_file=None):
         self.config = config
+        self.password = password
+        # Changes to the config file are applied between cycles
+        self.config_watcher = ConfigWatcher(config_file, UnstakingConfig, config) if config_file else None
         self.wallet = None
         self.sub = None
-        self.session_trades = []
         self.running = True
+        self.stop_event = asyncio.Event()
+        self.loop = None
+        self.scheduler = None
         self.start_time = time.time()
+        self.startup = StageTimings()
+        self.snapshots = SubnetSnapshotCache()
+        self.holdings = HoldingsIndex()
+        # Per-block prices from the snapshots read anyway, for the optional signal conditions
+        self.signals = SignalSet(config.signals, below=False)
+        self.history = history_for([self.signals])
+        # Optional Prometheus endpoint; the trading loop only feeds its histograms
+        self.metrics = None
+        if config.metrics_port is not None:
+            self.metrics = BotMetrics(self, "unstaking_bot", config.metrics_host, config.metrics_port)
+        self.retries = RetryEngine(on_retry=self.on_retry)
+        # Off until toggled with SIGUSR1; then profiles the next profile_cycles cycles
+        self.profiler = CycleProfiler(
+            self, "unstaking", config.profile_dir, config.profile_cycles, on_report=self.on_profile_report
+        )
+        self.tracker = InclusionTracker(lambda: self.sub)
+        # Nonces are reserved locally; each order is signed once and resubmitted as-is on retry
+        self.nonces = NonceManager()
+        self.tracker.add_listener(self.nonces.on_finished)
+        self.submitter = PipelinedSubmitter(self.nonces, self.retries, lambda: self.sub, lambda: self.wallet)
+        self.executor = None
+        if config.max_slippage_percent > 0:
+            self.executor = ChunkedExecutor(config.max_slippage_percent / 100, config.max_chunks)
+        self.trades_by_hash = {}
+        # Every RPC goes through the gateway; a fleet worker hands in one shared by its bots
+        self.shared_gateway = gateway is not None
+        self.gateway = gateway or RpcGateway(config.rpc_rate_limit, config.rpc_burst)
+        if self.metrics:
+            # Latency is measured where requests are sent, so cached and coalesced reads are not counted
+            self.gateway.add_listener(self.metrics.observe_rpc)
+        self.pool = EndpointPool(config.endpoints, gateway=self.gateway)
+        self.pool.add_listener(self.on_endpoint_switch)
+        # Holdings are prefetched during the wait; price is read fresh at wake-up
+        # Reads are looked up when called, so a running profile's timing wrappers see them
+        self.pipeline = CyclePipeline({'holdings': lambda: self.get_current_holdings()}, {'subnet': lambda: self.get_subnet_info()})
+        
+        # Session tracking: columnar sale rows plus O(1) running aggregates
+        self.trades = TradeStore()
+        self.skipped_for_price = 0
+        self.skipped_for_signal = 0
+        self.last_price = None
+        # Last holdings read by the trading loop; the metrics thread only reads this value
+        self.last_holdings = None
         
-        # Session tracking
-        self.total_tao_earned = 0.0
-        self.total_alpha_sold = 0.0
-        self.trades_count = 0
+        # Durable journal of trades; the aggregates are restored from it on restart.
+        # A fleet names the file itself (`journal_file`), since its bots may share a subnet
+        self.journal = TradeJournal(
+            journal_file or config.journal_file or f"unstaking_journal_sn{config.target_netuid}.jsonl",
+            self.journal_state,
+            fsync=config.journal_fsync
+        )
         
     async def initialize(self):
-        """Initialize wallet and subtensor connection."""
-        console.print(Panel("🚀 Initializing Unstaking Bot...", title="Startup", style="bold green"))
+        """Unlock the wallet and connect to the network concurrently, timing each startup phase."""
+        log.info(Panel("🚀 Initializing Unstaking Bot...", title="Startup", style="bold green"))
         
-        # Set up wallet
-        try:
-            self.wallet = bt.wallet(name=self.config.wallet)
-            password = os.environ.get("WALLET_PASSWORD")
-            if not password:
-                # Prompt for password if not in environment (safer)
-                import getpass
-                console.print(f"Using Wallet '{self.config.wallet}' ")
-                password = getpass.getpass("🔐 Enter wallet password: ")
-            if password:
-                self.wallet.coldkey_file.save_password_to_env(password)
-                # Clear password from memory
-                del password
-            self.wallet.unlock_coldkey()
-            console.print(f"✅ Wallet '{self.config.wallet}' loaded successfully")
-        except Exception as e:
-            console.print(Panel(f"❌ Error loading wallet: {e}", title="Error", style="bold red"))
+        # Ask for the password first; the bittensor import started at launch continues meanwhile
+        with self.startup.measure("password"):
+            # A password handed over by the fleet supervisor is used once and never prompted for
+            password, self.password = self.password, None
+            if password is None:
+                password = os.environ.get("WALLET_PASSWORD")
+                if not password:
+                    # Prompt for password if not in environment (safer)
+                    import getpass
+                    log.info(f"Using Wallet '{self.config.wallet}' ")
+                    log.flush()
+                    password = getpass.getpass("🔐 Enter wallet password: ")
+        with self.startup.measure("import"):
+            await ready(bt)
+        if log.mode == PRETTY:
+            bt.trace()
+        
+        # Decrypt the coldkey in a worker thread while every endpoint connects
+        unlocked, connected = await asyncio.gather(
+            self.startup.timed("wallet", asyncio.to_thread(self.unlock_wallet, password)),
+            self.startup.timed("connect", self.pool.connect()),
+            return_exceptions=True
+        )
+        # Clear password from memory
+        del password
+        
+        if isinstance(unlocked, Exception):
+            log.error(Panel(f"❌ Error loading wallet: {unlocked}", title="Error", style="bold red"))
+            await self.pool.close()
             return False
+        log.info(f"✅ Wallet '{self.config.wallet}' loaded successfully")
         
-        # Set up subtensor connection
-        try:
-            self.sub = bt.async_subtensor()
-            await self.sub.initialize()
-            current_block = await self.sub.get_current_block()
-            console.print(f"✅ Connected to Bittensor network (Block: {current_block})")
-        except Exception as e:
-            console.print(Panel(f"❌ Error connecting to network: {e}", title="Error", style="bold red"))
+        # The healthiest endpoint becomes active
+        if isinstance(connected, Exception):
+            log.error(Panel(f"❌ Error connecting to network: {connected}", title="Error", style="bold red"))
             return False
+        endpoint = connected
+        self.sub = endpoint.sub
+        self.pool.start()
+        log.info(f"✅ Connected to Bittensor network via {endpoint.label} (Block: {endpoint.block})")
+        if len(self.pool.endpoints) > 1:
+            log.info(f"🔀 Warm standby endpoints: {len(self.pool.ranked()) - 1}/{len(self.pool.endpoints) - 1}")
         
         return True
     
+    def unlock_wallet(self, password):
+        """Load and decrypt the coldkey; blocking, so it runs in a worker thread."""
+        wallet = bt.wallet(name=self.config.wallet)
+        if password:
+            wallet.coldkey_file.save_password_to_env(password)
+        wallet.unlock_coldkey()
+        self.wallet = wallet
+    
+    @property
+    def trades_count(self):
+        return self.trades.count
+    
+    @property
+    def total_tao_earned(self):
+        return self.trades.total_tao
+    
+    @property
+    def total_alpha_sold(self):
+        return self.trades.total_alpha
+    
+    def on_endpoint_switch(self, endpoint):
+        """Move to a newly selected endpoint and drop state read from the old one."""
+        self.sub = endpoint.sub
+        self.snapshots.invalidate()
+        self.holdings.invalidate()
+        self.pipeline.discard()
+        self.nonces.invalidate()
+        self.retries.breaker.reset()
+        log.info(f"🔀 Switched to endpoint {endpoint.label} (Block: {endpoint.block})")
+    
+    def log_startup(self):
+        """Report the startup phases (wallet and connect overlap) and the time until the first cycle."""
+        phases = {stage: last_ms / 1000 for stage, count, avg_ms, last_ms, max_ms in self.startup.summary()}
+        phases['ready'] = time.time() - self.start_time
+        log.event('startup', lambda f: "⏱️ Startup: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in f.items()), **phases)
+    
+    def on_profile_report(self, path):
+        """Report a finished profile."""
+        log.info(f"🔬 Profile written to {path}")
+    
+    def on_retry(self, name, attempt, attempts, error):
+        """Report a failed attempt that is about to be retried."""
+        log.warning(f"⚠️ Error in {name} (attempt {attempt}/{attempts}): {error}")
+    
     async def get_subnet_info(self):
-        """Get information about the target subnet with retry logic."""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                subnets = await self.sub.all_subnets()
-                for subnet in subnets:
-                    if subnet.netuid == self.config.target_netuid:
-                        return subnet
-                return None
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    console.print(f"⚠️ Error getting subnet info (attempt {attempt + 1}/{max_retries}): {e}")
-                    await asyncio.sleep(5)
-                    continue
-                else:
-                    raise e
+        """Get the target subnet's pool snapshot for the current block under the read retry policy."""
+        snapshot = await self.retries.call(
+            "subnet", lambda: self.snapshots.get(self.sub, self.config.target_netuid)
+        )
+        if snapshot:
+            self.history.record(snapshot.block, snapshot.price)
+        return snapshot
     
-    async def get_current_holdings(self):
-        """Get current alpha holdings in the target subnet with retry logic."""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                stake_info = await self.sub.get_stake_for_coldkey(coldkey_ss58=self.wallet.coldkeypub.ss58_address)
-                for stake in stake_info:
-                    if stake.netuid == self.config.target_netuid and stake.hotkey_ss58 == self.config.validator:
-                        return float(stake.stake)
-                return 0.0
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    console.print(f"⚠️ Error getting holdings (attempt {attempt + 1}/{max_retries}): {e}")
-                    await asyncio.sleep(5)
-                    continue
-                else:
-                    console.print(f"❌ Failed to get holdings after {max_retries} attempts: {e}")
-                    return 0.0
+    async def get_current_holdings(self, refresh=True):
+        """Get current alpha holdings in the target subnet from the holdings index under the read retry policy.
+        
+        With `refresh=False` the last index (plus our own submitted trades) is used without a new read.
+        """
+        try:
+            if refresh or not self.holdings.loaded:
+                await self.retries.call(
+                    "get_stake_for_coldkey",
+                    lambda: self.holdings.refresh(self.sub, self.wallet.coldkeypub.ss58_address)
+                )
+            self.last_holdings = self.holdings.get(self.config.target_netuid, self.config.validator)
+            return self.last_holdings
+        except Exception as e:
+            log.error(f"❌ Failed to get holdings: {e}")
+            return 0.0
     
     async def get_wallet_balance(self):
-        """Get current wallet balance with retry logic."""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                return float(await self.sub.get_balance(self.wallet.coldkey.ss58_address))
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    console.print(f"⚠️ Error getting wallet balance (attempt {attempt + 1}/{max_retries}): {e}")
-                    await asyncio.sleep(5)
-                    continue
-                else:
-                    raise e
+        """Get current wallet balance under the read retry policy."""
+        return float(await self.retries.call(
+            "get_balance", lambda: self.sub.get_balance(self.wallet.coldkey.ss58_address)
+        ))
     
     async def unstake_alpha(self, amount_alpha):
-        """Unstake/sell alpha from the target subnet with retry logic."""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                result = await self.sub.unstake(
-                    wallet=self.wallet,
-                    hotkey_ss58=self.config.validator,
-                    netuid=self.config.target_netuid,
-                    amount=bt.Balance.from_tao(amount_alpha),
-                    wait_for_inclusion=False,
-                    wait_for_finalization=False
-                )
-                return True
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    console.print(f"⚠️ Error unstaking alpha (attempt {attempt + 1}/{max_retries}): {e}")
-                    await asyncio.sleep(10)  # Longer wait for transaction retries
-                    continue
-                else:
-                    console.print(f"❌ Failed to unstake alpha after {max_retries} attempts: {e}")
-                    return False
+        """Unstake/sell alpha from the target subnet under the extrinsic retry policy; returns the extrinsic hash or None."""
+        try:
+            return await self.submitter.submit("unstake", lambda sub: compose_stake_call(
+                sub, SELL, self.config.validator, self.config.target_netuid, amount_alpha
+            ))
+        except Exception as e:
+            log.error(f"❌ Failed to unstake alpha: {e}")
+            return None
     
-    def log_trade(self, alpha_amount, alpha_price, tao_earned, wallet_balance, remaining_holdings):
+    def log_trade(self, alpha_amount, alpha_price, tao_earned, wallet_balance, remaining_holdings, extrinsic_hash=None):
         """Log an unstaking transaction."""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        trade_record = {
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        trade_number = self.trades.next_number()
+        row = self.trades.append(trade_number, now, tao_earned, alpha_amount, alpha_price, wallet_balance, extrinsic_hash)
+        if extrinsic_hash:
+            self.trades_by_hash[extrinsic_hash] = row
+        self.journal.append({
+            'type': 'trade',
             'timestamp': timestamp,
             'alpha_amount': alpha_amount,
             'alpha_price': alpha_price,
             'tao_earned': tao_earned,
             'wallet_balance_after': wallet_balance,
-            'trade_number': self.trades_count + 1
-        }
-        
-        self.session_trades.append(trade_record)
-        self.total_tao_earned += tao_earned
-        self.total_alpha_sold += alpha_amount
-        self.trades_count += 1
-        
-        # Calculate running averages
-        avg_price = self.calculate_average_price()
+            'trade_number': trade_number,
+            'extrinsic_hash': extrinsic_hash,
+            'status': 'submitted'
+        })
         
-        # Console log with enhanced information
-        console.print(f"🔴 SALE #{self.trades_count} | {timestamp}")
-        console.print(f"   💰 Sold: {alpha_amount:.6f} alpha for {tao_earned:.6f} TAO")
-        console.print(f"   📊 Price: {alpha_price:.6f} TAO per alpha")
-        console.print(f"   📈 Avg Price: {avg_price:.6f} TAO per alpha")
-        console.print(f"   💎 Total Earned: {self.total_tao_earned:.6f} TAO")
-        console.print(f"   🪙 Remaining Holdings: {remaining_holdings:.6f} alpha")
-        console.print(f"   💳 Wallet Balance: {wallet_balance:.4f} TAO")
-        console.print("─" * 60)
+        # One structured event; the pretty text is rendered off the trading loop
+        log.event(
+            'trade', format_trade,
+            trade_number=trade_number, timestamp=timestamp, alpha_amount=alpha_amount, tao_earned=tao_earned,
+            alpha_price=alpha_price, avg_price=self.calculate_average_price(), total_tao_earned=self.total_tao_earned,
+            remaining_holdings=remaining_holdings, wallet_balance=wallet_balance, extrinsic_hash=extrinsic_hash
+        )
+    
+    def reconcile_trade(self, tracked):
+        """Correct a logged sale with its on-chain outcome."""
+        row = self.trades_by_hash.pop(tracked.extrinsic_hash, None)
+        if row is None:
+            return
+        trade = self.trades.get(row)
+        if tracked.status == INCLUDED:
+            if not tracked.alpha_amount:
+                self.trades.set_status(row, tracked.status)
+                return
+            log.info(
+                f"🧾 SALE #{trade['trade_number']} included in block {tracked.block}: "
+                f"{tracked.alpha_amount:.6f} alpha for {tracked.tao_amount:.6f} TAO "
+                f"(estimated {trade['tao']:.6f} TAO)"
+            )
+            correction = self.trades.correct(row, tracked.tao_amount, tracked.alpha_amount, tracked.price, tracked.status)
+        else:
+            log.warning(f"⚠️ SALE #{trade['trade_number']} {tracked.status} on chain; removed from session totals")
+            correction = self.trades.discard(row, tracked.status)
+        self.journal.append(dict(correction, type='correction', trade_number=trade['trade_number'], status=tracked.status))
+    
+    def journal_state(self):
+        """Running aggregates written to the journal checkpoint."""
+        return self.trades.state()
+    
+    def restore_journal(self, state):
+        """Restore the running aggregates from a journal checkpoint."""
+        self.trades.restore(state)
+    
+    def replay_journal(self, entry):
+        """Apply one journal entry written after the last checkpoint."""
+        if entry['type'] == 'trade':
+            self.trades.record(entry['tao_earned'], entry['alpha_amount'], entry['alpha_price'], entry['trade_number'])
+        else:
+            self.trades.adjust(
+                entry['tao_delta'], entry['alpha_delta'], entry['trades_delta'],
+                entry.get('old_price'), entry.get('new_price')
+            )
+    
+    def session_stats(self):
+        """Session totals in the form the fleet supervisor adds up across wallets."""
+        return {
+            'trades': self.trades_count,
+            'tao_spent': 0.0,
+            'tao_earned': self.total_tao_earned,
+            'alpha_bought': 0.0,
+            'alpha_sold': self.total_alpha_sold,
+            'skipped_for_price': self.skipped_for_price,
+            'skipped_for_signal': self.skipped_for_signal,
+            'failovers': self.pool.failovers,
+        }
     
     def calculate_average_price(self):
         """Calculate average price received for alpha sales."""
-        if self.total_alpha_sold > 0:
-            return self.total_tao_earned / self.total_alpha_sold
-        return 0.0
+        return self.trades.vwap()
     
     def print_session_summary(self):
         """Print detailed session summary."""
@@ -204,129 +382,297 @@ class UnstakingBot:
         
         table.add_row("🎯 Target Subnet", str(self.config.target_netuid))
         table.add_row("⏱️ Session Duration", f"{hours}h {minutes}m {seconds}s")
+        if self.journal.restored or self.journal.replayed:
+            table.add_row("📂 Resumed From", self.journal.path)
         table.add_row("🔢 Total Sales", str(self.trades_count))
         table.add_row("🪙 Total Alpha Sold", f"{self.total_alpha_sold:.6f} alpha")
         table.add_row("💰 Total TAO Earned", f"{self.total_tao_earned:.6f} TAO")
         table.add_row("📈 Average Price Received", f"{avg_price:.6f} TAO per alpha")
+        if self.trades_count > 0 and self.trades.min_price is not None:
+            table.add_row("↕️ Price Range", f"{self.trades.min_price:.6f} – {self.trades.max_price:.6f} TAO")
+            table.add_row("📐 Median / p90 Price", f"{self.trades.percentile(50):.6f} / {self.trades.percentile(90):.6f} TAO")
+        
+        table.add_row("⏸️ Skipped for Price", str(self.skipped_for_price))
+        if self.signals:
+            table.add_row("🚦 Skipped for Signals", str(self.skipped_for_signal))
+        twap = self.history.twap(self.history.window)
+        if twap is not None:
+            table.add_row(
+                f"📉 TWAP / Volatility ({self.history.window} blocks)",
+                f"{twap:.6f} TAO / {self.history.volatility(self.history.window) * 100:.3f}%"
+            )
+        
+        if self.scheduler:
+            table.add_row("🧱 Missed Blocks", str(self.scheduler.missed_blocks))
+            table.add_row("⏭️ Skipped Evaluations", str(self.scheduler.skipped_evaluations))
+        table.add_row(
+            "🧾 Confirmed Fills",
+            f"{self.tracker.included}/{self.tracker.tracked} ({self.tracker.failed} failed, {self.tracker.dropped} dropped)"
+        )
+        if self.executor:
+            table.add_row(
+                "🧩 Chunked Orders",
+                f"{self.executor.split_orders}/{self.executor.orders} split, {self.executor.chunks} chunks, "
+                f"worst slippage {self.executor.worst_slippage * 100:.2f}%"
+            )
+        table.add_row(
+            "#️⃣ Nonces",
+            f"{self.nonces.reserved} reserved, {self.nonces.syncs} syncs, {self.nonces.released} released, "
+            f"{self.nonces.dropped} dropped, {self.submitter.resubmits} resubmits, "
+            f"{self.submitter.resigns} re-signed"
+        )
+        table.add_row(
+            "🛂 RPC Gateway",
+            f"{self.gateway.requests} sent, {self.gateway.coalesced} coalesced, "
+            f"{self.gateway.throttled} throttled ({self.gateway.throttled_seconds:.1f}s waited)"
+        )
+        table.add_row("🔀 Failovers", str(self.pool.failovers))
+        if self.pool.recover_times:
+            table.add_row("🩹 Avg Time to Recover", f"{self.pool.average_recover_time():.2f}s")
+        table.add_row("⚡ Circuit Breaker Trips", str(self.retries.breaker.trips))
+        for name, stats in self.retries.stats.items():
+            table.add_row(
+                f"📡 {name}",
+                f"{stats.calls} calls / {stats.retries} retries / {stats.average_latency() * 1000:.0f} ms avg"
+            )
+        table.add_row("📦 Prefetched Cycles", f"{self.pipeline.prefetch_hits}/{self.pipeline.prefetch_hits + self.pipeline.prefetch_misses}")
+        for stage, count, avg_ms, last_ms, max_ms in self.pipeline.timings.summary():
+            table.add_row(f"⏱️ {stage}", f"{avg_ms:.0f} ms avg / {max_ms:.0f} ms max")
         
-        if self.trades_count > 0:
-            first_trade = self.session_trades[0]
-            last_trade = self.session_trades[-1]
-            price_change = ((last_trade['alpha_price'] - first_trade['alpha_price']) / first_trade['alpha_price']) * 100
-            table.add_row("📊 Price Change", f"{price_change:+.2f}%")
+        if self.trades_count > 0 and self.trades.first_price:
+            table.add_row("📊 Price Change", f"{self.trades.price_change():+.2f}%")
         
-        console.print()
-        console.print(table)
+        log.info()
+        log.info(table)
         
-        # Print detailed trade history
-        if self.session_trades:
-            console.print()
-            console.print(Panel("📋 Sales History", style="bold red"))
-            for trade in self.session_trades:
-                console.print(
-                    f"#{trade['trade_number']:2d} | {trade['timestamp']} | "
-                    f"{trade['alpha_amount']:8.6f} alpha @ {trade['alpha_price']:8.6f} TAO | "
-                    f"Earned: {trade['tao_earned']:.6f} TAO"
+        # Print the most recent sales; the full history goes to the export file
+        if len(self.trades):
+            log.info()
+            recent = self.trades.tail(SUMMARY_TAIL_TRADES)
+            log.info(Panel(f"📋 Sales History (last {len(recent)} of {len(self.trades)})", style="bold red"))
+            for trade in recent:
+                log.info(
+                    f"#{trade['trade_number']:2d} | {datetime.fromtimestamp(trade['timestamp']).strftime('%Y-%m-%d %H:%M:%S')} | "
+                    f"{trade['alpha']:8.6f} alpha @ {trade['price']:8.6f} TAO | "
+                    f"{trade['status']:9} | "
+                    f"Earned: {trade['tao']:.6f} TAO"
                 )
     
+    def export_trades(self):
+        """Write the session's sales to the configured export file, if any."""
+        path = self.config.trade_export
+        if not path or not len(self.trades):
+            return
+        try:
+            rows = self.trades.export(path)
+            log.info(f"💾 Exported {rows} sales to {path}")
+        except Exception as e:
+            log.error(f"❌ Failed to export trades: {e}")
+    
+    def price_ok(self, alpha_price):
+        """True while the price is within the configured sell threshold."""
+        threshold = self.config.min_price_threshold
+        return not threshold or alpha_price >= threshold
+    
+    def can_sell_at(self, alpha_price):
+        """True while both the price threshold and the signal conditions allow a sale."""
+        return self.price_ok(alpha_price) and not self.signals.blocked(alpha_price, self.history)
+    
+    async def submit_sale(self, amount_alpha, sale_quote, subnet_info):
+        """Submit one sale priced from the pool reserves; returns the extrinsic hash or None."""
+        tao_to_earn = sale_quote.output
+        log.event(
+            'order', format_order, alpha_amount=amount_alpha, tao_amount=tao_to_earn, price=sale_quote.price,
+            spot_price=subnet_info.price, slippage=sale_quote.slippage
+        )
+        
+        # Execute the sale
+        with self.pipeline.timings.measure("submit"):
+            extrinsic_hash = await self.unstake_alpha(amount_alpha)
+        
+        if extrinsic_hash:
+            self.holdings.apply_trade(self.config.target_netuid, self.config.validator, -amount_alpha)
+            # Update balance and holdings after sale
+            with self.pipeline.timings.measure("post_trade"):
+                wallet_balance, remaining_holdings = await asyncio.gather(
+                    self.get_wallet_balance(), self.get_current_holdings(refresh=False)
+                )
+            self.log_trade(amount_alpha, sale_quote.price, tao_to_earn, wallet_balance, remaining_holdings, extrinsic_hash)
+            # Follow the extrinsic in the background and correct the record with the real fill
+            self.tracker.track(extrinsic_hash, SELL, self.config.target_netuid, self.config.validator, self.reconcile_trade)
+        else:
+            log.error("❌ Sale failed")
+        return extrinsic_hash
+    
     async def unstaking_cycle(self):
         """Execute one unstaking cycle."""
         try:
-            # Get subnet information
-            subnet_info = await self.get_subnet_info()
+            # Read price and holdings concurrently
+            reads = await self.pipeline.read()
+            self.pool.mark_recovered()
+            subnet_info = reads['subnet']
+            current_holdings = reads['holdings']
             if not subnet_info:
-                console.print(f"❌ Error: Could not find subnet {self.config.target_netuid}")
+                log.error(f"❌ Error: Could not find subnet {self.config.target_netuid}")
                 return False
             
-            alpha_price = float(subnet_info.price)
+            alpha_price = subnet_info.price
+            self.last_price = alpha_price
             
             # Check if we should sell based on price threshold
-            if hasattr(self.config, 'min_price_threshold') and self.config.min_price_threshold > 0:
-                if alpha_price < self.config.min_price_threshold:
-                    console.print(f"Bot is running for subnet {str(self.config.target_netuid)}")
-                    console.print(f"⏸️  Price too low: {alpha_price:.6f} TAO < {self.config.min_price_threshold:.6f} TAO threshold")
-                    console.print(f"   💡 Waiting for higher price. Current: {alpha_price:.6f} TAO, Target: ≥{self.config.min_price_threshold:.6f} TAO")
-                    return True  # Continue running, just skip this sale
+            if not self.price_ok(alpha_price):
+                self.skipped_for_price += 1
+                log.event(
+                    'price_skip', format_price_skip,
+                    netuid=self.config.target_netuid, alpha_price=alpha_price, threshold=self.config.min_price_threshold
+                )
+                return True  # Continue running, just skip this sale
+            
+            # Check the signal conditions against the price history, if configured
+            signal_reason = self.signals.blocked(alpha_price, self.history)
+            if signal_reason:
+                self.skipped_for_signal += 1
+                log.event('signal_skip', format_signal_skip, netuid=self.config.target_netuid, alpha_price=alpha_price, reason=signal_reason)
+                return True
             
             # Check current holdings
-            current_holdings = await self.get_current_holdings()
             if current_holdings < self.config.unstake_amount:
-                console.print(f"🛑 Insufficient holdings: {current_holdings:.6f} < {self.config.unstake_amount:.6f} alpha needed")
-                # console.print(f"   💡 Need at least {self.config.unstake_amount:.6f} alpha to unstake")
+                log.info(f"🛑 Insufficient holdings: {current_holdings:.6f} < {self.config.unstake_amount:.6f} alpha needed")
+                # log.info(f"   💡 Need at least {self.config.unstake_amount:.6f} alpha to unstake")
                 
-                console.print(f"Selling all the remaining {current_holdings:.6f}")
+                log.info(f"Selling all the remaining {current_holdings:.6f}")
                     
-                success = await self.unstake_alpha(current_holdings)
+                with self.pipeline.timings.measure("submit"):
+                    success = await self.unstake_alpha(current_holdings)
                     
                 if success:
-                    console.print(f" ✅ Sold all the remaining Alpha below the {self.config.unstake_amount}")
+                    self.holdings.apply_trade(self.config.target_netuid, self.config.validator, -current_holdings)
+                    log.info(f" ✅ Sold all the remaining Alpha below the {self.config.unstake_amount}")
                 else:
-                    console.print("❌ Sale failed")
+                    log.error("❌ Sale failed")
                 return True  # Continue running, maybe more alpha will be available later
             
             # Check minimum holdings threshold
-            if hasattr(self.config, 'min_holdings_threshold'):
+            if self.config.min_holdings_threshold is not None:
                 remaining_after_sale = current_holdings - self.config.unstake_amount
                 if remaining_after_sale < self.config.min_holdings_threshold:
-                    console.print(f"🛑 Would leave holdings below threshold: {remaining_after_sale:.6f} < {self.config.min_holdings_threshold:.6f} alpha")
+                    log.info(f"🛑 Would leave holdings below threshold: {remaining_after_sale:.6f} < {self.config.min_holdings_threshold:.6f} alpha")
                     return True  # Skip this sale to maintain minimum holdings
             
-            tao_to_earn = self.config.unstake_amount * alpha_price
-            
-            console.print(f"🔄 Attempting sale: {self.config.unstake_amount:.6f} alpha → {tao_to_earn:.6f} TAO @ {alpha_price:.6f} TAO/alpha")
-            
-            # Execute the sale
-            success = await self.unstake_alpha(self.config.unstake_amount)
-            
-            if success:
-                # Update balance and holdings after sale
-                wallet_balance = await self.get_wallet_balance()
-                remaining_holdings = await self.get_current_holdings()
-                self.log_trade(self.config.unstake_amount, alpha_price, tao_to_earn, wallet_balance, remaining_holdings)
+            if self.executor:
+                # Spread the sale over blocks so each chunk stays within the slippage bound
+                fills, unfilled = await self.executor.execute(
+                    SELL, self.config.unstake_amount, subnet_info,
+                    self.get_subnet_info, self.submit_sale, self.scheduler.wait_block,
+                    price_ok=self.can_sell_at
+                )
+                if len(fills) > 1 or unfilled > 0:
+                    log.info(
+                        f"🧩 Sale split into {len(fills)} chunks, "
+                        f"{self.config.unstake_amount - unfilled:.6f}/{self.config.unstake_amount:.6f} alpha submitted"
+                    )
             else:
-                console.print("❌ Sale failed")
+                await self.submit_sale(
+                    self.config.unstake_amount, quote(subnet_info, SELL, self.config.unstake_amount), subnet_info
+                )
             
             return True
             
         except Exception as e:
-            console.print(f"❌ Error in unstaking cycle: {e}")
-            console.print("🔄 Attempting to reconnect to network...")
+            log.error(f"❌ Error in unstaking cycle: {e}")
+            log.info("🔄 Failing over to the healthiest endpoint...")
             
-            # Try to reconnect to the network
+            # Switch to a warm standby (or reconnect in place) without waiting
             try:
-                if self.sub:
-                    await self.sub.close()
-                await asyncio.sleep(10)  # Wait before reconnecting
-                self.sub = bt.async_subtensor()
-                await self.sub.initialize()
-                current_block = await self.sub.get_current_block()
-                console.print(f"✅ Reconnected to network (Block: {current_block})")
-                return True  # Continue running after successful reconnection
+                await self.pool.failover()
+                return True  # Continue running on the new endpoint
             except Exception as reconnect_error:
-                console.print(f"❌ Failed to reconnect: {reconnect_error}")
-                console.print("⏳ Will retry in next cycle...")
+                log.error(f"❌ Failed to reconnect: {reconnect_error}")
+                log.info("⏳ Will retry in next cycle...")
                 return True  # Continue running, will retry in next cycle
     
+    def reload_config(self):
+        """Apply a changed config file between cycles; an invalid change is rejected and the current config kept."""
+        try:
+            reloaded = self.config_watcher.poll()
+        except ConfigError as e:
+            log.error(f"❌ Config change rejected, keeping the current config: {e}")
+            return
+        if reloaded:
+            config, changed = reloaded
+            self.apply_config(config)
+            log.info("🔄 Config reloaded: " + ", ".join(f"{name}={getattr(config, name)}" for name in changed))
+    
+    def apply_config(self, config):
+        """Switch to a reloaded config; the wallet, connection and journal stay as they are."""
+        self.config = config
+        self.scheduler.interval_blocks = interval_to_blocks(config)
+        if config.max_slippage_percent <= 0:
+            self.executor = None
+        elif self.executor is None:
+            self.executor = ChunkedExecutor(config.max_slippage_percent / 100, config.max_chunks)
+        else:
+            self.executor.max_slippage = config.max_slippage_percent / 100
+            self.executor.max_chunks = max(1, config.max_chunks)
+        self.profiler.directory = config.profile_dir
+        self.profiler.default_cycles = config.profile_cycles
+        # The history is kept unless the new conditions need a longer window or another EWMA
+        self.signals = SignalSet(config.signals, below=False)
+        self.history = history_for([self.signals], self.history)
+        if not self.shared_gateway:
+            self.gateway.configure(config.rpc_rate_limit, config.rpc_burst)
+        log.set_level(config.log_level)
+    
+    def create_scheduler(self):
+        """Create the block scheduler and register every per-block listener."""
+        self.scheduler = BlockScheduler(interval_to_blocks(self.config), self.stop_event)
+        self.scheduler.add_listener(self.snapshots.set_block)
+        self.scheduler.add_listener(self.holdings.set_block)
+        self.scheduler.add_listener(self.tracker.on_block)
+        return self.scheduler
+    
     async def run(self):
         """Main bot loop."""
         if not await self.initialize():
             return
         
+        # Evaluate on block boundaries instead of sleeping in wall-clock steps
+        self.loop = asyncio.get_running_loop()
+        self.create_scheduler()
+        self.scheduler.start(lambda: self.sub)
+        self.tracker.start()
+        
+        # Resume the totals of earlier runs from the journal checkpoint and tail
+        with self.startup.measure("journal"):
+            resumed = self.journal.load(self.restore_journal, self.replay_journal)
+        if resumed:
+            log.info(
+                f"📂 Resumed from {self.journal.path}: {self.trades_count} trades, "
+                f"avg {self.calculate_average_price():.6f} TAO per alpha ({self.journal.replayed} entries replayed)"
+            )
+        self.journal.start()
+        if self.metrics:
+            try:
+                self.metrics.start()
+                log.info(f"📈 Metrics at http://{self.metrics.server.host}:{self.metrics.server.port}/metrics")
+            except OSError as e:
+                log.error(f"❌ Could not start metrics endpoint: {e}")
+        
         # Print initial configuration
         price_filter_text = ""
-        if hasattr(self.config, 'min_price_threshold') and self.config.min_price_threshold > 0:
+        if self.config.min_price_threshold > 0:
             price_filter_text = f"💲 Min Price: {self.config.min_price_threshold:.6f} TAO per alpha\n"
         else:
             price_filter_text = f"💲 Min Price: No limit (sell at any price)\n"
             
         min_holdings_text = ""
-        if hasattr(self.config, 'min_holdings_threshold'):
+        if self.config.min_holdings_threshold is not None:
             min_holdings_text = f"🪙 Min Holdings: {self.config.min_holdings_threshold:.6f} alpha\n"
             
-        console.print(Panel(
+        log.info(Panel(
             f"🎯 Target Subnet: {self.config.target_netuid}\n"
             f"🪙 Unstake Amount: {self.config.unstake_amount:.6f} alpha per trade\n"
-            f"⏰ Interval: {self.config.interval_seconds} seconds\n"
+            f"⏰ Interval: {self.scheduler.interval_blocks} blocks (~{self.scheduler.interval_blocks * BLOCK_TIME_SECONDS} seconds)\n"
             f"{price_filter_text}"
             f"{min_holdings_text}"
             f"🔑 Validator: {self.config.validator}",
@@ -334,77 +680,123 @@ class UnstakingBot:
             style="bold red"
         ))
         
-        # Initial status
-        wallet_balance = await self.get_wallet_balance()
-        holdings = await self.get_current_holdings()
-        console.print(f"💳 Starting Wallet Balance: {wallet_balance:.4f} TAO")
-        console.print(f"🪙 Current Alpha Holdings: {holdings:.6f} alpha")
-        console.print("─" * 60)
+        # Initial status, read concurrently
+        wallet_balance, holdings = await self.startup.timed(
+            "initial_reads", asyncio.gather(self.get_wallet_balance(), self.get_current_holdings())
+        )
+        log.info(f"💳 Starting Wallet Balance: {wallet_balance:.4f} TAO")
+        log.info(f"🪙 Current Alpha Holdings: {holdings:.6f} alpha")
+        self.log_startup()
+        log.info("─" * 60)
         
         try:
             while self.running:
                 # Execute unstaking cycle
-                should_continue = await self.unstaking_cycle()
+                started = time.perf_counter()
+                if self.profiler.active:
+                    should_continue = await self.profiler.run_cycle(lambda: self.unstaking_cycle())
+                else:
+                    should_continue = await self.unstaking_cycle()
+                if self.metrics:
+                    self.metrics.cycle_seconds.observe(time.perf_counter() - started)
                 if not should_continue:
                     break
+                if self.config_watcher:
+                    self.reload_config()
                 
-                # Wait for next interval
-                console.print(f"⏳ Waiting {self.config.interval_seconds} seconds until next check...")
-                for i in range(self.config.interval_seconds):
-                    if not self.running:
-                        break
-                    await asyncio.sleep(1)
+                # Wait for the next due block
+                log.info(f"⏳ Waiting {self.scheduler.interval_blocks} blocks until next check...")
+                missed_blocks = self.scheduler.missed_blocks
+                skipped_evaluations = self.scheduler.skipped_evaluations
+                block = await self.scheduler.wait_next(on_lead=self.pipeline.prefetch)
+                if block is None:
+                    break
+                if self.scheduler.missed_blocks > missed_blocks or self.scheduler.skipped_evaluations > skipped_evaluations:
+                    log.warning(
+                        f"⚠️ Block {block}: {self.scheduler.missed_blocks - missed_blocks} missed blocks, "
+                        f"{self.scheduler.skipped_evaluations - skipped_evaluations} skipped evaluations"
+                    )
         
         except KeyboardInterrupt:
-            console.print("\n🛑 Bot stopped by user")
+            log.info("\n🛑 Bot stopped by user")
         
         finally:
-            console.print()
-            console.print(Panel("📊 Generating Session Summary...", style="bold yellow"))
+            log.info()
+            log.info(Panel("📊 Generating Session Summary...", style="bold yellow"))
             self.print_session_summary()
+            self.export_trades()
             
-            if self.sub:
-                await self.sub.close()
+            self.pipeline.discard()
+            await self.profiler.finish()
+            await self.tracker.stop()
+            await self.journal.close()
+            if self.metrics:
+                await self.metrics.stop()
+            await self.scheduler.stop()
+            await self.pool.close()
     
     def stop(self):
         """Stop the bot gracefully."""
         self.running = False
+        # Wake the scheduler right away, even from a signal handler
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        else:
+            self.stop_event.set()
 
 def load_config(config_file="unstaking_config.yaml"):
-    """Load configuration from YAML file."""
+    """Load and validate configuration from YAML file."""
     try:
-        with open(config_file, "r") as f:
-            config = yaml.safe_load(f)
-        return type('Config', (), config)()
+        return read_config(config_file, UnstakingConfig)
     except FileNotFoundError:
-        console.print(Panel(f"❌ Config file '{config_file}' not found!", title="Error", style="bold red"))
+        log.error(Panel(f"❌ Config file '{config_file}' not found!", title="Error", style="bold red"))
         return None
     except Exception as e:
-        console.print(Panel(f"❌ Error loading config: {e}", title="Error", style="bold red"))
+        log.error(Panel(f"❌ Error loading config: {e}", title="Error", style="bold red"))
         return None
 
+def profile_signal_handler(bot):
+    """Toggle cycle profiling on SIGUSR1."""
+    def handler(signum, frame):
+        if bot.profiler.toggle():
+            log.info(f"🔬 Profiling the next {bot.profiler.requested} cycles...")
+        else:
+            log.info("🔬 Stopping the profile after the current cycle...")
+    return handler
+
 def signal_handler(bot):
     """Handle interrupt signals gracefully."""
     def handler(signum, frame):
-        console.print("\n🛑 Received stop signal...")
+        log.info("\n🛑 Received stop signal...")
         bot.stop()
     return handler
 
 async def main():
     """Main entry point."""
-    console.print(Panel("🤖 Subnet Alpha Unstaking Bot Starting...", title="Welcome", style="bold red"))
+    # Import bittensor in the background while the config loads and the password is entered
+    preload(bt)
+    log.info(Panel("🤖 Subnet Alpha Unstaking Bot Starting...", title="Welcome", style="bold red"))
     
     # Load configuration
     config = load_config("unstaking_config.yaml")
     if not config:
         return
     
+    # Pretty output with bittensor tracing by default; log_mode "production" keeps both off the hot path
+    try:
+        log.configure_from(config)
+    except ValueError as e:
+        log.error(Panel(f"❌ Invalid logging config: {e}", title="Error", style="bold red"))
+        return
+    
     # Create and run bot
-    bot = UnstakingBot(config)
+    bot = UnstakingBot(config, "unstaking_config.yaml")
     
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler(bot))
     signal.signal(signal.SIGTERM, signal_handler(bot))
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, profile_signal_handler(bot))
     
     await bot.run()
 